@@ -6,7 +6,8 @@ from .models import (
     OrganismoSectorial,
     Plan,
     PlanOrganismoSectorial,
-    Reporte
+    Reporte,
+    ReporteResumenMensual
 )
 
 # Register your models here.
@@ -17,3 +18,4 @@ admin.site.register(OrganismoSectorial)
 admin.site.register(Plan)
 admin.site.register(PlanOrganismoSectorial)
 admin.site.register(Reporte)
+admin.site.register(ReporteResumenMensual)
@@ -0,0 +1,121 @@
+from functools import update_wrapper
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+
+ACCIONES_ASINCRONAS = ('list', 'retrieve')
+
+
+class AsyncReadMixin:
+    """
+    Atiende ``list`` y ``retrieve`` con una vista nativa asíncrona cuando
+    ``API_ASYNC_VIEWS`` está activo (servidor ASGI, p. ej. uvicorn).
+
+    Autenticación, permisos, consultas y caché usan las variantes asíncronas
+    (``ahas_permission``, ``aget``, ``aiterator``, ``cache.aget``); el resto
+    de las acciones sigue siendo síncrono y Django lo ejecuta en el pool de
+    hilos como antes. Los mixins de la vista encadenan ``alist`` y
+    ``aretrieve`` igual que ``list`` y ``retrieve``.
+    """
+
+    @classmethod
+    def as_view(cls, actions=None, **initkwargs):
+        sync_view = super().as_view(actions, **initkwargs)
+        if not getattr(settings, 'API_ASYNC_VIEWS', False) or actions.get('get') not in ACCIONES_ASINCRONAS:
+            return sync_view
+        acciones = dict(actions, head=actions['get'])
+
+        async def view(request, *args, **kwargs):
+            if request.method.lower() not in ('get', 'head'):
+                return await sync_to_async(sync_view)(request, *args, **kwargs)
+
+            self = cls(**initkwargs)
+            self.action_map = acciones
+            for method, action in acciones.items():
+                setattr(self, method, getattr(self, action))
+            self.request = request
+            self.args = args
+            self.kwargs = kwargs
+            return await self.adispatch(request, *args, **kwargs)
+
+        update_wrapper(view, sync_view)
+        return view
+
+    async def adispatch(self, request, *args, **kwargs):
+        """
+        Equivalente asíncrono de ``APIView.dispatch`` para las acciones de
+        lectura.
+        """
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await self.ainitial(request, *args, **kwargs)
+            response = await getattr(self, f'a{self.action}')(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = await self.afinalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    async def ainitial(self, request, *args, **kwargs):
+        self.format_kwarg = self.get_format_suffix(**kwargs)
+        request.accepted_renderer, request.accepted_media_type = self.perform_content_negotiation(request)
+        request.version, request.versioning_scheme = self.determine_version(request, *args, **kwargs)
+
+        # Los autenticadores de DRF son síncronos (pueden leer auth_user).
+        await sync_to_async(self.perform_authentication)(request)
+        await self.acheck_permissions(request)
+        if self.get_throttles():
+            await sync_to_async(self.check_throttles)(request)
+
+    async def acheck_permissions(self, request):
+        for permission in self.get_permissions():
+            if hasattr(permission, 'ahas_permission'):
+                permitido = await permission.ahas_permission(request, self)
+            else:
+                permitido = await sync_to_async(permission.has_permission)(request, self)
+            if not permitido:
+                self.permission_denied(
+                    request,
+                    message=getattr(permission, 'message', None),
+                    code=getattr(permission, 'code', None)
+                )
+
+    async def afinalize_response(self, request, response, *args, **kwargs):
+        return self.finalize_response(request, response, *args, **kwargs)
+
+    async def aget_object(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            obj = await queryset.aget(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        except (queryset.model.DoesNotExist, TypeError, ValueError, ValidationError):
+            raise NotFound(detail="No se encontró un registro con ese ID.")
+        self.check_object_permissions(self.request, obj)
+        return obj
+
+    async def apaginate_queryset(self, queryset):
+        if self.paginator is None:
+            return None
+        if hasattr(self.paginator, 'apaginate_queryset'):
+            return await self.paginator.apaginate_queryset(queryset, self.request, view=self)
+        return await sync_to_async(self.paginator.paginate_queryset)(queryset, self.request, view=self)
+
+    async def alist(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = await self.apaginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.get_serializer(page, many=True).data)
+        objetos = [obj async for obj in queryset.aiterator()]
+        return Response(self.get_serializer(objetos, many=True).data)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        instance = await self.aget_object()
+        return Response(self.get_serializer(instance).data)
@@ -0,0 +1,89 @@
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from .roles import ADMINISTRADOR, ORGANISMO_SECTORIAL
+
+ROLES_CLAIM = 'roles'
+ROLES_EN_TOKEN = (ADMINISTRADOR, ORGANISMO_SECTORIAL)
+
+
+class RolesTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """
+    Emite tokens que incluyen los roles del usuario (``roles``), para que
+    ``StatelessJWTAuthentication`` pueda autorizar sin consultar la base.
+    """
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        token[ROLES_CLAIM] = sorted(
+            user.groups.filter(name__in=ROLES_EN_TOKEN).values_list('name', flat=True)
+        )
+        return token
+
+
+class RolesTokenUser(TokenUser):
+    @property
+    def token_roles(self):
+        # Tokens emitidos antes de agregar el claim no traen roles; en ese
+        # caso get_user_roles los consulta por el id del usuario.
+        return self.token.get(ROLES_CLAIM)
+
+
+class _EstadoUsuarios:
+    """
+    Caché local (por proceso) de corta duración con el ``is_active`` de cada
+    usuario, para rechazar tokens de usuarios desactivados sin consultar la
+    base en cada solicitud.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._datos = {}
+
+    def ttl(self):
+        return getattr(settings, 'API_JWT_USER_ACTIVE_TTL', 60)
+
+    def is_active(self, user_id):
+        ahora = time.monotonic()
+        with self._lock:
+            entrada = self._datos.get(user_id)
+        if entrada is not None and entrada[1] > ahora:
+            return entrada[0]
+
+        filtro = {jwt_settings.USER_ID_FIELD: user_id, 'is_active': True}
+        activo = get_user_model().objects.filter(**filtro).exists()
+        with self._lock:
+            self._datos[user_id] = (activo, ahora + self.ttl())
+        return activo
+
+    def clear(self):
+        with self._lock:
+            self._datos.clear()
+
+
+estado_usuarios = _EstadoUsuarios()
+
+
+class StatelessJWTAuthentication(JWTStatelessUserAuthentication):
+    """
+    Autenticación JWT sin cargar ``auth_user`` en cada solicitud.
+
+    El usuario se construye desde el token (``user_id`` y ``roles``). Un
+    usuario desactivado deja de ser aceptado a más tardar después de
+    ``API_JWT_USER_ACTIVE_TTL`` segundos. Los cambios de roles se reflejan
+    al emitir un nuevo token.
+    """
+    def get_user(self, validated_token):
+        if jwt_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken('El token no identifica a un usuario.')
+        user = RolesTokenUser(validated_token)
+        if not estado_usuarios.is_active(user.id):
+            raise AuthenticationFailed('El usuario está inactivo.', code='user_inactive')
+        return user
@@ -0,0 +1,54 @@
+"""
+Backend PostgreSQL con pool de conexiones por proceso.
+
+Igual que ``django.db.backends.postgresql`` pero ``connect()`` toma una
+conexión del pool y ``close()`` la devuelve, de modo que cada solicitud no
+paga el handshake TCP/TLS y la autenticación. Se configura en
+``OPTIONS["pool"]``::
+
+    "ENGINE": "api.backends.postgresql_pool",
+    "OPTIONS": {"pool": {"min_size": 1, "max_size": 10, "max_age": 1800,
+                         "max_idle": 600, "timeout": 10, "check_after": 30}},
+
+``CONN_MAX_AGE`` debe quedar en 0 para que Django devuelva la conexión al
+pool al terminar cada solicitud.
+"""
+from django.db.backends.postgresql import base
+from django.db.backends.base.base import NO_DB_ALIAS
+
+from .creation import DatabaseCreation
+from .pool import obtener_pool
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    creation_class = DatabaseCreation
+
+    def get_connection_params(self):
+        conn_params = super().get_connection_params()
+        conn_params.pop('pool', None)
+        return conn_params
+
+    @property
+    def pool(self):
+        if self.alias == NO_DB_ALIAS:
+            # Conexiones de mantenimiento (crear/eliminar bases): sin pool.
+            return None
+        return obtener_pool(self.alias, self.get_connection_params(), self.settings_dict['OPTIONS'].get('pool', {}))
+
+    def get_new_connection(self, conn_params):
+        pool = self.pool
+        if pool is None:
+            return super().get_new_connection(conn_params)
+        conexion = pool.getconn(lambda: super(DatabaseWrapper, self).get_new_connection(conn_params))
+        self.isolation_level = base.IsolationLevel(
+            self.settings_dict['OPTIONS'].get('isolation_level', base.IsolationLevel.READ_COMMITTED)
+        )
+        return conexion
+
+    def _close(self):
+        pool = self.pool
+        if pool is None or self.connection is None:
+            return super()._close()
+        with self.wrap_database_errors:
+            # Una conexión con errores y que no responde no vuelve al pool.
+            pool.putconn(self.connection, descartar=self.errors_occurred and not self.is_usable())
@@ -0,0 +1,10 @@
+from django.db.backends.postgresql.creation import DatabaseCreation as PostgresDatabaseCreation
+
+from .pool import cerrar_pools
+
+
+class DatabaseCreation(PostgresDatabaseCreation):
+    def _destroy_test_db(self, test_database_name, verbosity):
+        # Las conexiones ociosas del pool impedirían el DROP DATABASE.
+        cerrar_pools(test_database_name)
+        super()._destroy_test_db(test_database_name, verbosity)
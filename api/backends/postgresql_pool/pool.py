@@ -0,0 +1,258 @@
+import os
+import threading
+import time
+from collections import deque
+
+
+class PoolTimeout(Exception):
+    """
+    No se liberó ninguna conexión dentro de ``timeout`` segundos.
+    """
+
+
+class ConnectionPool:
+    """
+    Pool de conexiones DB-API seguro entre hilos.
+
+    - ``min_size``: conexiones que se mantienen abiertas aunque estén ociosas.
+    - ``max_size``: máximo de conexiones abiertas; al llegar al máximo
+      ``getconn()`` espera hasta ``timeout`` segundos a que se libere una.
+    - ``max_age``: segundos tras los que una conexión se cierra y se
+      reemplaza (reciclado).
+    - ``max_idle``: segundos ociosa tras los que se cierra una conexión por
+      encima de ``min_size``.
+    - ``check_after``: si una conexión estuvo ociosa más de estos segundos se
+      verifica con ``SELECT 1`` antes de entregarla.
+
+    ``stats()`` entrega los contadores de uso y de espera para dimensionarlo.
+    """
+    def __init__(self, min_size=0, max_size=10, max_age=1800, max_idle=600, timeout=10,
+                 check_after=30, reset=None, check=None):
+        if max_size < 1 or min_size > max_size:
+            raise ValueError("Se requiere 0 <= min_size <= max_size y max_size >= 1.")
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_age = max_age
+        self.max_idle = max_idle
+        self.timeout = timeout
+        self.check_after = check_after
+        self._reset = reset or (lambda conn: conn.rollback())
+        self._check = check or _select_1
+
+        self._cond = threading.Condition()
+        # (conexión, creada, usada): se entrega la última devuelta (LIFO) para
+        # que las demás puedan quedar ociosas y cerrarse.
+        self._idle = deque()
+        self._creadas = {}
+        self._size = 0
+        self._en_uso = 0
+        self._checkouts = 0
+        self._esperas = 0
+        self._espera_total = 0.0
+        self._espera_max = 0.0
+        self._timeouts = 0
+        self._abiertas = 0
+        self._cerradas = 0
+        self._fallas_verificacion = 0
+
+    def getconn(self, connect):
+        """
+        Entrega una conexión ociosa válida o abre una nueva con ``connect()``.
+        """
+        inicio = time.monotonic()
+        esperando = False
+        while True:
+            conn = None
+            with self._cond:
+                while True:
+                    self._cerrar_ociosas()
+                    if self._idle:
+                        conn, creada, usada = self._idle.pop()
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        break
+                    restante = self.timeout - (time.monotonic() - inicio)
+                    if restante <= 0:
+                        self._timeouts += 1
+                        raise PoolTimeout(
+                            f"No hay conexiones libres ({self.max_size} en uso) tras {self.timeout} s."
+                        )
+                    esperando = True
+                    self._cond.wait(restante)
+
+            if conn is None:
+                try:
+                    conn = connect()
+                except BaseException:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+                creada = time.monotonic()
+                with self._cond:
+                    self._creadas[id(conn)] = creada
+                    self._abiertas += 1
+            elif time.monotonic() - creada > self.max_age:
+                self._descartar(conn)
+                continue
+            elif time.monotonic() - usada > self.check_after and not self._valida(conn):
+                with self._cond:
+                    self._fallas_verificacion += 1
+                self._descartar(conn)
+                continue
+
+            espera = time.monotonic() - inicio
+            with self._cond:
+                self._en_uso += 1
+                self._checkouts += 1
+                if esperando:
+                    self._esperas += 1
+                self._espera_total += espera
+                self._espera_max = max(self._espera_max, espera)
+            return conn
+
+    def putconn(self, conn, descartar=False):
+        """
+        Devuelve ``conn`` al pool (o la cierra si está rota, vencida o se pide
+        ``descartar``).
+        """
+        with self._cond:
+            self._en_uso -= 1
+            creada = self._creadas.get(id(conn), 0)
+        vencida = time.monotonic() - creada > self.max_age
+        if descartar or vencida or _cerrada(conn):
+            self._descartar(conn)
+            return
+        try:
+            self._reset(conn)
+        except Exception:
+            self._descartar(conn)
+            return
+        with self._cond:
+            self._idle.append((conn, creada, time.monotonic()))
+            self._cond.notify()
+
+    def close(self):
+        """
+        Cierra las conexiones ociosas; las que están en uso se cierran al
+        devolverse.
+        """
+        with self._cond:
+            ociosas = [conn for conn, _, _ in self._idle]
+            self._idle.clear()
+            self.max_age = -1
+        for conn in ociosas:
+            self._descartar(conn)
+
+    def stats(self):
+        with self._cond:
+            return {
+                'size': self._size,
+                'idle': len(self._idle),
+                'in_use': self._en_uso,
+                'min_size': self.min_size,
+                'max_size': self.max_size,
+                'utilization': self._en_uso / self.max_size,
+                'checkouts': self._checkouts,
+                'waits': self._esperas,
+                'wait_seconds_total': self._espera_total,
+                'wait_seconds_max': self._espera_max,
+                'timeouts': self._timeouts,
+                'connections_opened': self._abiertas,
+                'connections_closed': self._cerradas,
+                'health_check_failures': self._fallas_verificacion,
+            }
+
+    def _valida(self, conn):
+        try:
+            self._check(conn)
+        except Exception:
+            return False
+        return True
+
+    def _cerrar_ociosas(self):
+        # Se llama con el lock tomado; las más antiguas quedan al inicio.
+        ahora = time.monotonic()
+        while self._idle and self._size > self.min_size:
+            conn, creada, usada = self._idle[0]
+            if ahora - usada <= self.max_idle and ahora - creada <= self.max_age:
+                break
+            self._idle.popleft()
+            self._size -= 1
+            self._cerradas += 1
+            self._creadas.pop(id(conn), None)
+            _cerrar(conn)
+
+    def _descartar(self, conn):
+        with self._cond:
+            self._size -= 1
+            self._cerradas += 1
+            self._creadas.pop(id(conn), None)
+            self._cond.notify()
+        _cerrar(conn)
+
+
+def _select_1(conn):
+    cursor = conn.cursor()
+    try:
+        cursor.execute('SELECT 1')
+    finally:
+        cursor.close()
+    conn.rollback()
+
+
+def _cerrada(conn):
+    return bool(getattr(conn, 'closed', False))
+
+
+def _cerrar(conn):
+    try:
+        conn.close()
+    except Exception:
+        pass
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _clave(alias, conn_params):
+    return (os.getpid(), alias, conn_params.get('host'), conn_params.get('port'), conn_params.get('dbname'),
+            conn_params.get('user'))
+
+
+def obtener_pool(alias, conn_params, opciones):
+    clave = _clave(alias, conn_params)
+    pool = _pools.get(clave)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(clave)
+            if pool is None:
+                pool = _pools[clave] = ConnectionPool(**opciones)
+    return pool
+
+
+def pool_stats():
+    """
+    Estadísticas de los pools de este proceso: ``[(etiquetas, stats), ...]``.
+    """
+    with _pools_lock:
+        pools = list(_pools.items())
+    return [
+        ({'alias': alias, 'database': database or ''}, pool.stats())
+        for (pid, alias, host, port, database, user), pool in pools
+        if pid == os.getpid()
+    ]
+
+
+def cerrar_pools(database=None):
+    """
+    Cierra los pools (todos o los de ``database``); p. ej. antes de eliminar
+    la base de pruebas.
+    """
+    with _pools_lock:
+        claves = [clave for clave in _pools if database is None or clave[4] == database]
+        pools = [_pools.pop(clave) for clave in claves]
+    for pool in pools:
+        pool.close()
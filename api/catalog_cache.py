@@ -0,0 +1,127 @@
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+from rest_framework.response import Response
+
+from .roles import aget_user_roles, get_user_roles
+
+CABECERAS_CACHEADAS = ('ETag', 'Last-Modified', 'Cache-Control', 'Content-Disposition')
+
+
+def _version_key(model):
+    return f'api:catalogo:version:{model._meta.label_lower}'
+
+
+def _cache_timeout():
+    return getattr(settings, 'API_CATALOG_CACHE_TIMEOUT', 600)
+
+
+def invalidar_catalogo(*models):
+    """
+    Invalida todas las respuestas cacheadas que dependen de ``models``
+    cambiando su versión; las claves anteriores expiran solas.
+    """
+    cache.set_many({_version_key(model): uuid.uuid4().hex for model in models}, None)
+
+
+def _versiones(models):
+    return [cache.get_or_set(_version_key(model), lambda: uuid.uuid4().hex, None) for model in models]
+
+
+async def _aversiones(models):
+    return [await cache.aget_or_set(_version_key(model), lambda: uuid.uuid4().hex, None) for model in models]
+
+
+class CatalogCacheMixin:
+    """
+    Cachea las respuestas ya renderizadas de ``list`` y ``retrieve``.
+
+    La clave incluye la ruta completa, el formato negociado, los roles del
+    usuario y la versión de cada modelo en ``cache_dependencies``. Guardar o
+    eliminar uno de esos modelos cambia su versión (ver ``api/signals.py``).
+    """
+    cache_dependencies = ()
+
+    def get_cache_dependencies(self):
+        return self.cache_dependencies or (self.queryset.model,)
+
+    def _clave(self, request, roles, versiones):
+        base = '|'.join([
+            request.get_full_path(), getattr(request, 'accepted_media_type', ''), ','.join(sorted(roles)), *versiones
+        ])
+        digest = hashlib.md5(base.encode('utf-8'), usedforsecurity=False).hexdigest()
+        return f'api:catalogo:{self.basename}:{self.action}:{digest}'
+
+    def get_response_cache_key(self, request):
+        return self._clave(request, get_user_roles(request), _versiones(self.get_cache_dependencies()))
+
+    async def aget_response_cache_key(self, request):
+        roles = await aget_user_roles(request)
+        return self._clave(request, roles, await _aversiones(self.get_cache_dependencies()))
+
+    def _respuesta_cacheada(self, request, entrada):
+        contenido, content_type, cabeceras = entrada
+        last_modified = parse_http_date_safe(cabeceras['Last-Modified']) if 'Last-Modified' in cabeceras else None
+        response = get_conditional_response(
+            request._request, etag=cabeceras.get('ETag'), last_modified=last_modified
+        )
+        if response is None:
+            response = HttpResponse(contenido, content_type=content_type)
+        for nombre, valor in cabeceras.items():
+            response[nombre] = valor
+        response['X-Cache'] = 'HIT'
+        return response
+
+    def _desde_cache(self, request, handler, *args, **kwargs):
+        key = self.get_response_cache_key(request)
+        entrada = cache.get(key)
+        if entrada is None:
+            self._response_cache_key = key
+            return handler(request, *args, **kwargs)
+        return self._respuesta_cacheada(request, entrada)
+
+    async def _adesde_cache(self, request, handler, *args, **kwargs):
+        key = await self.aget_response_cache_key(request)
+        entrada = await cache.aget(key)
+        if entrada is None:
+            self._response_cache_key = key
+            return await handler(request, *args, **kwargs)
+        return self._respuesta_cacheada(request, entrada)
+
+    def list(self, request, *args, **kwargs):
+        return self._desde_cache(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._desde_cache(request, super().retrieve, *args, **kwargs)
+
+    async def alist(self, request, *args, **kwargs):
+        return await self._adesde_cache(request, super().alist, *args, **kwargs)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        return await self._adesde_cache(request, super().aretrieve, *args, **kwargs)
+
+    def _entrada(self, response):
+        response.render()
+        cabeceras = {nombre: response[nombre] for nombre in CABECERAS_CACHEADAS if response.has_header(nombre)}
+        return response.content, response['Content-Type'], cabeceras
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        key = getattr(self, '_response_cache_key', None)
+        if key and isinstance(response, Response) and response.status_code == 200:
+            cache.set(key, self._entrada(response), _cache_timeout())
+        return response
+
+    async def afinalize_response(self, request, response, *args, **kwargs):
+        # La escritura en caché se hace aquí con la API asíncrona, no en
+        # finalize_response (el backend puede ser la base de datos).
+        key = self.__dict__.pop('_response_cache_key', None)
+        response = await super().afinalize_response(request, response, *args, **kwargs)
+        if key and isinstance(response, Response) and response.status_code == 200:
+            await cache.aset(key, self._entrada(response), _cache_timeout())
+        return response
@@ -0,0 +1,123 @@
+import hashlib
+from calendar import timegm
+
+from django.core.exceptions import ValidationError
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+
+class ConditionalGetMixin:
+    """
+    ETag para ``list`` y ``retrieve`` y Last-Modified para ``retrieve``, a
+    partir de ``updated_at``.
+
+    En listados el ETag sale de ``max(updated_at)`` más la cantidad de filas
+    activas (así un borrado lógico también lo cambia). No se envía
+    Last-Modified ni se atiende ``If-Modified-Since``: la fila borrada deja
+    de contar en el máximo y la fecha no avanzaría. En el detalle el
+    validador es el ``updated_at`` del objeto. Con ``?expand=`` se suma el ``updated_at``
+    más reciente de cada relación expandida, que también forma parte de la
+    respuesta. Si el cliente ya tiene la versión vigente se responde 304
+    antes de serializar. ``alist`` y ``aretrieve`` hacen lo
+    mismo con el ORM asíncrono (ver ``api/async_views.py``).
+    """
+    conditional_field = 'updated_at'
+
+    def _etag(self, request, *partes):
+        renderer = getattr(request, 'accepted_media_type', '')
+        base = '|'.join([request.get_full_path(), renderer, *[str(p) for p in partes]])
+        return quote_etag(hashlib.md5(base.encode('utf-8'), usedforsecurity=False).hexdigest())
+
+    def _respuesta_condicional(self, request, etag, ultima):
+        last_modified = timegm(ultima.utctimetuple()) if ultima else None
+        return get_conditional_response(request._request, etag=etag, last_modified=last_modified), last_modified
+
+    def _marcar(self, response, etag, last_modified):
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def _responder_condicional(self, request, handler, etag, ultima, *args, **kwargs):
+        response, last_modified = self._respuesta_condicional(request, etag, ultima)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        return self._marcar(response, etag, last_modified)
+
+    async def _aresponder_condicional(self, request, handler, etag, ultima, *args, **kwargs):
+        response, last_modified = self._respuesta_condicional(request, etag, ultima)
+        if response is None:
+            response = await handler(request, *args, **kwargs)
+        return self._marcar(response, etag, last_modified)
+
+    def _campos_validador(self):
+        """
+        ``conditional_field`` del modelo y de cada relación expandida (con
+        sus prefijos: ``a.b`` también anida ``a``).
+        """
+        campos = [self.conditional_field]
+        rutas = self.get_expand() if hasattr(self, 'get_expand') else []
+        for ruta in rutas:
+            partes = ruta.split('.')
+            for fin in range(1, len(partes) + 1):
+                campo = '__'.join([*partes[:fin], self.conditional_field])
+                if campo not in campos:
+                    campos.append(campo)
+        return campos
+
+    def _validador_listado(self):
+        return self.filter_queryset(self.get_queryset())
+
+    def _agregados_listado(self):
+        agregados = {f'ultima_{i}': Max(campo) for i, campo in enumerate(self._campos_validador())}
+        return {**agregados, 'total': Count('pk')}
+
+    def _validador_detalle(self, kwargs):
+        lookup = self.lookup_url_kwarg or self.lookup_field
+        return (
+            self.filter_queryset(self.get_queryset())
+            .filter(**{self.lookup_field: kwargs.get(lookup)})
+            .values_list(*self._campos_validador())
+        )
+
+    def _ultima(self, fechas):
+        fechas = [fecha for fecha in fechas if fecha is not None]
+        return max(fechas) if fechas else None
+
+    def _etag_listado(self, request, validador):
+        return self._etag(request, *validador.values())
+
+    def list(self, request, *args, **kwargs):
+        validador = self._validador_listado().aggregate(**self._agregados_listado())
+        etag = self._etag_listado(request, validador)
+        return self._responder_condicional(request, super().list, etag, None, *args, **kwargs)
+
+    async def alist(self, request, *args, **kwargs):
+        validador = await self._validador_listado().aaggregate(**self._agregados_listado())
+        etag = self._etag_listado(request, validador)
+        return await self._aresponder_condicional(request, super().alist, etag, None, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        try:
+            fechas = self._validador_detalle(kwargs).first()
+        except (TypeError, ValueError, ValidationError):
+            fechas = None
+        if fechas is None or fechas[0] is None:
+            return super().retrieve(request, *args, **kwargs)
+        etag = self._etag(request, *fechas)
+        return self._responder_condicional(request, super().retrieve, etag, self._ultima(fechas), *args, **kwargs)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        try:
+            fechas = await self._validador_detalle(kwargs).afirst()
+        except (TypeError, ValueError, ValidationError):
+            fechas = None
+        if fechas is None or fechas[0] is None:
+            return await super().aretrieve(request, *args, **kwargs)
+        etag = self._etag(request, *fechas)
+        return await self._aresponder_condicional(
+            request, super().aretrieve, etag, self._ultima(fechas), *args, **kwargs
+        )
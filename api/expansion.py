@@ -0,0 +1,95 @@
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter
+from rest_framework import serializers
+
+EXPAND_PARAM = 'expand'
+
+EXPAND_PARAMETER = OpenApiParameter(
+    EXPAND_PARAM, OpenApiTypes.STR,
+    description=(
+        "Relaciones a incluir anidadas en la respuesta, separadas por coma. "
+        "Admite rutas con punto, p. ej. `id_plan_organismo_sectorial.id_plan`."
+    )
+)
+
+
+def _agrupar(rutas):
+    """
+    Convierte ``['a', 'a.b', 'c']`` en ``{'a': ['b'], 'c': []}``.
+    """
+    grupos = {}
+    for ruta in rutas:
+        nombre, _, resto = ruta.partition('.')
+        hijos = grupos.setdefault(nombre, [])
+        if resto:
+            hijos.append(resto)
+    return grupos
+
+
+class ExpandibleSerializerMixin:
+    """
+    Permite reemplazar claves foráneas por el objeto relacionado serializado.
+
+    Las clases definen ``get_expandibles()`` con ``{campo: SerializerClass}``
+    y reciben las rutas a expandir con el argumento ``expand`` (o en el
+    contexto, para el serializer raíz).
+    """
+    @classmethod
+    def get_expandibles(cls):
+        return {}
+
+    @classmethod
+    def validar_expand(cls, rutas):
+        for ruta in rutas:
+            actual = cls
+            for nombre in ruta.split('.'):
+                expandibles = actual.get_expandibles() if hasattr(actual, 'get_expandibles') else {}
+                if nombre not in expandibles:
+                    raise serializers.ValidationError(
+                        {"detail": {EXPAND_PARAM: [f'No se puede expandir "{ruta}".']}}
+                    )
+                actual = expandibles[nombre]
+
+    def __init__(self, *args, expand=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if expand is None:
+            expand = self.context.get(EXPAND_PARAM, ())
+        expandibles = self.get_expandibles()
+        for nombre, hijos in _agrupar(expand).items():
+            serializer_class = expandibles.get(nombre)
+            if serializer_class is None:
+                continue
+            if issubclass(serializer_class, ExpandibleSerializerMixin):
+                self.fields[nombre] = serializer_class(read_only=True, expand=hijos)
+            else:
+                self.fields[nombre] = serializer_class(read_only=True)
+
+
+class ExpandMixin:
+    """
+    Lee ``?expand=`` en ``list`` y ``retrieve``, lo valida contra el
+    serializer y agrega el ``select_related`` correspondiente para que cada
+    expansión no genere consultas adicionales por fila.
+    """
+    expand_actions = ('list', 'retrieve')
+
+    def get_expand(self):
+        if getattr(self, 'action', None) not in self.expand_actions:
+            return []
+        request = getattr(self, 'request', None)
+        valor = request.query_params.get(EXPAND_PARAM, '') if request is not None else ''
+        rutas = sorted({ruta.strip() for ruta in valor.split(',') if ruta.strip()})
+        self.get_serializer_class().validar_expand(rutas)
+        return rutas
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        rutas = self.get_expand()
+        if rutas:
+            queryset = queryset.select_related(*[ruta.replace('.', '__') for ruta in rutas])
+        return queryset
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context[EXPAND_PARAM] = self.get_expand()
+        return context
@@ -0,0 +1,144 @@
+import csv
+import json
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db import connections
+from django.http import StreamingHttpResponse
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema, OpenApiParameter
+from rest_framework import serializers
+from rest_framework.decorators import action
+from rest_framework.renderers import BaseRenderer
+
+EXPORT_CHUNK_SIZE = 2000
+
+
+class _Echo:
+    """
+    Pseudo-buffer para ``csv.writer``: devuelve la línea en vez de guardarla.
+    """
+    def write(self, value):
+        return value
+
+
+class CSVRenderer(BaseRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        # Solo se usa para respuestas de error; las filas van por streaming.
+        if not isinstance(data, dict):
+            data = {'detail': data}
+        writer = csv.writer(_Echo())
+        return (writer.writerow(data.keys()) + writer.writerow(data.values())).encode(self.charset)
+
+
+class NDJSONRenderer(BaseRenderer):
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return (json.dumps(data, ensure_ascii=False, default=str) + '\n').encode(self.charset)
+
+
+def columnas_exportables(serializer):
+    """
+    Devuelve ``(nombre, attname, campo)`` para cada columna del modelo que
+    expone el serializer, en el mismo orden que la API.
+    """
+    modelo = serializer.Meta.model
+    columnas = []
+    for nombre, campo in serializer.fields.items():
+        try:
+            field = modelo._meta.get_field(nombre)
+        except FieldDoesNotExist:
+            continue
+        if not getattr(field, 'concrete', False):
+            continue
+        columnas.append((nombre, field.attname, campo))
+    return columnas
+
+
+def iterar_filas(queryset, attnames, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Recorre el queryset en lotes de ``chunk_size`` sin materializarlo.
+
+    Usa cursores del lado del servidor (``iterator``) cuando la base los
+    permite; si están deshabilitados (p. ej. detrás de un pooler en modo
+    transacción) avanza por lotes con ``pk > último`` para mantener la
+    memoria constante igualmente.
+    """
+    queryset = queryset.order_by('pk')
+    if not connections[queryset.db].settings_dict.get('DISABLE_SERVER_SIDE_CURSORS'):
+        yield from queryset.values_list(*attnames).iterator(chunk_size=chunk_size)
+        return
+
+    pk_index = attnames.index(queryset.model._meta.pk.attname)
+    ultimo = None
+    while True:
+        lote = queryset if ultimo is None else queryset.filter(pk__gt=ultimo)
+        filas = list(lote.values_list(*attnames)[:chunk_size])
+        if not filas:
+            return
+        yield from filas
+        ultimo = filas[-1][pk_index]
+
+
+def _representar(columnas, fila):
+    valores = []
+    for (nombre, attname, campo), valor in zip(columnas, fila):
+        if valor is not None and not isinstance(campo, serializers.RelatedField):
+            valor = campo.to_representation(valor)
+        valores.append(valor)
+    return valores
+
+
+def stream_csv(columnas, filas):
+    writer = csv.writer(_Echo())
+    yield writer.writerow([nombre for nombre, _, _ in columnas])
+    for fila in filas:
+        yield writer.writerow(_representar(columnas, fila))
+
+
+def stream_ndjson(columnas, filas):
+    nombres = [nombre for nombre, _, _ in columnas]
+    for fila in filas:
+        yield json.dumps(dict(zip(nombres, _representar(columnas, fila))), ensure_ascii=False) + '\n'
+
+
+class ExportMixin:
+    """
+    Agrega la acción ``export`` a un ModelViewSet: entrega todas las filas
+    activas como CSV (``?format=csv``) o NDJSON (``?format=ndjson``) por
+    streaming, con memoria constante sin importar el tamaño de la tabla.
+    """
+    export_chunk_size = EXPORT_CHUNK_SIZE
+
+    @extend_schema(
+        description="Exporta todos los registros activos como CSV o NDJSON (streaming).",
+        parameters=[
+            OpenApiParameter(
+                'format', OpenApiTypes.STR, enum=['csv', 'ndjson'],
+                description="Formato de salida. Por defecto `csv`."
+            )
+        ],
+        responses={(200, 'text/csv'): OpenApiTypes.STR, (200, 'application/x-ndjson'): OpenApiTypes.STR},
+    )
+    @action(detail=False, methods=['get'], renderer_classes=[CSVRenderer, NDJSONRenderer], pagination_class=None)
+    def export(self, request, *args, **kwargs):
+        columnas = columnas_exportables(self.get_serializer())
+        queryset = self.filter_queryset(self.get_queryset())
+        filas = iterar_filas(queryset, [attname for _, attname, _ in columnas], self.export_chunk_size)
+
+        renderer = request.accepted_renderer
+        if renderer.format == 'ndjson':
+            contenido = stream_ndjson(columnas, filas)
+        else:
+            contenido = stream_csv(columnas, filas)
+
+        nombre = self.get_queryset().model._meta.model_name
+        response = StreamingHttpResponse(contenido, content_type=f'{renderer.media_type}; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="{nombre}.{renderer.format}"'
+        return response
@@ -0,0 +1,166 @@
+import decimal
+from datetime import date, datetime
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import ISO_8601, serializers
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+# Campos cuyo ``to_representation`` devuelve el mismo valor que entrega
+# ``values()`` (str, int, bool, clave de una opción).
+IDENTIDAD = (serializers.CharField, serializers.IntegerField, serializers.BooleanField, serializers.ChoiceField)
+
+
+def _fecha_hora(campo):
+    # DateTimeField.to_representation consulta la zona horaria actual por
+    # cada valor; aquí se resuelve una vez por listado.
+    formato = getattr(campo, 'format', api_settings.DATETIME_FORMAT)
+    zona = campo.timezone if hasattr(campo, 'timezone') else campo.default_timezone()
+    if formato is None or formato.lower() != ISO_8601 or zona is None:
+        return campo.to_representation
+
+    def convertir(valor):
+        if not isinstance(valor, datetime) or valor.tzinfo is None:
+            return campo.to_representation(valor)
+        texto = valor.astimezone(zona).isoformat()
+        return texto[:-6] + 'Z' if texto.endswith('+00:00') else texto
+    return convertir
+
+
+def _fecha(campo):
+    formato = getattr(campo, 'format', api_settings.DATE_FORMAT)
+    if formato is None or formato.lower() != ISO_8601:
+        return campo.to_representation
+
+    def convertir(valor):
+        if type(valor) is not date:
+            return campo.to_representation(valor)
+        return valor.isoformat()
+    return convertir
+
+
+def _decimal(campo):
+    # Mismo redondeo que DecimalField.quantize, con el contexto armado una vez.
+    if (not getattr(campo, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING) or campo.localize
+            or campo.normalize_output or campo.decimal_places is None):
+        return campo.to_representation
+    contexto = decimal.getcontext().copy()
+    if campo.max_digits is not None:
+        contexto.prec = campo.max_digits
+    exponente = decimal.Decimal('.1') ** campo.decimal_places
+    rounding = campo.rounding
+
+    def convertir(valor):
+        if not isinstance(valor, decimal.Decimal):
+            return campo.to_representation(valor)
+        return '{:f}'.format(valor.quantize(exponente, rounding=rounding, context=contexto))
+    return convertir
+
+
+CONVERTIDORES = {
+    serializers.DateTimeField: _fecha_hora,
+    serializers.DateField: _fecha,
+    serializers.DecimalField: _decimal,
+}
+
+
+class Proyeccion:
+    """
+    Convierte filas de ``values()`` en la misma representación que
+    ``serializer`` (mismas claves, en el mismo orden, y mismo formato de
+    decimales y fechas) sin construir instancias del modelo ni recorrer la
+    maquinaria de campos de DRF por fila.
+    """
+    def __init__(self, campos):
+        # [(nombre, convertidor o None si el valor va tal cual)]
+        self.campos = campos
+        self.nombres = [nombre for nombre, _ in campos]
+
+    def representar(self, filas):
+        campos = self.campos
+        resultado = []
+        for fila in filas:
+            item = {}
+            for nombre, convertir in campos:
+                valor = fila[nombre]
+                # Igual que Serializer.to_representation: None no se convierte.
+                item[nombre] = valor if convertir is None or valor is None else convertir(valor)
+            resultado.append(item)
+        return resultado
+
+
+def proyectar(serializer):
+    """
+    ``Proyeccion`` equivalente a ``serializer`` o ``None`` si alguno de sus
+    campos no es una columna del modelo (campos calculados, anidados o con
+    otro ``source``), en cuyo caso hay que usar el serializer.
+    """
+    modelo = serializer.Meta.model
+    campos = []
+    for nombre, campo in serializer.fields.items():
+        if campo.write_only:
+            continue
+        if campo.source != nombre or isinstance(campo, (serializers.BaseSerializer, serializers.ManyRelatedField)):
+            return None
+        try:
+            field = modelo._meta.get_field(nombre)
+        except FieldDoesNotExist:
+            return None
+        if not getattr(field, 'concrete', False) or field.many_to_many:
+            return None
+        if isinstance(campo, serializers.PrimaryKeyRelatedField) and campo.pk_field is None:
+            # values() entrega la clave foránea, que es lo que muestra el campo.
+            convertir = None
+        elif isinstance(campo, serializers.RelatedField):
+            return None
+        elif type(campo) in IDENTIDAD:
+            convertir = None
+        elif type(campo) in CONVERTIDORES:
+            convertir = CONVERTIDORES[type(campo)](campo)
+        else:
+            convertir = campo.to_representation
+        campos.append((nombre, convertir))
+    return Proyeccion(campos)
+
+
+class FastListMixin:
+    """
+    Atiende ``list`` con ``values()`` y ``Proyeccion`` en vez de instanciar
+    el modelo y serializar fila por fila; la respuesta es idéntica a la del
+    serializer. Con ``?expand=`` o un serializer no proyectable se usa el
+    camino normal. Debe ir justo antes de ``AsyncReadMixin`` en las bases.
+    """
+    fast_list = True
+
+    def get_proyeccion(self):
+        if not self.fast_list:
+            return None
+        if hasattr(self, 'get_expand') and self.get_expand():
+            return None
+        return proyectar(self.get_serializer())
+
+    def _filas(self, proyeccion):
+        queryset = self.filter_queryset(self.get_queryset())
+        # La paginación por cursor lee su orden de cada fila.
+        orden = getattr(self, 'keyset_ordering', None) or getattr(self.paginator, 'ordering', ())
+        return queryset.values(*dict.fromkeys([*proyeccion.nombres, *orden]))
+
+    def list(self, request, *args, **kwargs):
+        proyeccion = self.get_proyeccion()
+        if proyeccion is None:
+            return super().list(request, *args, **kwargs)
+        queryset = self._filas(proyeccion)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(proyeccion.representar(page))
+        return Response(proyeccion.representar(queryset))
+
+    async def alist(self, request, *args, **kwargs):
+        proyeccion = self.get_proyeccion()
+        if proyeccion is None:
+            return await super().alist(request, *args, **kwargs)
+        queryset = self._filas(proyeccion)
+        page = await self.apaginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(proyeccion.representar(page))
+        return Response(proyeccion.representar([fila async for fila in queryset.aiterator()]))
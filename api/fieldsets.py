@@ -0,0 +1,103 @@
+from django.core.exceptions import FieldDoesNotExist
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter
+from rest_framework import serializers
+
+FIELDS_PARAM = 'fields'
+OMIT_PARAM = 'omit'
+
+FIELDS_PARAMETERS = [
+    OpenApiParameter(
+        FIELDS_PARAM, OpenApiTypes.STR,
+        description="Campos a incluir en la respuesta, separados por coma (p. ej. `id,nombre`)."
+    ),
+    OpenApiParameter(
+        OMIT_PARAM, OpenApiTypes.STR,
+        description="Campos a excluir de la respuesta, separados por coma."
+    ),
+]
+
+
+def _lista(valor):
+    return [campo.strip() for campo in (valor or '').split(',') if campo.strip()]
+
+
+class SparseFieldsSerializerMixin:
+    """
+    Recorta los campos del serializer según ``fields`` y ``omit`` del
+    contexto (solo el serializer raíz; las expansiones anidadas se
+    serializan completas).
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        campos = self.context.get(FIELDS_PARAM)
+        omitir = self.context.get(OMIT_PARAM)
+        if campos:
+            for nombre in set(self.fields) - set(campos):
+                self.fields.pop(nombre)
+        for nombre in omitir or ():
+            self.fields.pop(nombre, None)
+
+
+class SparseFieldsMixin:
+    """
+    Lee ``?fields=`` y ``?omit=`` en ``list`` y ``retrieve``: recorta la
+    respuesta y limita el SELECT con ``.only()`` a las columnas necesarias.
+    """
+    sparse_actions = ('list', 'retrieve')
+
+    def get_sparse_fields(self):
+        """
+        Devuelve ``(campos, omitir)`` validados contra el serializer.
+        """
+        if getattr(self, 'action', None) not in self.sparse_actions or getattr(self, 'request', None) is None:
+            return [], []
+        if hasattr(self, '_sparse_fields'):
+            return self._sparse_fields
+        campos = _lista(self.request.query_params.get(FIELDS_PARAM))
+        omitir = _lista(self.request.query_params.get(OMIT_PARAM))
+        if campos or omitir:
+            disponibles = set(self.get_serializer_class()().fields)
+            invalidos = [campo for campo in campos + omitir if campo not in disponibles]
+            if invalidos:
+                raise serializers.ValidationError(
+                    {"detail": {FIELDS_PARAM: [f'Campo desconocido: "{campo}".' for campo in invalidos]}}
+                )
+        self._sparse_fields = (campos, omitir)
+        return self._sparse_fields
+
+    def get_only_fields(self, campos, omitir):
+        """
+        Columnas del modelo que hay que leer para los campos pedidos, más la
+        clave primaria, el orden de la paginación y las relaciones expandidas.
+        """
+        modelo = self.get_serializer_class().Meta.model
+        nombres = campos or list(self.get_serializer_class()().fields)
+        nombres = [nombre for nombre in nombres if nombre not in omitir]
+        nombres += list(getattr(getattr(self, 'paginator', None), 'ordering', ()))
+        if hasattr(self, 'get_expand'):
+            nombres += [ruta.split('.')[0] for ruta in self.get_expand()]
+
+        columnas = {modelo._meta.pk.name}
+        for nombre in nombres:
+            try:
+                field = modelo._meta.get_field(nombre)
+            except FieldDoesNotExist:
+                continue
+            if getattr(field, 'concrete', False):
+                columnas.add(field.name)
+        return sorted(columnas)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        campos, omitir = self.get_sparse_fields()
+        if campos or omitir:
+            queryset = queryset.only(*self.get_only_fields(campos, omitir))
+        return queryset
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        campos, omitir = self.get_sparse_fields()
+        context[FIELDS_PARAM] = campos
+        context[OMIT_PARAM] = omitir
+        return context
@@ -0,0 +1,29 @@
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+
+class ParamsFilterBackend(BaseFilterBackend):
+    """
+    Filtra con los parámetros de la URL validados por
+    ``view.filter_params_serializer`` (un serializer con ``condiciones()``),
+    de modo que el filtro se resuelve en la consulta y no en el cliente.
+    Parámetros inválidos responden 400 con ``{"detail": errores}``.
+    """
+    def get_filtros(self, request, view):
+        clase = getattr(view, 'filter_params_serializer', None)
+        if clase is None:
+            return None
+        cache = getattr(request, '_filtros_validados', None)
+        if cache is not None and isinstance(cache, clase):
+            return cache
+        filtros = clase(data=request.query_params)
+        if not filtros.is_valid():
+            raise ValidationError({"detail": filtros.errors})
+        request._filtros_validados = filtros
+        return filtros
+
+    def filter_queryset(self, request, queryset, view):
+        filtros = self.get_filtros(request, view)
+        if filtros is None:
+            return queryset
+        return queryset.filter(**filtros.condiciones())
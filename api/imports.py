@@ -0,0 +1,322 @@
+"""
+Importación masiva de catálogos desde CSV o XLSX.
+
+El archivo se lee fila por fila (sin cargarlo entero), cada lote de
+``IMPORT_CHUNK_SIZE`` filas se valida con un serializer y se guarda con un
+único ``bulk_create(update_conflicts=True)`` (upsert sobre la columna única).
+Toda la importación es una transacción: si alguna fila tiene errores no se
+guarda ninguna y se devuelven los errores por fila.
+
+La primera fila del archivo trae los nombres de las columnas (los campos del
+serializer). Una celda vacía equivale a no informar el campo.
+"""
+import codecs
+import csv
+import posixpath
+import zipfile
+from xml.etree import ElementTree
+
+from django.db import transaction
+from drf_spectacular.utils import OpenApiResponse, extend_schema
+from rest_framework import serializers, status
+from rest_framework.decorators import action
+from rest_framework.parsers import MultiPartParser
+from rest_framework.response import Response
+
+from .catalog_cache import invalidar_catalogo
+
+IMPORT_CHUNK_SIZE = 1000
+# Al llegar a este número de filas con errores se deja de leer el archivo.
+MAX_ERRORES = 100
+
+_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+_NS_REL = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+
+
+class ArchivoInvalido(Exception):
+    """
+    El archivo no se puede leer o sus columnas no corresponden al catálogo.
+    """
+
+
+# Lectura
+
+def leer_csv(archivo):
+    """
+    Recorre un CSV (UTF-8, con o sin BOM) como ``(número de fila, celdas)``.
+    """
+    try:
+        for numero, celdas in enumerate(csv.reader(codecs.iterdecode(archivo, 'utf-8-sig')), start=1):
+            yield numero, celdas
+    except UnicodeDecodeError:
+        raise ArchivoInvalido("El CSV debe estar codificado en UTF-8.")
+    except csv.Error as error:
+        raise ArchivoInvalido(f"CSV inválido: {error}.")
+
+
+def _columna(referencia):
+    # "AB12" -> 27 (base 0)
+    indice = 0
+    for letra in referencia:
+        if not letra.isalpha():
+            break
+        indice = indice * 26 + ord(letra.upper()) - ord('A') + 1
+    return indice - 1
+
+
+def _primera_hoja(libro):
+    with libro.open('xl/workbook.xml') as contenido:
+        hoja = ElementTree.parse(contenido).getroot().find(f'{_NS}sheets/{_NS}sheet')
+    if hoja is None:
+        raise ArchivoInvalido("El XLSX no tiene hojas.")
+    relacion = hoja.get(f'{_NS_REL}id')
+    with libro.open('xl/_rels/workbook.xml.rels') as contenido:
+        for elemento in ElementTree.parse(contenido).getroot():
+            if elemento.get('Id') == relacion:
+                destino = elemento.get('Target')
+                if destino.startswith('/'):
+                    return destino.lstrip('/')
+                return posixpath.normpath(posixpath.join('xl', destino))
+    raise ArchivoInvalido("El XLSX no tiene hojas.")
+
+
+def _textos_compartidos(libro):
+    if 'xl/sharedStrings.xml' not in libro.namelist():
+        return []
+    textos = []
+    with libro.open('xl/sharedStrings.xml') as contenido:
+        for _, elemento in ElementTree.iterparse(contenido):
+            if elemento.tag == f'{_NS}si':
+                textos.append(''.join(
+                    texto.text or '' for texto in elemento.iter(f'{_NS}t')
+                ))
+                elemento.clear()
+    return textos
+
+
+def _valor_celda(celda, textos):
+    tipo = celda.get('t', 'n')
+    if tipo == 'inlineStr':
+        return ''.join(texto.text or '' for texto in celda.iter(f'{_NS}t'))
+    valor = celda.findtext(f'{_NS}v')
+    if valor is None:
+        return ''
+    if tipo == 's':
+        return textos[int(valor)]
+    if tipo == 'b':
+        return 'true' if valor == '1' else 'false'
+    if tipo == 'n' and valor.endswith('.0'):
+        return valor[:-2]
+    return valor
+
+
+def leer_xlsx(archivo):
+    """
+    Recorre la primera hoja de un XLSX como ``(número de fila, celdas)``.
+    Las filas se leen con ``iterparse`` y se descartan al procesarlas; solo
+    la tabla de textos compartidos queda en memoria.
+    """
+    try:
+        libro = zipfile.ZipFile(archivo)
+    except zipfile.BadZipFile:
+        raise ArchivoInvalido("El archivo no es un XLSX válido.")
+    with libro:
+        try:
+            hoja = _primera_hoja(libro)
+            textos = _textos_compartidos(libro)
+            with libro.open(hoja) as contenido:
+                for _, elemento in ElementTree.iterparse(contenido):
+                    if elemento.tag != f'{_NS}row':
+                        continue
+                    celdas = []
+                    for celda in elemento.iter(f'{_NS}c'):
+                        indice = _columna(celda.get('r', '')) if celda.get('r') else len(celdas)
+                        celdas.extend([''] * (indice - len(celdas)))
+                        celdas.append(_valor_celda(celda, textos))
+                    yield int(elemento.get('r')), celdas
+                    elemento.clear()
+        except (KeyError, ValueError, IndexError, ElementTree.ParseError):
+            raise ArchivoInvalido("El archivo no es un XLSX válido.")
+
+
+LECTORES = {'csv': leer_csv, 'xlsx': leer_xlsx}
+
+
+def leer_archivo(archivo, formato, columnas_validas):
+    """
+    Devuelve ``(columnas, filas)``: los nombres del encabezado y un iterador
+    de ``(número de fila, {columna: valor})`` que omite filas y celdas vacías.
+    """
+    lector = LECTORES.get(formato)
+    if lector is None:
+        raise ArchivoInvalido(f"Formato no soportado: '{formato}'. Use csv o xlsx.")
+    filas = lector(archivo)
+    for _, encabezado in filas:
+        columnas = [columna.strip() for columna in encabezado]
+        if any(columnas):
+            break
+    else:
+        raise ArchivoInvalido("El archivo está vacío.")
+
+    desconocidas = sorted(set(columnas) - set(columnas_validas) - {''})
+    if desconocidas:
+        raise ArchivoInvalido(
+            f"Columnas desconocidas: {', '.join(desconocidas)}. "
+            f"Columnas válidas: {', '.join(columnas_validas)}."
+        )
+    if len(set(columnas) - {''}) != len([c for c in columnas if c]):
+        raise ArchivoInvalido("El encabezado tiene columnas repetidas.")
+
+    def datos():
+        for numero, celdas in filas:
+            fila = {
+                columna: valor.strip()
+                for columna, valor in zip(columnas, celdas)
+                if columna and valor.strip()
+            }
+            if fila:
+                yield numero, fila
+
+    return [columna for columna in columnas if columna], datos()
+
+
+def formato_de(nombre):
+    return posixpath.splitext(nombre or '')[1].lstrip('.').lower()
+
+
+# Upsert
+
+def _lotes(filas, tamano):
+    lote = []
+    for fila in filas:
+        lote.append(fila)
+        if len(lote) == tamano:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+def importar_filas(serializer_class, columnas, filas, clave, lote=IMPORT_CHUNK_SIZE, max_errores=MAX_ERRORES):
+    """
+    Valida y hace upsert de ``filas`` (de ``leer_archivo``) por la columna
+    única ``clave``. Con ``clave='id'`` las filas con ``id`` actualizan ese
+    registro y las demás se crean. Los registros importados quedan activos.
+
+    Devuelve ``(filas guardadas, errores)``; si hay errores no se guarda nada
+    y ``errores`` es ``[{"fila": n, "errores": {...}}, ...]``.
+    """
+    modelo = serializer_class.Meta.model
+    contexto = serializer_class.contexto_importacion() if hasattr(serializer_class, 'contexto_importacion') else {}
+    # Un solo serializer valida todas las filas (como el hijo de un ListSerializer).
+    validador = serializer_class(context=contexto)
+    actualizar = [columna for columna in columnas if columna not in (clave, 'id')] + ['is_active', 'updated_at']
+    errores = []
+    vistas = {}
+    guardadas = 0
+
+    with transaction.atomic():
+        for filas_lote in _lotes(filas, lote):
+            validas = []
+            for numero, fila in filas_lote:
+                try:
+                    datos = validador.run_validation(fila)
+                except serializers.ValidationError as error:
+                    errores.append({"fila": numero, "errores": error.detail})
+                    continue
+                if datos.get(clave) is not None:
+                    anterior = vistas.setdefault(datos[clave], numero)
+                    if anterior != numero:
+                        errores.append({"fila": numero, "errores": {
+                            clave: [f"Repetido: ya aparece en la fila {anterior}."]
+                        }})
+                        continue
+                validas.append((numero, datos))
+
+            if clave == 'id':
+                ids = [datos['id'] for _, datos in validas if 'id' in datos]
+                existentes = set(modelo.all_objects.filter(pk__in=ids).values_list('pk', flat=True))
+                for numero, datos in validas:
+                    if 'id' in datos and datos['id'] not in existentes:
+                        errores.append({"fila": numero, "errores": {'id': [f"No existe el registro {datos['id']}."]}})
+
+            if len(errores) >= max_errores:
+                break
+            if errores:
+                # Se sigue validando para informar todos los errores, sin escribir.
+                continue
+
+            instancias = [modelo(**datos, is_active=True) for _, datos in validas]
+            if clave == 'id':
+                nuevas = [instancia for instancia in instancias if instancia.pk is None]
+                actualizadas = [instancia for instancia in instancias if instancia.pk is not None]
+                modelo.objects.bulk_create(nuevas)
+                if actualizadas:
+                    modelo.objects.bulk_create(actualizadas, update_conflicts=True, unique_fields=['id'],
+                                               update_fields=actualizar)
+            else:
+                modelo.objects.bulk_create(instancias, update_conflicts=True, unique_fields=[clave],
+                                           update_fields=actualizar)
+            guardadas += len(instancias)
+
+        if errores:
+            transaction.set_rollback(True)
+            errores.sort(key=lambda error: error['fila'])
+            return 0, errores[:max_errores]
+
+    invalidar_catalogo(modelo)
+    return guardadas, []
+
+
+# Endpoint
+
+class ImportArchivoSerializer(serializers.Serializer):
+    archivo = serializers.FileField(help_text="CSV (UTF-8) o XLSX; la primera fila trae los nombres de las columnas.")
+
+
+class ImportResponseSerializer(serializers.Serializer):
+    mensaje = serializers.CharField()
+    filas = serializers.IntegerField()
+
+
+class ImportMixin:
+    """
+    Agrega ``POST <recurso>/import/`` para cargar un CSV o XLSX con upsert
+    por ``import_key`` usando ``import_serializer_class``.
+    """
+    import_serializer_class = None
+    import_key = 'nombre'
+    import_chunk_size = IMPORT_CHUNK_SIZE
+
+    @extend_schema(
+        description=(
+            "Importa un CSV o XLSX (multipart, campo `archivo`). Las filas cuyo valor único ya existe "
+            "se actualizan y las demás se crean. Si alguna fila tiene errores no se guarda ninguna "
+            "y se devuelven los errores por fila."
+        ),
+        request={'multipart/form-data': ImportArchivoSerializer},
+        responses={
+            200: ImportResponseSerializer,
+            400: OpenApiResponse(description="Archivo inválido o errores de validación por fila"),
+            403: OpenApiResponse(description="No autorizado para importar."),
+        }
+    )
+    @action(detail=False, methods=['post'], url_path='import', parser_classes=[MultiPartParser])
+    def importar(self, request, *args, **kwargs):
+        serializer = ImportArchivoSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response({"detail": serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        archivo = serializer.validated_data['archivo']
+        clase = self.import_serializer_class
+        try:
+            columnas, filas = leer_archivo(archivo, formato_de(archivo.name), list(clase().fields))
+            guardadas, errores = importar_filas(clase, columnas, filas, self.import_key, self.import_chunk_size)
+        except ArchivoInvalido as error:
+            return Response({"detail": str(error)}, status=status.HTTP_400_BAD_REQUEST)
+        if errores:
+            return Response({"detail": errores}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({
+            "mensaje": "El archivo fue importado correctamente.",
+            "filas": guardadas
+        }, status=status.HTTP_200_OK)
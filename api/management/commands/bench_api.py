@@ -0,0 +1,391 @@
+import json
+import random
+import statistics
+import time
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import Group, User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.catalog_cache import invalidar_catalogo
+from api.models import (
+    TipoMedida, Medida, OrganismoSectorial, Plan, PlanOrganismoSectorial, Reporte, ReporteResumenMensual
+)
+from api.roles import ADMINISTRADOR, ORGANISMO_SECTORIAL, invalidate_user_roles
+from api.urls import router
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+BASELINE_POR_DEFECTO = 'api/bench_baseline.json'
+
+# Carga fija para calibrar: una consulta trivial y la serialización de filas
+# parecidas a las de un listado, sin pasar por código de la API.
+_FILAS_CALIBRACION = [
+    {'id': i, 'nombre': f'calibracion-{i}', 'valor': f'{i}.50', 'fecha': '2024-01-15'} for i in range(200)
+]
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide latencia (p50/p95/p99), throughput y consultas por solicitud de cada ruta "
+        "registrada en api/urls.py, más el RSS máximo del proceso. Los datos se cargan "
+        "dentro de una transacción que se revierte al terminar. Falla si alguna ruta responde "
+        "con error o hace más consultas que en el baseline. La latencia se compara relativa a "
+        "una calibración medida en el mismo proceso (p95 / calibración) y, como el RSS, solo "
+        "se informa salvo con --estricto. Para regenerar el baseline: "
+        "python manage.py bench_api --settings=django_proyecto.settings_dev --guardar-baseline"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--planes', type=int, default=20, help="Cantidad de planes a generar.")
+        parser.add_argument('--organismos', type=int, default=10, help="Cantidad de organismos sectoriales.")
+        parser.add_argument('--medidas', type=int, default=30, help="Cantidad de medidas.")
+        parser.add_argument('--relaciones', type=int, default=200, help="Cantidad de relaciones plan-organismo.")
+        parser.add_argument('--reportes', type=int, default=5000, help="Cantidad de reportes.")
+        parser.add_argument('--semilla', type=int, default=1379, help="Semilla para datos reproducibles.")
+        parser.add_argument('--iteraciones', type=int, default=50, help="Solicitudes medidas por ruta.")
+        parser.add_argument('--calentamiento', type=int, default=3, help="Solicitudes previas sin medir por ruta.")
+        parser.add_argument('--solo', default='', help="Mide solo los escenarios cuyo nombre contiene este texto.")
+        parser.add_argument('--baseline', default=BASELINE_POR_DEFECTO, help="Archivo JSON con los umbrales.")
+        parser.add_argument(
+            '--tolerancia', type=float, default=0.25,
+            help="Margen sobre el p95 relativo y el RSS del baseline antes de avisar (0.25 = 25%%)."
+        )
+        parser.add_argument(
+            '--margen-ms', type=float, default=5.0,
+            help="Margen absoluto sobre el p95 del baseline, para las rutas de pocos milisegundos."
+        )
+        parser.add_argument(
+            '--estricto', action='store_true',
+            help="Falla también si la latencia relativa o el RSS superan el baseline (por defecto solo se informan)."
+        )
+        parser.add_argument(
+            '--guardar-baseline', action='store_true',
+            help="Guarda los resultados como nuevo baseline en vez de compararlos."
+        )
+        parser.add_argument('--json', default='', help="Escribe además los resultados en este archivo JSON.")
+
+    def handle(self, *args, **options):
+        if options['iteraciones'] < 2:
+            raise CommandError("Se requieren al menos 2 iteraciones para calcular percentiles.")
+        if min(options['planes'], options['organismos'], options['medidas'], options['relaciones'],
+               options['reportes']) < 1:
+            raise CommandError("Planes, organismos, medidas, relaciones y reportes deben ser al menos 1.")
+
+        self.rnd = random.Random(options['semilla'])
+        # Objetos nuevos por iteración para DELETE, bulk-delete y las altas que no admiten duplicados.
+        self.por_iteracion = options['calentamiento'] + options['iteraciones']
+        try:
+            # El cliente de pruebas usa el host "testserver".
+            with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']), transaction.atomic():
+                datos = self.cargar_datos(options)
+                cliente, usuario = self.cliente()
+                calibracion = self.calibrar(options['calentamiento'], options['iteraciones'])
+                resultados = {}
+                for nombre, escenario in self.escenarios(datos):
+                    if options['solo'] and options['solo'] not in nombre:
+                        continue
+                    resultados[nombre] = self.medir(cliente, escenario, options['calentamiento'], options['iteraciones'])
+                    resultados[nombre]['p95_rel'] = round(resultados[nombre]['p95_ms'] / calibracion, 2)
+                raise _Rollback
+        except _Rollback:
+            pass
+        # La caché no se revierte con la transacción.
+        invalidar_catalogo(TipoMedida, Medida, OrganismoSectorial)
+        invalidate_user_roles(usuario.pk)
+
+        rss = self.rss_maximo()
+        self.imprimir(resultados, rss, calibracion)
+        actual = {'calibracion_ms': calibracion, 'escenarios': resultados, 'peak_rss_mb': rss}
+        if options['json']:
+            self._escribir(options['json'], actual)
+
+        fallidos = [nombre for nombre, resultado in resultados.items() if resultado['errores']]
+        if fallidos:
+            raise CommandError(f"Respuestas con error en: {', '.join(fallidos)}.")
+
+        if options['guardar_baseline']:
+            self._escribir(options['baseline'], {
+                'dataset': {campo: options[campo] for campo in
+                            ('planes', 'organismos', 'medidas', 'relaciones', 'reportes', 'iteraciones')},
+                **actual,
+            })
+            self.stdout.write(self.style.SUCCESS(f"Baseline guardado en {options['baseline']}."))
+            return
+
+        try:
+            with open(options['baseline'], encoding='utf-8') as archivo:
+                baseline = json.load(archivo)
+        except FileNotFoundError:
+            self.stdout.write(self.style.WARNING(
+                f"No existe {options['baseline']}; use --guardar-baseline para crearlo."
+            ))
+            return
+
+        regresiones, avisos = self.comparar(actual, baseline, options['tolerancia'], options['margen_ms'])
+        if options['estricto']:
+            regresiones += avisos
+        elif avisos:
+            self.stdout.write(self.style.WARNING(
+                "Sobre el baseline (solo informativo, dependen de la máquina):\n  " + "\n  ".join(avisos)
+            ))
+        if regresiones:
+            raise CommandError("Resultados sobre los umbrales del baseline:\n  " + "\n  ".join(regresiones))
+        self.stdout.write(self.style.SUCCESS("Resultados dentro de los umbrales del baseline."))
+
+    # Datos
+
+    def cargar_datos(self, options):
+        rnd = self.rnd
+        n = self.por_iteracion
+        tipos = TipoMedida.objects.bulk_create([
+            TipoMedida(nombre=f"bench-tipo-{i}", descripcion="bench") for i in range(5 + 2 * n)
+        ])
+        medidas = Medida.objects.bulk_create([
+            Medida(id_tipo_medida=rnd.choice(tipos[:5]), nombre_corto=f"bench-{i}", indicador="-",
+                   forma_calculo="-", frecuencia_reporte="Mensual")
+            for i in range(options['medidas'] + 2 * n)
+        ])
+        organismos = OrganismoSectorial.objects.bulk_create([
+            OrganismoSectorial(nombre=f"bench-{i}", tipo="-", contacto="-")
+            for i in range(options['organismos'] + 2 * n)
+        ])
+        # Planes extra: a borrar y para las altas de relaciones (que rechazan duplicados).
+        planes = Plan.objects.bulk_create([
+            Plan(nombre=f"bench-{i}", descripcion="-", fecha_inicio=date(2020, 1, 1),
+                 fecha_termino=date(2030, 1, 1), responsable="-")
+            for i in range(options['planes'] + 3 * n)
+        ])
+        tipos, tipos_libres = tipos[:5], tipos[5:]
+        medidas, medidas_libres = medidas[:options['medidas']], medidas[options['medidas']:]
+        organismos, organismos_libres = organismos[:options['organismos']], organismos[options['organismos']:]
+        planes, planes_libres = planes[:options['planes']], planes[options['planes']:]
+
+        relaciones = PlanOrganismoSectorial.objects.bulk_create([
+            PlanOrganismoSectorial(id_plan=rnd.choice(planes), id_organismo_sectorial=rnd.choice(organismos),
+                                   id_media=rnd.choice(medidas))
+            for _ in range(options['relaciones'] + 2 * n)
+        ])
+        relaciones, relaciones_libres = relaciones[:options['relaciones']], relaciones[options['relaciones']:]
+
+        inicio = date(2020, 1, 1)
+        reportes = Reporte.objects.bulk_create((
+            Reporte(id_plan_organismo_sectorial=rnd.choice(relaciones), valor_reportado=rnd.randint(0, 100),
+                    evidencia="-", fecha_reporte=inicio + timedelta(days=rnd.randint(0, 1800)))
+            for _ in range(options['reportes'] + 2 * n)
+        ), batch_size=2000)
+        reportes_libres = reportes[options['reportes']:]
+        ReporteResumenMensual.recalcular([relacion.pk for relacion in relaciones])
+
+        return {
+            'tipomedida': tipos, 'medida': medidas, 'organismosectorial': organismos, 'plan': planes,
+            'planorganismosectorial': relaciones, 'reporte': reportes[:options['reportes']],
+            'libres': {
+                'tipomedida': tipos_libres, 'medida': medidas_libres, 'organismosectorial': organismos_libres,
+                'plan': planes_libres, 'planorganismosectorial': relaciones_libres, 'reporte': reportes_libres,
+            },
+        }
+
+    def cliente(self):
+        usuario = User.objects.create_user(username='bench-api', password='bench-api')
+        for nombre in (ADMINISTRADOR, ORGANISMO_SECTORIAL):
+            grupo, _ = Group.objects.get_or_create(name=nombre)
+            usuario.groups.add(grupo)
+        cliente = APIClient()
+        cliente.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(usuario)}')
+        return cliente, usuario
+
+    # Escenarios
+
+    def escenarios(self, datos):
+        """
+        ``(nombre, escenario)`` por cada ruta del router y por ``/api/metrics``.
+        Un escenario es una función ``i -> (método, url, cuerpo)``.
+        """
+        for prefijo, viewset, basename in router.registry:
+            objetos = datos[basename]
+            libres = datos['libres'][basename]
+            lista = reverse(f'{basename}-list')
+
+            def detalle(pk, basename=basename):
+                return reverse(f'{basename}-detail', args=[pk])
+
+            yield f'GET {basename}-list', lambda i, lista=lista: ('get', lista, None)
+            yield f'GET {basename}-detail', lambda i, o=objetos, d=detalle: ('get', d(o[i % len(o)].pk), None)
+            yield f'POST {basename}-list', lambda i, b=basename, l=lista: ('post', l, self.alta(b, i, datos))
+            yield f'PATCH {basename}-detail', lambda i, o=objetos, d=detalle: ('patch', d(o[i % len(o)].pk), {})
+            yield f'DELETE {basename}-detail', lambda i, o=libres, d=detalle: ('delete', d(o[2 * i].pk), None)
+
+            for accion in viewset.get_extra_actions():
+                nombre = f'{basename}-{accion.url_name}'
+                url = reverse(nombre)
+                if accion.__name__ == 'export':
+                    yield f'GET {nombre}', lambda i, url=url: ('get', f'{url}?format=csv', None)
+                elif accion.__name__ == 'resumen':
+                    yield f'GET {nombre}', lambda i, url=url: ('get', f'{url}?group_by=medida&period=month', None)
+                elif accion.__name__ == 'bulk_create':
+                    yield f'POST {nombre}', lambda i, url=url: (
+                        'post', url, [self.alta('reporte', i * 20 + j, datos) for j in range(20)]
+                    )
+                elif accion.__name__ == 'bulk_destroy':
+                    yield f'POST {nombre}', lambda i, o=libres, url=url: ('post', url, {'ids': [o[2 * i + 1].pk]})
+                elif accion.__name__ == 'importar':
+                    yield f'POST {nombre}', lambda i, b=basename, url=url: ('post', url, self.importacion(b, datos))
+                else:
+                    self.stdout.write(self.style.WARNING(f"Sin escenario para la acción {nombre}; se omite."))
+
+        yield 'GET metrics', lambda i: ('get', reverse('metrics'), None)
+
+    def alta(self, basename, i, datos):
+        if basename == 'tipomedida':
+            return {'nombre': f'bench-alta-{i}', 'descripcion': 'bench'}
+        if basename == 'medida':
+            return {'id_tipo_medida': datos['tipomedida'][0].pk, 'nombre_corto': f'bench-alta-{i}',
+                    'indicador': '-', 'forma_calculo': '-', 'frecuencia_reporte': 'Mensual'}
+        if basename == 'organismosectorial':
+            return {'nombre': f'bench-alta-{i}', 'tipo': '-', 'contacto': '-'}
+        if basename == 'plan':
+            return {'nombre': f'bench-alta-{i}', 'descripcion': '-', 'fecha_inicio': '2020-01-01',
+                    'fecha_termino': '2030-01-01', 'responsable': '-'}
+        if basename == 'planorganismosectorial':
+            # Plan sin relaciones para que el chequeo de duplicados no rechace el alta.
+            return {'id_plan': datos['libres']['plan'][self.por_iteracion * 2 + i].pk,
+                    'id_organismo_sectorial': datos['organismosectorial'][0].pk,
+                    'id_media': [medida.pk for medida in datos['medida'][:3]]}
+        relaciones = datos['planorganismosectorial']
+        return {'id_plan_organismo_sectorial': relaciones[i % len(relaciones)].pk, 'valor_reportado': '10.00',
+                'evidencia': 'bench', 'fecha_reporte': '2024-01-15'}
+
+    def importacion(self, basename, datos):
+        # 20 filas que tras la primera iteración se actualizan (upsert).
+        filas = [self.alta(basename, j, datos) for j in range(20)]
+        for fila in filas:
+            if basename == 'medida':
+                fila['id_tipo_medida'] = datos['tipomedida'][0].nombre
+            for campo in ('nombre', 'nombre_corto'):
+                if campo in fila:
+                    fila[campo] = fila[campo].replace('bench-alta', 'bench-import')
+        columnas = list(filas[0])
+        contenido = '\n'.join([','.join(columnas)] + [','.join(str(fila[c]) for c in columnas) for fila in filas])
+        return {'archivo': SimpleUploadedFile('bench.csv', contenido.encode('utf-8'), content_type='text/csv')}
+
+    # Medición
+
+    def medir(self, cliente, escenario, calentamiento, iteraciones):
+        for i in range(calentamiento):
+            self._solicitar(cliente, *escenario(i))
+
+        duraciones = []
+        consultas = []
+        errores = 0
+        for i in range(calentamiento, calentamiento + iteraciones):
+            metodo, url, cuerpo = escenario(i)
+            with CaptureQueriesContext(connection) as capturadas:
+                inicio = time.perf_counter()
+                response = self._solicitar(cliente, metodo, url, cuerpo)
+                duraciones.append(time.perf_counter() - inicio)
+            consultas.append(len(capturadas))
+            if response.status_code >= 400:
+                errores += 1
+
+        p50, p95, p99 = (statistics.quantiles(duraciones, n=100, method='inclusive')[k] for k in (49, 94, 98))
+        return {
+            'p50_ms': round(p50 * 1000, 3),
+            'p95_ms': round(p95 * 1000, 3),
+            'p99_ms': round(p99 * 1000, 3),
+            'rps': round(len(duraciones) / sum(duraciones), 1),
+            'queries': max(consultas),
+            'errores': errores,
+        }
+
+    def calibrar(self, calentamiento, iteraciones):
+        """
+        p50 en ms de una carga fija que no depende del código de la API. Las
+        latencias se guardan también divididas por este valor, que escala con
+        la máquina y con la carga del momento.
+        """
+        duraciones = []
+        for i in range(calentamiento + max(iteraciones, 20)):
+            inicio = time.perf_counter()
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+                cursor.fetchone()
+            json.loads(json.dumps(_FILAS_CALIBRACION))
+            if i >= calentamiento:
+                duraciones.append(time.perf_counter() - inicio)
+        return round(statistics.median(duraciones) * 1000, 3)
+
+    def _solicitar(self, cliente, metodo, url, cuerpo):
+        formato = 'multipart' if isinstance(cuerpo, dict) and 'archivo' in cuerpo else 'json'
+        response = getattr(cliente, metodo)(url, cuerpo, format=formato)
+        if getattr(response, 'streaming', False):
+            b''.join(response.streaming_content)
+        return response
+
+    def rss_maximo(self):
+        if resource is None:
+            return None
+        # ru_maxrss está en KB en Linux.
+        return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+    # Resultados
+
+    def comparar(self, actual, baseline, tolerancia, margen_ms):
+        """
+        ``(regresiones, avisos)``: las consultas por solicitud no dependen de
+        la máquina y siempre cuentan; la latencia relativa a la calibración y
+        el RSS sí dependen, y quedan como avisos.
+        """
+        regresiones = []
+        avisos = []
+        # El margen absoluto, en unidades de la calibración de esta corrida.
+        margen_rel = margen_ms / actual['calibracion_ms']
+        for nombre, base in baseline.get('escenarios', {}).items():
+            resultado = actual['escenarios'].get(nombre)
+            if resultado is None:
+                continue
+            if resultado['queries'] > base['queries']:
+                regresiones.append(f"{nombre}: {resultado['queries']} consultas > {base['queries']}")
+            if 'p95_rel' in base:
+                limite = base['p95_rel'] * (1 + tolerancia) + margen_rel
+                if resultado['p95_rel'] > limite:
+                    avisos.append(f"{nombre}: p95 {resultado['p95_rel']}x calibración > {limite:.2f}x")
+        base_rss = baseline.get('peak_rss_mb')
+        if base_rss and actual['peak_rss_mb'] is not None:
+            limite = base_rss * (1 + tolerancia)
+            if actual['peak_rss_mb'] > limite:
+                avisos.append(f"RSS máximo {actual['peak_rss_mb']} MB > {limite:.1f} MB")
+        return regresiones, avisos
+
+    def imprimir(self, resultados, rss, calibracion):
+        self.stdout.write(f"Motor: {connection.vendor}\nCalibración: {calibracion} ms\n")
+        encabezado = (
+            f"{'escenario':<45} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'p95/cal':>8} {'req/s':>8} "
+            f"{'consultas':>9} {'errores':>7}"
+        )
+        self.stdout.write(self.style.MIGRATE_HEADING(encabezado))
+        for nombre, r in resultados.items():
+            self.stdout.write(
+                f"{nombre:<45} {r['p50_ms']:>9} {r['p95_ms']:>9} {r['p99_ms']:>9} {r['p95_rel']:>8} {r['rps']:>8} "
+                f"{r['queries']:>9} {r['errores']:>7}"
+            )
+        self.stdout.write(f"\nRSS máximo: {rss if rss is not None else 'no disponible'} MB")
+
+    def _escribir(self, ruta, contenido):
+        with open(ruta, 'w', encoding='utf-8') as archivo:
+            json.dump(contenido, archivo, indent=2, ensure_ascii=False)
+            archivo.write('\n')
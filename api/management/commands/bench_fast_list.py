@@ -0,0 +1,108 @@
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from api.catalog_cache import invalidar_catalogo
+from api.fast_list import proyectar
+from api.models import TipoMedida, Medida, OrganismoSectorial, Plan, PlanOrganismoSectorial, Reporte
+from api.pagination import KeysetPagination
+from api.urls import router
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara el tiempo de serializar los listados con su serializer y con la lectura "
+        "rápida (values() + Proyeccion) para cada viewset, con N filas por modelo. Los datos "
+        "se cargan dentro de una transacción que se revierte al terminar."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--filas', type=int, nargs='+', default=[10000, 100000],
+                            help="Filas por modelo; se mide cada cantidad por separado.")
+        parser.add_argument('--repeticiones', type=int, default=3,
+                            help="Mediciones por camino; se informa la mejor.")
+        parser.add_argument('--lote', type=int, default=5000, help="Filas por bulk_create.")
+
+    def handle(self, *args, **options):
+        if min(options['filas']) < 1 or options['repeticiones'] < 1:
+            raise CommandError("--filas y --repeticiones deben ser al menos 1.")
+
+        self.stdout.write(f"{'viewset':<28} {'filas':>8} {'serializer ms':>14} {'rápida ms':>10} {'veces':>6}")
+        for filas in options['filas']:
+            try:
+                with transaction.atomic():
+                    self.cargar(filas, options['lote'])
+                    for _, viewset, basename in router.registry:
+                        serializer_ms, rapida_ms = self.medir(viewset, options['repeticiones'])
+                        self.stdout.write(
+                            f"{basename:<28} {filas:>8} {serializer_ms:>14.1f} {rapida_ms:>10.1f} "
+                            f"{serializer_ms / rapida_ms:>5.1f}x"
+                        )
+                    raise _Rollback
+            except _Rollback:
+                pass
+        invalidar_catalogo(TipoMedida, Medida, OrganismoSectorial)
+
+    def cargar(self, filas, lote):
+        prefijo = f'bench-fast-{filas}'
+        hoy = date.today()
+        tipos = TipoMedida.objects.bulk_create([
+            TipoMedida(nombre=f'{prefijo}-{i}', descripcion='Descripción de prueba') for i in range(filas)
+        ], batch_size=lote)
+        medidas = Medida.objects.bulk_create([
+            Medida(id_tipo_medida=tipos[i % len(tipos)], nombre_corto=f'{prefijo}-{i}', indicador='Indicador',
+                   forma_calculo='Suma', frecuencia_reporte='Mensual')
+            for i in range(filas)
+        ], batch_size=lote)
+        organismos = OrganismoSectorial.objects.bulk_create([
+            OrganismoSectorial(nombre=f'{prefijo}-{i}', tipo='Público', contacto='contacto@test.cl')
+            for i in range(filas)
+        ], batch_size=lote)
+        planes = Plan.objects.bulk_create([
+            Plan(nombre=f'{prefijo}-{i}', descripcion='-', fecha_inicio=hoy, fecha_termino=hoy + timedelta(days=365),
+                 responsable='-', estado='en_progreso')
+            for i in range(filas)
+        ], batch_size=lote)
+        relaciones = PlanOrganismoSectorial.objects.bulk_create([
+            PlanOrganismoSectorial(id_plan=planes[i], id_organismo_sectorial=organismos[i], id_media=medidas[i])
+            for i in range(filas)
+        ], batch_size=lote)
+        Reporte.objects.bulk_create([
+            Reporte(id_plan_organismo_sectorial=relaciones[i], valor_reportado=Decimal(i % 100000) / 100,
+                    evidencia='-', fecha_reporte=hoy - timedelta(days=i % 3650))
+            for i in range(filas)
+        ], batch_size=lote)
+
+    def medir(self, viewset, repeticiones):
+        """
+        Mejor tiempo (ms) de cada camino sobre el mismo queryset y el mismo
+        orden que el listado, incluida la consulta.
+        """
+        queryset = viewset.queryset.all().order_by(*KeysetPagination.ordering)
+        serializer_class = viewset.serializer_class
+        proyeccion = proyectar(serializer_class())
+
+        def por_serializer():
+            return serializer_class(list(queryset), many=True).data
+
+        def rapida():
+            return proyeccion.representar(queryset.values(*proyeccion.nombres))
+
+        if por_serializer() != rapida():
+            raise CommandError(f"{viewset.__name__}: la lectura rápida no coincide con el serializer.")
+        return self.mejor(por_serializer, repeticiones), self.mejor(rapida, repeticiones)
+
+    def mejor(self, funcion, repeticiones):
+        tiempos = []
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            funcion()
+            tiempos.append(time.perf_counter() - inicio)
+        return min(tiempos) * 1000
@@ -0,0 +1,105 @@
+import random
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from api.models import TipoMedida, Medida, OrganismoSectorial, Plan, PlanOrganismoSectorial, Reporte
+
+# Índices parciales (is_active=True) que se comparan.
+INDICES_PARCIALES = ['planorgsect_activo_idx', 'reporte_pos_activo_idx', 'reporte_fecha_activo_idx']
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Muestra el plan de ejecución (EXPLAIN) de los accesos filtrados por is_active "
+        "con y sin los índices parciales. Los datos de prueba se cargan dentro de una "
+        "transacción que se revierte al terminar."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reportes', type=int, default=50000, help="Cantidad de reportes a generar.")
+        parser.add_argument('--semilla', type=int, default=1379, help="Semilla para datos reproducibles.")
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                consultas = self.cargar_datos(options['reportes'], random.Random(options['semilla']))
+                self.analizar()
+                con_indices = self.explicar(consultas)
+                with connection.cursor() as cursor:
+                    for nombre in INDICES_PARCIALES:
+                        cursor.execute(f"DROP INDEX {connection.ops.quote_name(nombre)}")
+                self.analizar()
+                sin_indices = self.explicar(consultas)
+                raise _Rollback
+        except _Rollback:
+            pass
+
+        self.stdout.write(f"Motor: {connection.vendor}\n")
+        for nombre in consultas:
+            self.stdout.write(self.style.MIGRATE_HEADING(nombre))
+            self.stdout.write("  sin índices parciales:")
+            self.stdout.write(self._indentar(sin_indices[nombre]))
+            self.stdout.write("  con índices parciales:")
+            self.stdout.write(self._indentar(con_indices[nombre]))
+
+    def cargar_datos(self, cantidad_reportes, rnd):
+        tipo = TipoMedida.objects.create(nombre="explain-tipo", descripcion="explain")
+        medidas = Medida.objects.bulk_create([
+            Medida(id_tipo_medida=tipo, nombre_corto=f"explain-{i}", indicador="-",
+                   forma_calculo="-", frecuencia_reporte="Mensual")
+            for i in range(50)
+        ])
+        organismos = OrganismoSectorial.objects.bulk_create([
+            OrganismoSectorial(nombre=f"explain-{i}", tipo="-", contacto="-") for i in range(20)
+        ])
+        planes = Plan.objects.bulk_create([
+            Plan(nombre=f"explain-{i}", descripcion="-", fecha_inicio=date(2020, 1, 1),
+                 fecha_termino=date(2030, 1, 1), responsable="-")
+            for i in range(20)
+        ])
+        relaciones = PlanOrganismoSectorial.objects.bulk_create([
+            PlanOrganismoSectorial(id_plan=plan, id_organismo_sectorial=org, id_media=rnd.choice(medidas),
+                                   is_active=rnd.random() > 0.1)
+            for plan in planes for org in organismos
+        ])
+        inicio = date(2020, 1, 1)
+        Reporte.objects.bulk_create((
+            Reporte(id_plan_organismo_sectorial=rnd.choice(relaciones), valor_reportado=rnd.randint(0, 100),
+                    evidencia="-", fecha_reporte=inicio + timedelta(days=rnd.randint(0, 1800)),
+                    is_active=rnd.random() > 0.1)
+            for _ in range(cantidad_reportes)
+        ), batch_size=2000)
+
+        relacion = relaciones[0]
+        return {
+            "Reporte por id_plan_organismo_sectorial": Reporte.objects.filter(
+                is_active=True, id_plan_organismo_sectorial=relacion.id
+            ),
+            "Reporte por rango de fecha_reporte": Reporte.objects.filter(
+                is_active=True, fecha_reporte__range=(date(2022, 1, 1), date(2022, 1, 31))
+            ),
+            "PlanOrganismoSectorial duplicados en create": PlanOrganismoSectorial.objects.filter(
+                id_plan_id=relacion.id_plan_id,
+                id_organismo_sectorial_id=relacion.id_organismo_sectorial_id,
+                id_media_id__in=[m.id for m in medidas[:5]],
+            ).values_list('id_media_id', flat=True),
+        }
+
+    def analizar(self):
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute("ANALYZE api_reporte, api_planorganismosectorial")
+            else:
+                cursor.execute("ANALYZE")
+
+    def explicar(self, consultas):
+        return {nombre: queryset.explain() for nombre, queryset in consultas.items()}
+
+    def _indentar(self, texto):
+        return "\n".join(f"    {linea}" for linea in texto.splitlines())
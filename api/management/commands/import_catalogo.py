@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.imports import IMPORT_CHUNK_SIZE, ArchivoInvalido, ImportMixin, formato_de, importar_filas, leer_archivo
+from api.urls import router
+
+# prefijo de la ruta -> viewset con POST <prefijo>/import/
+CATALOGOS = {prefijo: viewset for prefijo, viewset, _ in router.registry if issubclass(viewset, ImportMixin)}
+
+
+class Command(BaseCommand):
+    help = (
+        "Importa un CSV o XLSX a un catálogo con las mismas reglas que POST <catálogo>/import/: "
+        "upsert por lotes y, si alguna fila tiene errores, no se guarda ninguna."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('catalogo', choices=sorted(CATALOGOS), help="Catálogo de destino.")
+        parser.add_argument('archivo', help="Ruta del archivo .csv o .xlsx.")
+        parser.add_argument('--formato', choices=['csv', 'xlsx'],
+                            help="Formato del archivo (por omisión, según la extensión).")
+        parser.add_argument('--lote', type=int, default=IMPORT_CHUNK_SIZE, help="Filas por bulk_create.")
+
+    def handle(self, *args, **options):
+        if options['lote'] < 1:
+            raise CommandError("--lote debe ser al menos 1.")
+        viewset = CATALOGOS[options['catalogo']]
+        clase = viewset.import_serializer_class
+        formato = options['formato'] or formato_de(options['archivo'])
+        try:
+            with open(options['archivo'], 'rb') as archivo:
+                columnas, filas = leer_archivo(archivo, formato, list(clase().fields))
+                guardadas, errores = importar_filas(clase, columnas, filas, viewset.import_key, options['lote'])
+        except OSError as error:
+            raise CommandError(f"No se pudo abrir el archivo: {error}.")
+        except ArchivoInvalido as error:
+            raise CommandError(str(error))
+
+        if errores:
+            for error in errores:
+                self.stderr.write(f"Fila {error['fila']}: {error['errores']}")
+            raise CommandError(f"{len(errores)} filas con errores; no se importó ninguna.")
+        self.stdout.write(self.style.SUCCESS(f"{guardadas} filas importadas en {options['catalogo']}."))
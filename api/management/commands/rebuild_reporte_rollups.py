@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from api.models import PlanOrganismoSectorial, ReporteResumenMensual
+
+
+class Command(BaseCommand):
+    help = (
+        "Reconstruye ReporteResumenMensual desde Reporte, por lotes de relaciones "
+        "plan-organismo-medida (cada lote en su propia transacción)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=500, help="Relaciones por lote.")
+
+    def handle(self, *args, **options):
+        lote = options['lote']
+        relaciones = PlanOrganismoSectorial.all_objects.order_by('pk').values_list('pk', flat=True)
+        ultimo = 0
+        total = 0
+        while True:
+            ids = list(relaciones.filter(pk__gt=ultimo)[:lote])
+            if not ids:
+                break
+            ReporteResumenMensual.recalcular(ids)
+            total += len(ids)
+            ultimo = ids[-1]
+            self.stdout.write(f"{total} relaciones procesadas")
+        self.stdout.write(self.style.SUCCESS(
+            f"Resumen mensual reconstruido: {ReporteResumenMensual.objects.count()} filas."
+        ))
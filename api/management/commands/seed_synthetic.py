@@ -0,0 +1,182 @@
+import multiprocessing
+import os
+import random
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections, transaction
+from django.utils import timezone
+
+from api.models import TipoMedida, Medida, OrganismoSectorial, Plan, PlanOrganismoSectorial
+from api.synthetic import (
+    RELACIONES_POR_TAREA, REPORTES_POR_TAREA, configurar_proceso, iniciar_proceso, insertar_reportes,
+    recalcular_resumen
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Genera datos sintéticos (tipos de medida, medidas, organismos, planes, relaciones "
+        "y reportes) con cardinalidades y sesgo de fechas configurables. Los reportes se "
+        "insertan con bulk_create en lotes grandes repartidos entre varios procesos."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tipos', type=int, default=10, help="Cantidad de tipos de medida.")
+        parser.add_argument('--medidas', type=int, default=500, help="Cantidad de medidas.")
+        parser.add_argument('--organismos', type=int, default=50, help="Cantidad de organismos sectoriales.")
+        parser.add_argument('--planes', type=int, default=200, help="Cantidad de planes.")
+        parser.add_argument(
+            '--relaciones-por-plan', type=int, default=25,
+            help="Promedio de relaciones plan-organismo-medida por plan (entre 1 y el doble)."
+        )
+        parser.add_argument('--reportes', type=int, default=1000000, help="Cantidad de reportes.")
+        parser.add_argument('--desde', type=date.fromisoformat, default=date(2018, 1, 1),
+                            help="Primera fecha de reporte (AAAA-MM-DD).")
+        parser.add_argument('--hasta', type=date.fromisoformat, default=None,
+                            help="Última fecha de reporte (por omisión, hoy).")
+        parser.add_argument(
+            '--sesgo-fechas', type=float, default=2.0,
+            help="Mayor a 1 concentra los reportes en las fechas recientes; 1 es uniforme."
+        )
+        parser.add_argument(
+            '--sesgo-relaciones', type=float, default=1.0,
+            help="Exponente Zipf del reparto de reportes entre relaciones; 0 es uniforme."
+        )
+        parser.add_argument('--inactivos', type=float, default=0.05,
+                            help="Proporción de registros con borrado lógico.")
+        parser.add_argument('--lote', type=int, default=5000, help="Filas por bulk_create.")
+        parser.add_argument('--procesos', type=int, default=os.cpu_count() or 1,
+                            help="Procesos que insertan reportes en paralelo.")
+        parser.add_argument('--prefijo', default='sintetico', help="Prefijo de los nombres generados.")
+        parser.add_argument('--semilla', type=int, default=1379, help="Semilla para datos reproducibles.")
+        parser.add_argument('--sin-resumen', action='store_true',
+                            help="No reconstruye ReporteResumenMensual al terminar.")
+
+    def handle(self, *args, **options):
+        hasta = options['hasta'] or timezone.localdate()
+        if hasta < options['desde']:
+            raise CommandError("--hasta no puede ser anterior a --desde.")
+        if min(options['tipos'], options['medidas'], options['organismos'], options['planes'],
+               options['relaciones_por_plan'], options['lote'], options['procesos']) < 1:
+            raise CommandError("Las cantidades, el lote y los procesos deben ser al menos 1.")
+        prefijo = options['prefijo']
+        if Plan.all_objects.filter(nombre__startswith=f'{prefijo}-').exists():
+            raise CommandError(f"Ya existen datos con el prefijo '{prefijo}'; use otro --prefijo.")
+
+        rnd = random.Random(options['semilla'])
+        inicio = time.perf_counter()
+        relaciones = self.cargar_catalogo(options, rnd)
+        self.stdout.write(f"{len(relaciones)} relaciones plan-organismo-medida creadas.")
+
+        procesos = options['procesos']
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            # Otro proceso no ve una base en memoria.
+            procesos = 1
+        if procesos > 1:
+            if connection.vendor == 'sqlite':
+                # Con WAL los lectores no bloquean al proceso que escribe.
+                with connection.cursor() as cursor:
+                    cursor.execute('PRAGMA journal_mode = WAL')
+            # Las conexiones abiertas no se comparten con los procesos hijos.
+            connections.close_all()
+
+        # Pesos Zipf acumulados sobre un orden aleatorio de las relaciones.
+        rnd.shuffle(relaciones)
+        pesos = []
+        acumulado = 0.0
+        for rango in range(len(relaciones)):
+            acumulado += 1 / (rango + 1) ** options['sesgo_relaciones']
+            pesos.append(acumulado)
+
+        dias = (hasta - options['desde']).days
+        tareas = [
+            (options['semilla'] * 1000003 + indice, min(REPORTES_POR_TAREA, options['reportes'] - primero),
+             options['desde'], dias, options['sesgo_fechas'], options['inactivos'], options['lote'])
+            for indice, primero in enumerate(range(0, options['reportes'], REPORTES_POR_TAREA))
+        ]
+        self.ejecutar(
+            insertar_reportes, tareas, procesos, (relaciones, pesos), options['reportes'], "reportes", inicio
+        )
+
+        if not options['sin_resumen']:
+            ids = sorted(relaciones)
+            lotes = [ids[i:i + RELACIONES_POR_TAREA] for i in range(0, len(ids), RELACIONES_POR_TAREA)]
+            # recalcular() lee y luego escribe en la misma transacción; en SQLite
+            # otro escritor la invalida ("database is locked") en vez de esperar.
+            procesos_resumen = 1 if connection.vendor == 'sqlite' else procesos
+            self.ejecutar(recalcular_resumen, lotes, procesos_resumen, (relaciones, pesos), len(ids),
+                          "relaciones resumidas", inicio)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Datos sintéticos generados en {time.perf_counter() - inicio:.1f} s."
+        ))
+
+    def cargar_catalogo(self, options, rnd):
+        """
+        Crea el catálogo, los planes y las relaciones (antes que los reportes,
+        que las referencian) y devuelve los IDs de las relaciones.
+        """
+        prefijo = options['prefijo']
+        inactivos = options['inactivos']
+        lote = options['lote']
+        with transaction.atomic():
+            tipos = TipoMedida.objects.bulk_create([
+                TipoMedida(nombre=f'{prefijo}-{i}', descripcion='sintético') for i in range(options['tipos'])
+            ], batch_size=lote)
+            medidas = Medida.objects.bulk_create([
+                Medida(id_tipo_medida=rnd.choice(tipos), nombre_corto=f'{prefijo}-{i}', indicador='-',
+                       forma_calculo='-', frecuencia_reporte=rnd.choice(['Mensual', 'Trimestral', 'Anual']),
+                       is_active=rnd.random() >= inactivos)
+                for i in range(options['medidas'])
+            ], batch_size=lote)
+            organismos = OrganismoSectorial.objects.bulk_create([
+                OrganismoSectorial(nombre=f'{prefijo}-{i}', tipo='-', contacto='-', is_active=rnd.random() >= inactivos)
+                for i in range(options['organismos'])
+            ], batch_size=lote)
+            estados = [estado for estado, _ in Plan.ESTADO_CHOICES]
+            planes = Plan.objects.bulk_create([
+                Plan(nombre=f'{prefijo}-{i}', descripcion='sintético', fecha_inicio=options['desde'],
+                     fecha_termino=options['desde'] + timedelta(days=3650), responsable='-',
+                     estado=rnd.choice(estados), is_active=rnd.random() >= inactivos)
+                for i in range(options['planes'])
+            ], batch_size=lote)
+
+            combinaciones = len(organismos) * len(medidas)
+            filas = []
+            for plan in planes:
+                cantidad = min(rnd.randint(1, 2 * options['relaciones_por_plan']), combinaciones)
+                # Sin triples repetidos: el alta por la API los rechaza.
+                for combinacion in rnd.sample(range(combinaciones), cantidad):
+                    organismo, medida = divmod(combinacion, len(medidas))
+                    filas.append(PlanOrganismoSectorial(
+                        id_plan=plan, id_organismo_sectorial=organismos[organismo], id_media=medidas[medida],
+                        is_active=rnd.random() >= inactivos
+                    ))
+            relaciones = PlanOrganismoSectorial.objects.bulk_create(filas, batch_size=lote)
+        return [relacion.pk for relacion in relaciones]
+
+    def ejecutar(self, funcion, tareas, procesos, estado, total, unidad, inicio):
+        """
+        Ejecuta ``funcion`` sobre cada tarea, en este proceso o repartidas en
+        ``procesos`` procesos nuevos (spawn: no heredan conexiones abiertas).
+        """
+        hechos = 0
+
+        def avance(cantidad):
+            nonlocal hechos
+            hechos += cantidad
+            segundos = time.perf_counter() - inicio
+            self.stdout.write(f"{hechos}/{total} {unidad} ({segundos:.1f} s)")
+
+        if procesos == 1 or len(tareas) <= 1:
+            configurar_proceso(*estado)
+            for tarea in tareas:
+                avance(funcion(tarea))
+            return
+
+        contexto = multiprocessing.get_context('spawn')
+        with contexto.Pool(min(procesos, len(tareas)), initializer=iniciar_proceso, initargs=estado) as pool:
+            for cantidad in pool.imap_unordered(funcion, tareas):
+                avance(cantidad)
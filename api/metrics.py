@@ -0,0 +1,346 @@
+"""
+Métricas de la API en formato de texto de Prometheus.
+
+``MetricsMiddleware`` registra por vista, acción, método y estado: latencia
+(histograma), cantidad y tiempo de consultas SQL (un ``execute_wrapper`` por
+conexión, ver ``instalar_medicion``) y tamaño de la respuesta.
+``MetricsView`` (``/api/metrics``) las expone.
+
+Con varios workers de gunicorn cada proceso tiene sus propios contadores;
+definiendo ``API_METRICS_MULTIPROC_DIR`` cada worker vuelca los suyos a un
+archivo en ese directorio y el endpoint suma todos. El directorio debe
+vaciarse al (re)iniciar el servidor. Las métricas del pool de conexiones son
+por worker (etiqueta ``pid``) y solo se exponen las de los procesos vivos.
+"""
+import atexit
+import json
+import os
+import threading
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from rest_framework.renderers import BaseRenderer
+
+from .backends.postgresql_pool.pool import pool_stats
+
+LATENCIA_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+TAMANO_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+ETIQUETAS = ('view', 'action', 'method', 'status')
+
+
+def _serie_vacia():
+    return {
+        'count': 0,
+        'latency_sum': 0.0,
+        'latency_buckets': [0] * len(LATENCIA_BUCKETS),
+        'queries': 0,
+        'query_seconds': 0.0,
+        'size_count': 0,
+        'size_sum': 0,
+        'size_buckets': [0] * len(TAMANO_BUCKETS),
+    }
+
+
+def _observar(buckets, limites, valor):
+    for indice, limite in enumerate(limites):
+        if valor <= limite:
+            buckets[indice] += 1
+
+
+def _sumar(destino, origen):
+    for nombre, valor in origen.items():
+        if isinstance(valor, list):
+            destino[nombre] = [a + b for a, b in zip(destino[nombre], valor)]
+        else:
+            destino[nombre] += valor
+
+
+class _Registro:
+    """
+    Contadores del proceso, indexados por ``ETIQUETAS``.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._series = {}
+        self._ultimo_volcado = 0.0
+
+    def registrar(self, etiquetas, duracion, consultas, tiempo_consultas, tamano):
+        with self._lock:
+            serie = self._series.get(etiquetas)
+            if serie is None:
+                serie = self._series[etiquetas] = _serie_vacia()
+            serie['count'] += 1
+            serie['latency_sum'] += duracion
+            _observar(serie['latency_buckets'], LATENCIA_BUCKETS, duracion)
+            serie['queries'] += consultas
+            serie['query_seconds'] += tiempo_consultas
+            if tamano is not None:
+                serie['size_count'] += 1
+                serie['size_sum'] += tamano
+                _observar(serie['size_buckets'], TAMANO_BUCKETS, tamano)
+        self.volcar()
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'series': [[list(etiquetas), dict(serie)] for etiquetas, serie in self._series.items()],
+                'pools': [[etiquetas, stats] for etiquetas, stats in pool_stats()],
+            }
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+    def volcar(self, forzar=False):
+        """
+        En modo multiproceso escribe el snapshot del proceso a su archivo
+        (como máximo una vez por segundo salvo ``forzar``).
+        """
+        directorio = _directorio()
+        if not directorio:
+            return
+        ahora = time.monotonic()
+        if not forzar and ahora - self._ultimo_volcado < 1:
+            return
+        self._ultimo_volcado = ahora
+        ruta = os.path.join(directorio, f'api-metrics-{os.getpid()}.json')
+        temporal = f'{ruta}.{threading.get_ident()}.tmp'
+        with open(temporal, 'w', encoding='utf-8') as archivo:
+            json.dump(self.snapshot(), archivo)
+        os.replace(temporal, ruta)
+
+
+registro = _Registro()
+atexit.register(lambda: registro.volcar(forzar=True))
+
+
+def _directorio():
+    return getattr(settings, 'API_METRICS_MULTIPROC_DIR', '')
+
+
+def _proceso_vivo(pid):
+    if os.name == 'nt':
+        # En Windows os.kill() termina el proceso en vez de consultarlo.
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _snapshots():
+    """
+    Snapshot de este proceso más, en modo multiproceso, los de los demás
+    workers (incluidos los que ya terminaron: los contadores no retroceden).
+    """
+    propio = registro.snapshot()
+    directorio = _directorio()
+    if not directorio:
+        return [(None, propio)]
+    snapshots = [(os.getpid(), propio)]
+    for nombre in sorted(os.listdir(directorio)):
+        if not (nombre.startswith('api-metrics-') and nombre.endswith('.json')):
+            continue
+        pid = int(nombre[len('api-metrics-'):-len('.json')])
+        if pid == os.getpid():
+            continue
+        try:
+            with open(os.path.join(directorio, nombre), encoding='utf-8') as archivo:
+                snapshots.append((pid, json.load(archivo)))
+        except (OSError, ValueError):
+            continue
+    return snapshots
+
+
+def _etiquetas(pares):
+    def escapar(valor):
+        return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return '{' + ','.join(f'{nombre}="{escapar(valor)}"' for nombre, valor in pares) + '}'
+
+
+def _numero(valor):
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+def exponer():
+    """
+    Texto en formato de exposición de Prometheus (versión 0.0.4).
+    """
+    series = {}
+    pools = []
+    for pid, snapshot in _snapshots():
+        for etiquetas, serie in snapshot['series']:
+            acumulada = series.setdefault(tuple(etiquetas), _serie_vacia())
+            _sumar(acumulada, serie)
+        # Un worker terminado no tiene pool: sus gauges quedarían fijos para
+        # siempre con su pid.
+        if pid is not None and pid != os.getpid() and not _proceso_vivo(pid):
+            continue
+        for etiquetas, stats in snapshot['pools']:
+            if pid is not None:
+                etiquetas = {**etiquetas, 'pid': pid}
+            pools.append((etiquetas, stats))
+
+    lineas = []
+
+    def metrica(nombre, tipo, ayuda):
+        lineas.append(f'# HELP {nombre} {ayuda}')
+        lineas.append(f'# TYPE {nombre} {tipo}')
+
+    def histograma(nombre, ayuda, limites, buckets, suma, cantidad):
+        metrica(nombre, 'histogram', ayuda)
+        for etiquetas, serie in sorted(series.items()):
+            pares = list(zip(ETIQUETAS, etiquetas))
+            if not serie[cantidad]:
+                continue
+            for limite, valor in zip(limites, serie[buckets]):
+                lineas.append(f'{nombre}_bucket{_etiquetas(pares + [("le", _numero(float(limite)))])} {valor}')
+            lineas.append(f'{nombre}_bucket{_etiquetas(pares + [("le", "+Inf")])} {serie[cantidad]}')
+            lineas.append(f'{nombre}_sum{_etiquetas(pares)} {_numero(serie[suma])}')
+            lineas.append(f'{nombre}_count{_etiquetas(pares)} {serie[cantidad]}')
+
+    def contador(nombre, ayuda, campo):
+        metrica(nombre, 'counter', ayuda)
+        for etiquetas, serie in sorted(series.items()):
+            lineas.append(f'{nombre}{_etiquetas(zip(ETIQUETAS, etiquetas))} {_numero(serie[campo])}')
+
+    histograma(
+        'api_request_duration_seconds', 'Latencia de las solicitudes.',
+        LATENCIA_BUCKETS, 'latency_buckets', 'latency_sum', 'count'
+    )
+    contador('api_db_queries_total', 'Consultas SQL ejecutadas.', 'queries')
+    contador('api_db_query_duration_seconds_total', 'Tiempo total en consultas SQL.', 'query_seconds')
+    histograma(
+        'api_response_size_bytes', 'Tamaño del cuerpo de la respuesta (sin respuestas en streaming).',
+        TAMANO_BUCKETS, 'size_buckets', 'size_sum', 'size_count'
+    )
+
+    if pools:
+        for nombre, campo, tipo, ayuda in (
+            ('api_db_pool_size', 'size', 'gauge', 'Conexiones abiertas del pool.'),
+            ('api_db_pool_in_use', 'in_use', 'gauge', 'Conexiones del pool en uso.'),
+            ('api_db_pool_utilization', 'utilization', 'gauge', 'Conexiones en uso / max_size.'),
+            ('api_db_pool_checkouts_total', 'checkouts', 'counter', 'Conexiones entregadas por el pool.'),
+            ('api_db_pool_waits_total', 'waits', 'counter', 'Entregas que esperaron una conexión libre.'),
+            ('api_db_pool_wait_seconds_total', 'wait_seconds_total', 'counter', 'Tiempo total esperando una conexión.'),
+            ('api_db_pool_wait_seconds_max', 'wait_seconds_max', 'gauge', 'Mayor espera por una conexión.'),
+            ('api_db_pool_timeouts_total', 'timeouts', 'counter', 'Esperas que superaron el timeout del pool.'),
+            ('api_db_pool_health_check_failures_total', 'health_check_failures', 'counter',
+             'Conexiones descartadas por fallar el SELECT 1.'),
+        ):
+            metrica(nombre, tipo, ayuda)
+            for etiquetas, stats in pools:
+                lineas.append(f'{nombre}{_etiquetas(sorted(etiquetas.items()))} {_numero(stats[campo])}')
+
+    return '\n'.join(lineas) + '\n'
+
+
+class _Consultas:
+    def __init__(self):
+        self.cantidad = 0
+        self.segundos = 0.0
+
+
+# Contador de la solicitud en curso. Las vistas asíncronas ejecutan el ORM en
+# otro hilo (con otra conexión), pero el contexto se copia a ese hilo.
+_consultas_actuales = ContextVar('api_metrics_consultas', default=None)
+
+
+def _medir_consulta(execute, sql, params, many, context):
+    consultas = _consultas_actuales.get()
+    if consultas is None:
+        return execute(sql, params, many, context)
+    inicio = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        consultas.cantidad += 1
+        consultas.segundos += time.perf_counter() - inicio
+
+
+def instalar_medicion(connection):
+    """
+    Agrega ``_medir_consulta`` a los ``execute_wrappers`` de la conexión (se
+    llama con la señal ``connection_created``). Va al inicio de la lista para
+    no interferir con los ``execute_wrapper()`` temporales.
+    """
+    if _medir_consulta not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, _medir_consulta)
+
+
+def _etiquetas_solicitud(request, response):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return ('', '', request.method, str(response.status_code))
+    acciones = getattr(match.func, 'actions', None) or {}
+    accion = acciones.get(request.method.lower(), '')
+    return (match.view_name or match._func_path, accion, request.method, str(response.status_code))
+
+
+def _tamano(response):
+    if getattr(response, 'streaming', False):
+        return None
+    return len(response.content)
+
+
+class MetricsMiddleware:
+    """
+    Mide cada solicitud y la agrega a ``registro``. Debe ir primero en
+    ``MIDDLEWARE`` para medir la solicitud completa. Admite vistas síncronas
+    y asíncronas.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.asincrono = iscoroutinefunction(get_response)
+        if self.asincrono:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.asincrono:
+            return self.__acall__(request)
+        consultas = _Consultas()
+        token = _consultas_actuales.set(consultas)
+        inicio = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _consultas_actuales.reset(token)
+        self._registrar(request, response, time.perf_counter() - inicio, consultas)
+        return response
+
+    async def __acall__(self, request):
+        consultas = _Consultas()
+        token = _consultas_actuales.set(consultas)
+        inicio = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _consultas_actuales.reset(token)
+        self._registrar(request, response, time.perf_counter() - inicio, consultas)
+        return response
+
+    def _registrar(self, request, response, duracion, consultas):
+        registro.registrar(
+            _etiquetas_solicitud(request, response), duracion, consultas.cantidad, consultas.segundos,
+            _tamano(response)
+        )
+
+
+class PrometheusRenderer(BaseRenderer):
+    media_type = 'text/plain'
+    format = 'prometheus'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, str):
+            return data.encode(self.charset)
+        # Errores (401/403): {"detail": ...}
+        return json.dumps(data, ensure_ascii=False).encode(self.charset)
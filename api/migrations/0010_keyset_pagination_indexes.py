@@ -0,0 +1,37 @@
+# Generated by Django 4.2.20 on 2026-10-17 22:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_medida_is_active_organismosectorial_is_active_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='medida',
+            index=models.Index(fields=['created_at', 'id'], name='medida_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='organismosectorial',
+            index=models.Index(fields=['created_at', 'id'], name='orgsectorial_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='plan',
+            index=models.Index(fields=['created_at', 'id'], name='plan_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='planorganismosectorial',
+            index=models.Index(fields=['created_at', 'id'], name='planorgsect_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reporte',
+            index=models.Index(fields=['created_at', 'id'], name='reporte_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tipomedida',
+            index=models.Index(fields=['created_at', 'id'], name='tipomedida_created_id_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.20 on 2026-10-17 22:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='planorganismosectorial',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['id_plan', 'id_organismo_sectorial', 'id_media'], name='planorgsect_activo_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reporte',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['id_plan_organismo_sectorial', 'fecha_reporte'], name='reporte_pos_activo_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reporte',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['fecha_reporte'], name='reporte_fecha_activo_idx'),
+        ),
+    ]
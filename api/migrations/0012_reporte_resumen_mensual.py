@@ -0,0 +1,32 @@
+# Generated by Django 4.2.20 on 2026-10-17 22:26
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_partial_active_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReporteResumenMensual',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mes', models.DateField()),
+                ('cantidad', models.PositiveIntegerField()),
+                ('suma', models.DecimalField(decimal_places=2, max_digits=20)),
+                ('minimo', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('maximo', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('ultimo_valor', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('id_plan_organismo_sectorial', models.ForeignKey(db_column='id_plan_organismo_sectorial', on_delete=django.db.models.deletion.DO_NOTHING, to='api.planorganismosectorial')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='reporteresumenmensual',
+            constraint=models.UniqueConstraint(fields=('id_plan_organismo_sectorial', 'mes'), name='reporte_resumen_mes_unico'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.20 on 2026-10-17 23:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_reporte_resumen_mensual'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='plan',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['estado'], name='plan_estado_activo_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reporte',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['valor_reportado'], name='reporte_valor_activo_idx'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+from django.db import migrations
+
+from api.search import desinstalar, instalar
+
+
+def crear_indices(apps, schema_editor):
+    instalar(schema_editor.connection)
+
+
+def eliminar_indices(apps, schema_editor):
+    desinstalar(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_list_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(crear_indices, eliminar_indices),
+    ]
@@ -1,4 +1,7 @@
-from django.db import models
+from datetime import date
+
+from django.db import models, transaction
+from django.db.models.functions import RowNumber, TruncMonth
 from django.utils import timezone
 
 class ActiveManager(models.Manager):
@@ -33,6 +36,11 @@ class TipoMedida(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='tipomedida_created_id_idx'),
+        ]
+
     objects = ActiveManager()
     all_objects = models.Manager()
 
@@ -69,6 +77,11 @@ class Medida(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='medida_created_id_idx'),
+        ]
+
     objects = ActiveManager()
     all_objects = models.Manager()
 
@@ -97,6 +110,11 @@ class OrganismoSectorial(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='orgsectorial_created_id_idx'),
+        ]
+
     objects = ActiveManager()
     all_objects = models.Manager()
 
@@ -138,6 +156,13 @@ class Plan(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='plan_created_id_idx'),
+            # filtro estado_plan de los listados de relaciones y reportes
+            models.Index(fields=['estado'], condition=models.Q(is_active=True), name='plan_estado_activo_idx'),
+        ]
+
     objects = ActiveManager()
     all_objects = models.Manager()
 
@@ -166,6 +191,17 @@ class PlanOrganismoSectorial(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='planorgsect_created_id_idx'),
+            # chequeo de duplicados en PlanOrganismoSectorialViewSet.create
+            models.Index(
+                fields=['id_plan', 'id_organismo_sectorial', 'id_media'],
+                condition=models.Q(is_active=True),
+                name='planorgsect_activo_idx',
+            ),
+        ]
+
     objects = ActiveManager()
     all_objects = models.Manager()
 
@@ -195,12 +231,165 @@ class Reporte(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='reporte_created_id_idx'),
+            models.Index(
+                fields=['id_plan_organismo_sectorial', 'fecha_reporte'],
+                condition=models.Q(is_active=True),
+                name='reporte_pos_activo_idx',
+            ),
+            models.Index(
+                fields=['fecha_reporte'],
+                condition=models.Q(is_active=True),
+                name='reporte_fecha_activo_idx',
+            ),
+            # filtros valor_min / valor_max
+            models.Index(
+                fields=['valor_reportado'],
+                condition=models.Q(is_active=True),
+                name='reporte_valor_activo_idx',
+            ),
+        ]
+
     objects = ActiveManager()
     all_objects = models.Manager()
 
+    def save(self, *args, **kwargs):
+        # El resumen mensual se actualiza en la misma transacción que el reporte.
+        with transaction.atomic():
+            anterior = None
+            if self.pk is not None:
+                anterior = Reporte.all_objects.filter(pk=self.pk).values_list(
+                    'id_plan_organismo_sectorial_id', 'fecha_reporte'
+                ).first()
+            super().save(*args, **kwargs)
+
+            fecha = self._meta.get_field('fecha_reporte').to_python(self.fecha_reporte)
+            buckets = {(self.id_plan_organismo_sectorial_id, fecha)}
+            if anterior is not None:
+                buckets.add(anterior)
+            for relacion_id, fecha in buckets:
+                ReporteResumenMensual.recalcular([relacion_id], fecha, fecha)
+
     def delete(self, using=None, keep_parents=False):
         self.is_active = False
         self.save()
 
     def __str__(self):
         return f"{self.id}"
+
+def _inicio_mes(fecha):
+    return fecha.replace(day=1)
+
+def _mes_siguiente(fecha):
+    if fecha.month == 12:
+        return date(fecha.year + 1, 1, 1)
+    return date(fecha.year, fecha.month + 1, 1)
+
+class ReporteResumenMensual(models.Model):
+    """
+    Resumen de los reportes activos por relación plan-organismo-medida y mes.
+
+    Se mantiene al guardar, editar o borrar lógicamente un Reporte (y en la
+    carga por lote); ``manage.py rebuild_reporte_rollups`` lo reconstruye
+    completo.
+
+    Attributes:
+        id_plan_organismo_sectorial (ForeignKey): Referencia a la relación entre el plan y el organismo sectorial.
+        mes (date): Primer día del mes resumido.
+        cantidad (int): Cantidad de reportes.
+        suma (Decimal): Suma de valor_reportado.
+        minimo (Decimal): Menor valor_reportado.
+        maximo (Decimal): Mayor valor_reportado.
+        ultimo_valor (Decimal): valor_reportado del reporte más reciente del mes.
+        updated_at (datetime): Fecha y hora de la última actualización del registro.
+    """
+    id_plan_organismo_sectorial = models.ForeignKey('PlanOrganismoSectorial', models.DO_NOTHING, db_column='id_plan_organismo_sectorial')
+    mes = models.DateField()
+    cantidad = models.PositiveIntegerField()
+    suma = models.DecimalField(max_digits=20, decimal_places=2)
+    minimo = models.DecimalField(max_digits=10, decimal_places=2)
+    maximo = models.DecimalField(max_digits=10, decimal_places=2)
+    ultimo_valor = models.DecimalField(max_digits=10, decimal_places=2)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['id_plan_organismo_sectorial', 'mes'], name='reporte_resumen_mes_unico'),
+        ]
+
+    @classmethod
+    def recalcular(cls, relacion_ids, desde=None, hasta=None):
+        """
+        Recalcula desde Reporte los meses entre ``desde`` y ``hasta`` (ambos
+        incluidos; ``None`` = sin límite) de las relaciones indicadas, con un
+        número fijo de consultas.
+        """
+        relacion_ids = list(relacion_ids)
+        if not relacion_ids:
+            return
+        reportes = Reporte.objects.filter(id_plan_organismo_sectorial__in=relacion_ids)
+        existentes = cls.objects.filter(id_plan_organismo_sectorial__in=relacion_ids)
+        if desde is not None:
+            reportes = reportes.filter(fecha_reporte__gte=_inicio_mes(desde))
+            existentes = existentes.filter(mes__gte=_inicio_mes(desde))
+        if hasta is not None:
+            reportes = reportes.filter(fecha_reporte__lt=_mes_siguiente(hasta))
+            existentes = existentes.filter(mes__lt=_mes_siguiente(hasta))
+
+        # Reporte más reciente de cada mes con una función de ventana: una
+        # subconsulta correlacionada en la agregación se evalúa por fila.
+        ultimos = {
+            (relacion_id, mes): valor
+            for relacion_id, mes, valor in reportes.annotate(
+                mes=TruncMonth('fecha_reporte'),
+                orden=models.Window(
+                    RowNumber(),
+                    partition_by=[models.F('id_plan_organismo_sectorial'), TruncMonth('fecha_reporte')],
+                    order_by=[models.F('fecha_reporte').desc(), models.F('id').desc()],
+                ),
+            ).filter(orden=1).values_list('id_plan_organismo_sectorial', 'mes', 'valor_reportado')
+        }
+        filas = (
+            reportes.annotate(mes=TruncMonth('fecha_reporte'))
+            .values('id_plan_organismo_sectorial', 'mes')
+            .annotate(
+                cantidad=models.Count('id'),
+                suma=models.Sum('valor_reportado'),
+                minimo=models.Min('valor_reportado'),
+                maximo=models.Max('valor_reportado'),
+            )
+            .order_by()
+        )
+        resumenes = [
+            cls(
+                id_plan_organismo_sectorial_id=fila['id_plan_organismo_sectorial'],
+                mes=fila['mes'],
+                cantidad=fila['cantidad'],
+                suma=fila['suma'],
+                minimo=fila['minimo'],
+                maximo=fila['maximo'],
+                ultimo_valor=ultimos[fila['id_plan_organismo_sectorial'], fila['mes']],
+            )
+            for fila in filas
+        ]
+
+        claves = {(resumen.id_plan_organismo_sectorial_id, resumen.mes) for resumen in resumenes}
+        with transaction.atomic():
+            obsoletos = [
+                pk for pk, relacion_id, mes in existentes.values_list('pk', 'id_plan_organismo_sectorial_id', 'mes')
+                if (relacion_id, mes) not in claves
+            ]
+            if obsoletos:
+                cls.objects.filter(pk__in=obsoletos).delete()
+            cls.objects.bulk_create(
+                resumenes,
+                batch_size=500,
+                update_conflicts=True,
+                unique_fields=['id_plan_organismo_sectorial', 'mes'],
+                update_fields=['cantidad', 'suma', 'minimo', 'maximo', 'ultimo_valor', 'updated_at'],
+            )
+
+    def __str__(self):
+        return f"{self.id_plan_organismo_sectorial_id} - {self.mes:%Y-%m}"
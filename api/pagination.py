@@ -0,0 +1,168 @@
+import base64
+import binascii
+import json
+from collections import OrderedDict
+from datetime import date, datetime
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def _keyset_filter(fields, values, descending):
+    """
+    Construye el filtro lexicográfico ``(a, b) > (x, y)`` (o ``<`` si es
+    descendente) para continuar desde la posición del cursor sin usar OFFSET.
+    """
+    lookup = 'lt' if descending else 'gt'
+    condicion = Q()
+    iguales = {}
+    for field, value in zip(fields, values):
+        condicion |= Q(**iguales, **{f'{field}__{lookup}': value})
+        iguales[field] = value
+    return condicion
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginación por cursor (keyset) ordenada por ``(created_at, id)``.
+
+    Cada página filtra a partir de la última fila entregada, por lo que una
+    página profunda cuesta lo mismo que la primera. El cliente puede elegir
+    el tamaño con ``page_size`` hasta ``max_page_size``.
+
+    La vista puede definir ``keyset_ordering`` (p. ej. un ranking de
+    búsqueda seguido de ``id``) para ordenar por otras columnas; la última
+    debe ser única.
+    """
+    ordering = ('created_at', 'id')
+    page_size = api_settings.PAGE_SIZE or 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Cursor inválido.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset, posicion, reverso = self._preparar(queryset, request, view)
+        return self._paginar(list(queryset), posicion, reverso)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        Igual que ``paginate_queryset`` pero lee la página con el ORM
+        asíncrono (para las vistas de lectura bajo ASGI).
+        """
+        queryset, posicion, reverso = self._preparar(queryset, request, view)
+        return self._paginar([obj async for obj in queryset.aiterator()], posicion, reverso)
+
+    def _preparar(self, queryset, request, view=None):
+        self.request = request
+        self.ordering = tuple(getattr(view, 'keyset_ordering', None) or type(self).ordering)
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+
+        posicion, reverso = self.decode_cursor(request)
+        orden = [f'-{f}' if reverso else f for f in self.ordering]
+        queryset = queryset.order_by(*orden)
+        if posicion is not None:
+            queryset = queryset.filter(_keyset_filter(self.ordering, posicion, reverso))
+        return queryset[:self.page_size + 1], posicion, reverso
+
+    def _paginar(self, resultados, posicion, reverso):
+        hay_mas = len(resultados) > self.page_size
+        self.page = resultados[:self.page_size]
+        if reverso:
+            self.page.reverse()
+            self.has_next = posicion is not None
+            self.has_previous = hay_mas
+        else:
+            self.has_next = hay_mas
+            self.has_previous = posicion is not None
+        return self.page
+
+    def get_page_size(self, request):
+        valor = request.query_params.get(self.page_size_query_param)
+        if valor is None:
+            return self.page_size
+        try:
+            page_size = int(valor)
+        except (TypeError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_position(self, instance):
+        if isinstance(instance, dict):
+            return [instance[field] for field in self.ordering]
+        return [getattr(instance, field) for field in self.ordering]
+
+    def encode_cursor(self, posicion, reverso):
+        valores = [v.isoformat() if isinstance(v, (date, datetime)) else v for v in posicion]
+        payload = json.dumps({'p': valores, 'r': int(reverso)}, separators=(',', ':'))
+        token = base64.urlsafe_b64encode(payload.encode('ascii')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(token.encode('ascii')).decode('ascii'))
+            posicion = payload['p']
+            reverso = bool(payload.get('r', 0))
+        except (TypeError, ValueError, KeyError, UnicodeError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(posicion, list) or len(posicion) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return posicion, reverso
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.get_position(self.page[-1]), reverso=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.get_position(self.page[0]), reverso=True)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Cursor opaco entregado en `next` o `previous`.',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param,
+                'required': False,
+                'in': 'query',
+                'description': f'Cantidad de resultados por página (máximo {self.max_page_size}).',
+                'schema': {'type': 'integer'},
+            },
+        ]
@@ -0,0 +1,104 @@
+"""
+Renderers y parsers rápidos para la API.
+
+``ORJSONRenderer`` / ``ORJSONParser`` codifican JSON con orjson y producen
+exactamente los mismos bytes que ``JSONRenderer`` de DRF: los valores que
+no son JSON nativo (``Decimal``, fechas, ``UUID``...) pasan por el mismo
+``JSONEncoder`` de DRF (solo los float con exponente se escriben distinto,
+``1e16`` en vez de ``1e+16``; la API no los expone). Sin orjson, con sangría (API navegable,
+``Accept: application/json; indent=4``) o con una configuración de DRF que
+orjson no replica se usa el camino estándar.
+
+``MessagePackRenderer`` / ``MessagePackParser`` atienden
+``application/msgpack`` con los mismos valores que el JSON (decimales y
+fechas como texto). Requieren el paquete ``msgpack``; los settings solo los
+registran si está instalado.
+"""
+import codecs
+import json
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser, JSONParser
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils import encoders, json as drf_json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# orjson pasa las fechas a ``default`` (DRF recorta a milisegundos y usa
+# 'Z'); las claves no str se convierten a texto, como en json.dumps.
+_OPCIONES_ORJSON = (orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS) if orjson else 0
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    ``JSONRenderer`` con orjson; mismos bytes de salida.
+    """
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (orjson is None or data is None or self.ensure_ascii or not self.compact
+                or self.get_indent(accepted_media_type, renderer_context or {}) is not None):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=self.encoder_class().default, option=_OPCIONES_ORJSON)
+        except orjson.JSONEncodeError:
+            # Enteros de más de 64 bits, NaN, etc.: json.dumps responde (o
+            # falla) igual que siempre.
+            return super().render(data, accepted_media_type, renderer_context)
+        # Igual que JSONRenderer: U+2028 y U+2029 escapados para JavaScript.
+        return ret.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
+
+
+class ORJSONParser(JSONParser):
+    """
+    ``JSONParser`` con orjson para cuerpos UTF-8.
+    """
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if orjson is None or codecs.lookup(encoding).name != 'utf-8':
+            return super().parse(stream, media_type, parser_context)
+        contenido = stream.read()
+        try:
+            return orjson.loads(contenido)
+        except orjson.JSONDecodeError:
+            pass
+        # orjson no acepta enteros de más de 64 bits; el mensaje de error es
+        # el de siempre.
+        try:
+            texto = contenido.decode(encoding)
+            parse_constant = drf_json.strict_constant if self.strict else None
+            return json.loads(texto, parse_constant=parse_constant)
+        except ValueError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
+
+
+class MessagePackRenderer(BaseRenderer):
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=encoders.JSONEncoder().default, use_bin_type=True)
+
+
+class MessagePackParser(BaseParser):
+    media_type = 'application/msgpack'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return msgpack.unpackb(stream.read(), raw=False)
+        except (ValueError, msgpack.UnpackException) as exc:
+            raise ParseError('MessagePack parse error - %s' % str(exc))
@@ -0,0 +1,107 @@
+from django.conf import settings
+from django.contrib.auth.models import Group
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+
+ADMINISTRADOR = 'Administrador'
+ORGANISMO_SECTORIAL = 'OrganismoSectorial'
+
+# Se incrementa si cambia el formato de lo que se guarda en caché.
+ROLES_CACHE_VERSION = 1
+
+
+def _cache_key(user_id):
+    return f'api:roles:{user_id}'
+
+
+def _cache_timeout():
+    return getattr(settings, 'API_ROLES_CACHE_TIMEOUT', 300)
+
+
+def _cache_compartida():
+    # Con LocMemCache cada worker tiene su copia y la invalidación de
+    # api/signals.py solo llega al proceso que atendió el cambio: los roles
+    # quitados seguirían vigentes en los demás hasta el timeout. En ese caso
+    # solo se guardan en el request.
+    return not isinstance(caches['default'], LocMemCache)
+
+
+def _consulta_roles(user):
+    # Por el id y no por ``user.groups``: el ``TokenUser`` de simplejwt no
+    # tiene grupos (``EmptyManager``) y se guardaría un conjunto vacío en la
+    # entrada compartida del usuario real.
+    return Group.objects.filter(user__pk=user.pk).values_list('name', flat=True)
+
+
+def _roles_sin_consulta(request):
+    """
+    Roles que se conocen sin E/S (ya calculados en el request o incluidos en
+    el token); ``None`` si hay que buscarlos en la caché o en la base.
+    """
+    roles = getattr(request, '_api_roles', None)
+    if roles is not None:
+        return roles
+    user = request.user
+    if not user or not user.is_authenticated:
+        return frozenset()
+    token_roles = getattr(user, 'token_roles', None)
+    if token_roles is not None:
+        # Autenticación sin estado: los roles vienen en el token.
+        return frozenset(token_roles)
+    return None
+
+
+def get_user_roles(request):
+    """
+    Devuelve los nombres de grupo del usuario autenticado.
+
+    Se consultan una sola vez por solicitud (quedan guardados en el request)
+    y, si la caché de Django es compartida entre procesos (``file``, ``db``;
+    no ``locmem``), también entre solicitudes. Los cambios en
+    ``User.groups`` invalidan la entrada (ver ``api/signals.py``).
+    """
+    roles = _roles_sin_consulta(request)
+    if roles is None and not _cache_compartida():
+        roles = frozenset(_consulta_roles(request.user))
+    elif roles is None:
+        user = request.user
+        key = _cache_key(user.pk)
+        roles = cache.get(key, version=ROLES_CACHE_VERSION)
+        if roles is None:
+            roles = frozenset(_consulta_roles(user))
+            cache.set(key, roles, _cache_timeout(), version=ROLES_CACHE_VERSION)
+
+    request._api_roles = roles
+    return roles
+
+
+async def aget_user_roles(request):
+    """
+    Versión asíncrona de ``get_user_roles`` para las vistas de lectura bajo
+    ASGI.
+    """
+    roles = _roles_sin_consulta(request)
+    if roles is None and not _cache_compartida():
+        roles = frozenset([nombre async for nombre in _consulta_roles(request.user)])
+    elif roles is None:
+        user = request.user
+        key = _cache_key(user.pk)
+        roles = await cache.aget(key, version=ROLES_CACHE_VERSION)
+        if roles is None:
+            roles = frozenset([nombre async for nombre in _consulta_roles(user)])
+            await cache.aset(key, roles, _cache_timeout(), version=ROLES_CACHE_VERSION)
+
+    request._api_roles = roles
+    return roles
+
+
+def has_role(request, *nombres):
+    return not get_user_roles(request).isdisjoint(nombres)
+
+
+async def ahas_role(request, *nombres):
+    return not (await aget_user_roles(request)).isdisjoint(nombres)
+
+
+def invalidate_user_roles(*user_ids):
+    cache.delete_many([_cache_key(user_id) for user_id in user_ids], version=ROLES_CACHE_VERSION)
@@ -0,0 +1,215 @@
+"""
+Búsqueda de texto completo (``?q=``) sobre medidas y planes.
+
+En PostgreSQL cada tabla tiene una columna generada ``search_vector``
+(``tsvector`` con la configuración ``api_es``: español sin acentos) y un
+índice GIN parcial sobre las filas activas; al ser generada se mantiene al
+día en cada ``INSERT``/``UPDATE`` y el borrado lógico la deja fuera del
+índice.
+
+En SQLite (desarrollo) cada tabla tiene una tabla FTS5 de contenido
+externo ``<tabla>_fts`` que triggers mantienen con las filas activas, de
+modo que un borrado lógico (``save()`` o ``queryset.update()``) también la
+quita del índice. FTS5 no trae stemming en español: cada palabra se busca
+como prefijo.
+
+``instalar()`` crea todo de forma idempotente; lo usa la migración 0014 y
+se repite tras ``migrate`` porque en SQLite Django reconstruye la tabla al
+alterar columnas y con ella se pierden los triggers.
+"""
+import re
+
+from django.db import connections
+from django.db.models import BooleanField, FloatField
+from django.db.models.expressions import RawSQL
+from rest_framework.filters import BaseFilterBackend
+
+# Columnas indexadas por tabla y su peso (A es el más relevante).
+INDICES = {
+    'api_medida': (
+        ('nombre_corto', 'A'),
+        ('indicador', 'B'),
+        ('forma_calculo', 'C'),
+        ('medios_verificacion', 'C'),
+    ),
+    'api_plan': (
+        ('nombre', 'A'),
+        ('descripcion', 'B'),
+    ),
+}
+PESOS_BM25 = {'A': 10.0, 'B': 4.0, 'C': 1.0}
+CONFIGURACION = 'api_es'
+COLUMNA = 'search_vector'
+# Anotación con la relevancia; menor es mejor para ordenar ascendente.
+RANGO = 'busqueda_rango'
+
+
+def _tabla_fts(tabla):
+    return f'{tabla}_fts'
+
+
+def _instalar_postgresql(connection):
+    q = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute('CREATE EXTENSION IF NOT EXISTS unaccent')
+        cursor.execute(f"""
+            DO $$ BEGIN
+                IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = '{CONFIGURACION}') THEN
+                    CREATE TEXT SEARCH CONFIGURATION {CONFIGURACION} (COPY = spanish);
+                    ALTER TEXT SEARCH CONFIGURATION {CONFIGURACION}
+                        ALTER MAPPING FOR hword, hword_part, word WITH unaccent, spanish_stem;
+                END IF;
+            END $$
+        """)
+        for tabla, campos in INDICES.items():
+            vector = ' || '.join(
+                f"setweight(to_tsvector('{CONFIGURACION}', coalesce({q(campo)}, '')), '{peso}')"
+                for campo, peso in campos
+            )
+            cursor.execute(
+                f'ALTER TABLE {q(tabla)} ADD COLUMN IF NOT EXISTS {COLUMNA} tsvector '
+                f'GENERATED ALWAYS AS ({vector}) STORED'
+            )
+            cursor.execute(
+                f'CREATE INDEX IF NOT EXISTS {q(tabla + "_busqueda_idx")} ON {q(tabla)} '
+                f'USING gin ({COLUMNA}) WHERE is_active'
+            )
+
+
+def _instalar_sqlite(connection):
+    q = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        for tabla, campos in INDICES.items():
+            fts = _tabla_fts(tabla)
+            columnas = ', '.join(q(campo) for campo, _ in campos)
+            nuevos = ', '.join(f'new.{q(campo)}' for campo, _ in campos)
+            viejos = ', '.join(f'old.{q(campo)}' for campo, _ in campos)
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [fts])
+            existia = cursor.fetchone() is not None
+            cursor.execute(
+                f'CREATE VIRTUAL TABLE IF NOT EXISTS {q(fts)} USING fts5({columnas}, '
+                f"content='{tabla}', content_rowid='id', tokenize='unicode61 remove_diacritics 2')"
+            )
+            if not existia:
+                cursor.execute(
+                    f'INSERT INTO {q(fts)} (rowid, {columnas}) '
+                    f'SELECT id, {columnas} FROM {q(tabla)} WHERE is_active'
+                )
+            # Solo las filas activas están en el índice: el 'delete' de FTS5
+            # debe recibir los valores que se indexaron.
+            cursor.execute(
+                f'CREATE TRIGGER IF NOT EXISTS {q(fts + "_ai")} AFTER INSERT ON {q(tabla)} '
+                f'WHEN new.is_active BEGIN '
+                f'INSERT INTO {q(fts)} (rowid, {columnas}) VALUES (new.id, {nuevos}); END'
+            )
+            cursor.execute(
+                f'CREATE TRIGGER IF NOT EXISTS {q(fts + "_ad")} AFTER DELETE ON {q(tabla)} '
+                f'WHEN old.is_active BEGIN '
+                f"INSERT INTO {q(fts)} ({q(fts)}, rowid, {columnas}) VALUES ('delete', old.id, {viejos}); END"
+            )
+            cursor.execute(
+                f'CREATE TRIGGER IF NOT EXISTS {q(fts + "_au")} AFTER UPDATE OF {columnas}, is_active '
+                f'ON {q(tabla)} BEGIN '
+                f"INSERT INTO {q(fts)} ({q(fts)}, rowid, {columnas}) "
+                f"SELECT 'delete', old.id, {viejos} WHERE old.is_active; "
+                f'INSERT INTO {q(fts)} (rowid, {columnas}) SELECT new.id, {nuevos} WHERE new.is_active; END'
+            )
+
+
+def instalar(connection):
+    """
+    Crea (si faltan) los índices de búsqueda en ``connection``. Otros
+    motores no tienen búsqueda indexada: ``buscar()`` no encuentra nada.
+    """
+    if connection.vendor == 'postgresql':
+        _instalar_postgresql(connection)
+    elif connection.vendor == 'sqlite':
+        _instalar_sqlite(connection)
+
+
+def desinstalar(connection):
+    q = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        for tabla in INDICES:
+            if connection.vendor == 'postgresql':
+                cursor.execute(f'DROP INDEX IF EXISTS {q(tabla + "_busqueda_idx")}')
+                cursor.execute(f'ALTER TABLE {q(tabla)} DROP COLUMN IF EXISTS {COLUMNA}')
+            elif connection.vendor == 'sqlite':
+                fts = _tabla_fts(tabla)
+                for sufijo in ('_ai', '_ad', '_au'):
+                    cursor.execute(f'DROP TRIGGER IF EXISTS {q(fts + sufijo)}')
+                cursor.execute(f'DROP TABLE IF EXISTS {q(fts)}')
+        if connection.vendor == 'postgresql':
+            cursor.execute(f'DROP TEXT SEARCH CONFIGURATION IF EXISTS {CONFIGURACION}')
+
+
+def _consulta_fts5(texto):
+    # Cada palabra entre comillas (sin operadores de FTS5) y como prefijo;
+    # varias palabras deben aparecer todas.
+    return ' '.join(f'"{palabra}"*' for palabra in re.findall(r'\w+', texto))
+
+
+def buscar(queryset, texto):
+    """
+    Filtra ``queryset`` (de ``Medida`` o ``Plan``) por ``texto`` y anota
+    ``RANGO`` con la relevancia (menor es más relevante).
+    """
+    connection = connections[queryset.db]
+    q = connection.ops.quote_name
+    tabla = queryset.model._meta.db_table
+    if connection.vendor == 'postgresql':
+        consulta = f"websearch_to_tsquery('{CONFIGURACION}', %s)"
+        vector = f'{q(tabla)}.{COLUMNA}'
+        # ts_rank_cd es real (float4): como double precision el valor que
+        # viaja en el cursor vuelve idéntico y la paginación no repite filas.
+        return queryset.filter(
+            RawSQL(f'{vector} @@ {consulta}', [texto], output_field=BooleanField())
+        ).annotate(**{
+            RANGO: RawSQL(f'-ts_rank_cd({vector}, {consulta})::double precision', [texto],
+                          output_field=FloatField()),
+        })
+    if connection.vendor == 'sqlite':
+        consulta = _consulta_fts5(texto)
+        if not consulta:
+            return queryset.none()
+        fts = q(_tabla_fts(tabla))
+        pesos = ', '.join(str(PESOS_BM25[peso]) for _, peso in INDICES[tabla])
+        return queryset.filter(
+            pk__in=RawSQL(f'SELECT rowid FROM {fts} WHERE {fts} MATCH %s', [consulta])
+        ).annotate(**{
+            RANGO: RawSQL(
+                f'SELECT bm25({fts}, {pesos}) FROM {fts} WHERE {fts} MATCH %s AND rowid = {q(tabla)}.id',
+                [consulta], output_field=FloatField()
+            ),
+        })
+    return queryset.none()
+
+
+class BusquedaFilterBackend(BaseFilterBackend):
+    """
+    Aplica ``?q=`` en el listado y ordena por relevancia: define
+    ``view.keyset_ordering`` para que ``KeysetPagination`` pagine por
+    ``(RANGO, id)``.
+    """
+    search_param = 'q'
+
+    def filter_queryset(self, request, queryset, view):
+        if getattr(view, 'action', None) != 'list':
+            return queryset
+        texto = request.query_params.get(self.search_param, '').strip()
+        if not texto:
+            return queryset
+        view.keyset_ordering = (RANGO, 'id')
+        return buscar(queryset, texto)
+
+    def get_schema_operation_parameters(self, view):
+        return [{
+            'name': self.search_param,
+            'required': False,
+            'in': 'query',
+            'description': (
+                'Búsqueda de texto completo, sin distinguir acentos; los resultados se ordenan '
+                'por relevancia.'
+            ),
+            'schema': {'type': 'string'},
+        }]
@@ -1,9 +1,11 @@
 from rest_framework import serializers
-from .models import TipoMedida, Plan, OrganismoSectorial, Medida, PlanOrganismoSectorial, Reporte
-from datetime import datetime
+from .models import TipoMedida, Plan, OrganismoSectorial, Medida, PlanOrganismoSectorial, Reporte, ReporteResumenMensual
+from datetime import datetime, timedelta
 from django.utils import timezone
+from .expansion import ExpandibleSerializerMixin
+from .fieldsets import SparseFieldsSerializerMixin
 
-class TipoMedidaSerializer(serializers.ModelSerializer):
+class TipoMedidaSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = TipoMedida
         fields = '__all__'  # O usa una lista de campos específicos si lo prefieres
@@ -13,7 +15,7 @@ class TipoMedidaSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("El nombre no puede estar vacío.")
         return value
 
-class PlanSerializer(serializers.ModelSerializer):
+class PlanSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Plan
         fields = '__all__'
@@ -34,7 +36,7 @@ class PlanSerializer(serializers.ModelSerializer):
                 raise serializers.ValidationError("La fecha de término no puede ser menor que la fecha de inicio.")
         return value
 
-class OrganismoSectorialSerializer(serializers.ModelSerializer):
+class OrganismoSectorialSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = OrganismoSectorial
         fields = '__all__'
@@ -44,21 +46,33 @@ class OrganismoSectorialSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("El nombre no puede estar vacío.")
         return value
 
-class MedidaSerializer(serializers.ModelSerializer):
+class MedidaSerializer(SparseFieldsSerializerMixin, ExpandibleSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Medida
         fields = '__all__'
 
+    @classmethod
+    def get_expandibles(cls):
+        return {'id_tipo_medida': TipoMedidaSerializer}
+
     def validate_nombre_corto(self, value):
         if not value:
             raise serializers.ValidationError("El nombre corto no puede estar vacío.")
         return value
 
-class PlanOrganismoSectorialSerializer(serializers.ModelSerializer):
+class PlanOrganismoSectorialSerializer(SparseFieldsSerializerMixin, ExpandibleSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = PlanOrganismoSectorial
         fields = '__all__'
 
+    @classmethod
+    def get_expandibles(cls):
+        return {
+            'id_plan': PlanSerializer,
+            'id_organismo_sectorial': OrganismoSectorialSerializer,
+            'id_media': MedidaSerializer,
+        }
+
     def validate_id_plan(self, value):
         if not value:
             raise serializers.ValidationError("El plan no puede estar vacío.")
@@ -74,12 +88,276 @@ class PlanOrganismoSectorialSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("La medida no puede estar vacía.")
         return value
 
-class ReporteSerializer(serializers.ModelSerializer):
+class ReporteSerializer(SparseFieldsSerializerMixin, ExpandibleSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Reporte
         fields = '__all__'
 
+    @classmethod
+    def get_expandibles(cls):
+        return {'id_plan_organismo_sectorial': PlanOrganismoSectorialSerializer}
+
     def validate_fecha_reporte(self, value):
         if value > timezone.now().date():
             raise serializers.ValidationError("La fecha de reporte no puede ser en el futuro.")
         return value
+
+class RelacionPrecargadaField(serializers.PrimaryKeyRelatedField):
+    """
+    Clave foránea que se resuelve contra el mapa ``relaciones`` del contexto
+    (cargado una sola vez por el ListSerializer) en vez de consultar por fila.
+    """
+    def to_internal_value(self, data):
+        relaciones = self.context.get('relaciones')
+        if relaciones is None:
+            return super().to_internal_value(data)
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            return relaciones[int(data)]
+        except KeyError:
+            self.fail('does_not_exist', pk_value=data)
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+
+class ReporteBulkListSerializer(serializers.ListSerializer):
+    """
+    Valida un lote de reportes resolviendo todas las relaciones
+    PlanOrganismoSectorial con una única consulta ``IN`` y los inserta con
+    ``bulk_create``.
+    """
+    batch_size = 1000
+
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            ids = set()
+            for fila in data:
+                if not isinstance(fila, dict):
+                    continue
+                try:
+                    ids.add(int(fila.get('id_plan_organismo_sectorial')))
+                except (TypeError, ValueError):
+                    continue
+            self.context['relaciones'] = PlanOrganismoSectorial.objects.in_bulk(ids)
+        return super().to_internal_value(data)
+
+    def create(self, validated_data):
+        reportes = Reporte.objects.bulk_create(
+            [Reporte(**item) for item in validated_data], batch_size=self.batch_size
+        )
+        fechas = [reporte.fecha_reporte for reporte in reportes]
+        ReporteResumenMensual.recalcular(
+            {reporte.id_plan_organismo_sectorial_id for reporte in reportes}, min(fechas), max(fechas)
+        )
+        return reportes
+
+class ReporteBulkSerializer(ReporteSerializer):
+    id_plan_organismo_sectorial = RelacionPrecargadaField(queryset=PlanOrganismoSectorial.objects.all())
+
+    class Meta(ReporteSerializer.Meta):
+        list_serializer_class = ReporteBulkListSerializer
+
+class PlanOrganismoSectorialLoteSerializer(serializers.Serializer):
+    """
+    Valida la asociación de un plan y un organismo sectorial con varias
+    medidas usando una consulta por entidad, sin importar cuántas medidas
+    vengan en la lista.
+    """
+    id_plan = serializers.PrimaryKeyRelatedField(queryset=Plan.objects.all())
+    id_organismo_sectorial = serializers.PrimaryKeyRelatedField(queryset=OrganismoSectorial.objects.all())
+    id_media = serializers.ListField(child=serializers.IntegerField(), allow_empty=False)
+
+    def validate_id_media(self, value):
+        medidas = Medida.objects.in_bulk(value)
+        faltantes = [pk for pk in value if pk not in medidas]
+        if faltantes:
+            mensaje = serializers.PrimaryKeyRelatedField.default_error_messages['does_not_exist']
+            raise serializers.ValidationError([mensaje.format(pk_value=pk) for pk in faltantes])
+        return [medidas[pk] for pk in value]
+
+class TipoMedidaPorNombreField(serializers.RelatedField):
+    """
+    Tipo de medida indicado por su ``nombre``. Se resuelve contra el mapa
+    ``tipos_medida`` del contexto (una sola consulta por importación) y, sin
+    él, consultando por fila.
+    """
+    default_error_messages = {
+        'does_not_exist': 'No existe un tipo de medida con nombre "{nombre}".',
+    }
+
+    def to_internal_value(self, data):
+        nombre = str(data).strip()
+        tipos = self.context.get('tipos_medida')
+        try:
+            if tipos is not None:
+                return tipos[nombre]
+            return self.get_queryset().get(nombre=nombre)
+        except (KeyError, TipoMedida.DoesNotExist):
+            self.fail('does_not_exist', nombre=nombre)
+
+    def to_representation(self, value):
+        return value.nombre
+
+class TipoMedidaImportSerializer(TipoMedidaSerializer):
+    """
+    Fila de importación de tipos de medida: ``nombre`` es la clave del upsert,
+    por lo que no se valida su unicidad contra la base.
+    """
+    nombre = serializers.CharField(max_length=100)
+
+    class Meta(TipoMedidaSerializer.Meta):
+        fields = ['nombre', 'descripcion']
+
+class OrganismoSectorialImportSerializer(OrganismoSectorialSerializer):
+    """
+    Fila de importación de organismos sectoriales (upsert por ``nombre``).
+    """
+    nombre = serializers.CharField(max_length=100)
+
+    class Meta(OrganismoSectorialSerializer.Meta):
+        fields = ['nombre', 'tipo', 'contacto']
+
+class MedidaImportSerializer(MedidaSerializer):
+    """
+    Fila de importación de medidas. ``nombre_corto`` no es único, así que el
+    upsert es por ``id``: con ``id`` se actualiza esa medida y sin él se crea
+    una nueva. ``id_tipo_medida`` es el nombre del tipo de medida.
+    """
+    id = serializers.IntegerField(min_value=1, required=False)
+    id_tipo_medida = TipoMedidaPorNombreField(queryset=TipoMedida.objects.all())
+
+    class Meta(MedidaSerializer.Meta):
+        fields = [
+            'id', 'id_tipo_medida', 'nombre_corto', 'indicador', 'forma_calculo', 'frecuencia_reporte',
+            'medios_verificacion', 'tipo_regulatoria',
+        ]
+
+    @classmethod
+    def contexto_importacion(cls):
+        return {'tipos_medida': {tipo.nombre: tipo for tipo in TipoMedida.objects.all()}}
+
+class PlanOrganismoSectorialFiltrosSerializer(serializers.Serializer):
+    """
+    Filtros del listado por plan, organismo, medida, tipo de medida y estado
+    del plan (ver ``api/filters.py``). Cada uno usa el índice de su clave
+    foránea o ``plan_estado_activo_idx``.
+    """
+    # parámetro -> ruta desde PlanOrganismoSectorial
+    RUTAS = {
+        'plan': 'id_plan',
+        'organismo_sectorial': 'id_organismo_sectorial',
+        'medida': 'id_media',
+        'tipo_medida': 'id_media__id_tipo_medida',
+        'estado_plan': 'id_plan__estado',
+    }
+    # prefijo hasta PlanOrganismoSectorial desde el modelo filtrado
+    relacion = ''
+
+    plan = serializers.IntegerField(min_value=1, required=False, help_text="ID del plan.")
+    organismo_sectorial = serializers.IntegerField(
+        min_value=1, required=False, help_text="ID del organismo sectorial."
+    )
+    medida = serializers.IntegerField(min_value=1, required=False, help_text="ID de la medida.")
+    tipo_medida = serializers.IntegerField(min_value=1, required=False, help_text="ID del tipo de medida.")
+    estado_plan = serializers.ChoiceField(
+        choices=[estado for estado, _ in Plan.ESTADO_CHOICES], required=False, help_text="Estado del plan."
+    )
+
+    def condiciones(self, relacion=None):
+        """
+        ``filter(**condiciones)`` equivalente a los parámetros recibidos.
+        """
+        relacion = self.relacion if relacion is None else relacion
+        return {
+            f'{relacion}{ruta}': self.validated_data[campo]
+            for campo, ruta in self.RUTAS.items() if campo in self.validated_data
+        }
+
+class ReporteFiltrosSerializer(PlanOrganismoSectorialFiltrosSerializer):
+    """
+    Agrega a los filtros de la relación los rangos de ``fecha_reporte``
+    (``reporte_fecha_activo_idx``) y ``valor_reportado``
+    (``reporte_valor_activo_idx``), ambos extremos incluidos.
+    """
+    relacion = 'id_plan_organismo_sectorial__'
+
+    fecha_desde = serializers.DateField(required=False, help_text="Fecha de reporte mínima (AAAA-MM-DD).")
+    fecha_hasta = serializers.DateField(required=False, help_text="Fecha de reporte máxima (AAAA-MM-DD).")
+    valor_min = serializers.DecimalField(
+        max_digits=10, decimal_places=2, required=False, help_text="Valor reportado mínimo."
+    )
+    valor_max = serializers.DecimalField(
+        max_digits=10, decimal_places=2, required=False, help_text="Valor reportado máximo."
+    )
+
+    RANGOS = {
+        'fecha_desde': 'fecha_reporte__gte',
+        'fecha_hasta': 'fecha_reporte__lte',
+        'valor_min': 'valor_reportado__gte',
+        'valor_max': 'valor_reportado__lte',
+    }
+
+    def validate(self, data):
+        if 'fecha_desde' in data and 'fecha_hasta' in data and data['fecha_desde'] > data['fecha_hasta']:
+            raise serializers.ValidationError({"fecha_hasta": "Debe ser igual o posterior a fecha_desde."})
+        if 'valor_min' in data and 'valor_max' in data and data['valor_min'] > data['valor_max']:
+            raise serializers.ValidationError({"valor_max": "Debe ser mayor o igual que valor_min."})
+        return data
+
+    def condiciones(self, relacion=None):
+        condiciones = super().condiciones(relacion)
+        for campo, lookup in self.RANGOS.items():
+            if campo in self.validated_data:
+                condiciones[lookup] = self.validated_data[campo]
+        return condiciones
+
+    def condiciones_resumen(self):
+        """
+        Condiciones equivalentes sobre ReporteResumenMensual, o ``None`` si
+        los filtros no se pueden responder con meses completos (rango de
+        valores o fechas que no coinciden con el inicio/fin de un mes).
+        """
+        datos = self.validated_data
+        if 'valor_min' in datos or 'valor_max' in datos:
+            return None
+        desde = datos.get('fecha_desde')
+        hasta = datos.get('fecha_hasta')
+        if desde is not None and desde.day != 1:
+            return None
+        if hasta is not None and (hasta + timedelta(days=1)).day != 1:
+            return None
+        condiciones = super().condiciones()
+        if desde is not None:
+            condiciones['mes__gte'] = desde
+        if hasta is not None:
+            condiciones['mes__lte'] = hasta
+        return condiciones
+
+class ReporteResumenParamsSerializer(serializers.Serializer):
+    AGRUPACIONES = {
+        'plan': ('id_plan_organismo_sectorial__id_plan', 'id_plan_organismo_sectorial__id_plan__nombre'),
+        'organismo_sectorial': (
+            'id_plan_organismo_sectorial__id_organismo_sectorial',
+            'id_plan_organismo_sectorial__id_organismo_sectorial__nombre',
+        ),
+        'medida': ('id_plan_organismo_sectorial__id_media', 'id_plan_organismo_sectorial__id_media__nombre_corto'),
+        'tipo_medida': (
+            'id_plan_organismo_sectorial__id_media__id_tipo_medida',
+            'id_plan_organismo_sectorial__id_media__id_tipo_medida__nombre',
+        ),
+    }
+    PERIODOS = ['day', 'week', 'month', 'year']
+
+    group_by = serializers.ChoiceField(choices=list(AGRUPACIONES), default='plan')
+    period = serializers.ChoiceField(choices=PERIODOS, default='month')
+
+class ReporteResumenSerializer(serializers.Serializer):
+    grupo = serializers.IntegerField()
+    nombre = serializers.CharField()
+    periodo = serializers.DateField()
+    # Los alias evitan chocar con las columnas de ReporteResumenMensual.
+    cantidad = serializers.IntegerField(source='n_reportes')
+    suma = serializers.DecimalField(max_digits=20, decimal_places=2, source='suma_valor')
+    promedio = serializers.DecimalField(max_digits=20, decimal_places=2)
+    minimo = serializers.DecimalField(max_digits=10, decimal_places=2, source='min_valor')
+    maximo = serializers.DecimalField(max_digits=10, decimal_places=2, source='max_valor')
@@ -0,0 +1,81 @@
+from django.contrib.auth.models import Group, User
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.db.migrations.recorder import MigrationRecorder
+from django.db.models.signals import m2m_changed, post_delete, post_migrate, post_save, pre_delete
+from django.dispatch import receiver
+
+from .catalog_cache import invalidar_catalogo
+from .metrics import instalar_medicion
+from .models import TipoMedida, Medida, OrganismoSectorial
+from .roles import invalidate_user_roles
+from .search import instalar as instalar_busqueda
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def invalidar_roles_por_grupos(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Invalida la caché de roles cuando cambian los grupos de un usuario, ya
+    sea desde ``user.groups`` o desde ``group.user_set``.
+    """
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            invalidate_user_roles(instance.pk)
+        return
+
+    if action == 'pre_clear':
+        instance._api_roles_usuarios = list(instance.user_set.values_list('pk', flat=True))
+    elif action == 'post_clear':
+        invalidate_user_roles(*getattr(instance, '_api_roles_usuarios', []))
+    elif action in ('post_add', 'post_remove') and pk_set:
+        invalidate_user_roles(*pk_set)
+
+
+@receiver(post_save, sender=Group)
+@receiver(pre_delete, sender=Group)
+def invalidar_roles_por_grupo(sender, instance, **kwargs):
+    if instance.pk is not None:
+        invalidate_user_roles(*instance.user_set.values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=User)
+def invalidar_roles_usuario_nuevo(sender, instance, created, **kwargs):
+    # Un id reutilizado no debe heredar roles guardados de otro usuario.
+    if created:
+        invalidate_user_roles(instance.pk)
+
+
+@receiver(post_save, sender=TipoMedida)
+@receiver(post_save, sender=Medida)
+@receiver(post_save, sender=OrganismoSectorial)
+@receiver(post_delete, sender=TipoMedida)
+@receiver(post_delete, sender=Medida)
+@receiver(post_delete, sender=OrganismoSectorial)
+def invalidar_cache_catalogo(sender, instance, **kwargs):
+    """
+    Invalida las respuestas cacheadas del catálogo. El borrado lógico
+    (``delete()`` de los modelos) pasa por ``save()`` y llega aquí como
+    ``post_save``.
+    """
+    invalidar_catalogo(sender)
+
+
+@receiver(connection_created)
+def medir_consultas(sender, connection, **kwargs):
+    # Cuenta las consultas de cada solicitud para /api/metrics.
+    instalar_medicion(connection)
+
+
+@receiver(post_migrate)
+def reinstalar_busqueda(sender, using, **kwargs):
+    """
+    En SQLite una migración posterior que reconstruya ``api_medida`` o
+    ``api_plan`` elimina los triggers de búsqueda; se vuelven a crear si la
+    migración que los instala está aplicada.
+    """
+    if sender.name != 'api':
+        return
+    connection = connections[using]
+    aplicadas = MigrationRecorder(connection).applied_migrations()
+    if ('api', '0014_busqueda_texto_completo') in aplicadas:
+        instalar_busqueda(connection)
@@ -0,0 +1,117 @@
+from django.db import transaction
+from django.utils import timezone
+from drf_spectacular.utils import OpenApiResponse, extend_schema
+from rest_framework import serializers, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from .catalog_cache import invalidar_catalogo
+from .models import TipoMedida, Medida, OrganismoSectorial, Plan, PlanOrganismoSectorial, Reporte, ReporteResumenMensual
+
+# Niveles que se desactivan junto con cada modelo: (modelo, ruta hasta los ids
+# originales). Las rutas son directas para que cada nivel sea un solo UPDATE.
+CASCADAS = {
+    Plan: [
+        (PlanOrganismoSectorial, 'id_plan'),
+        (Reporte, 'id_plan_organismo_sectorial__id_plan'),
+    ],
+    Medida: [
+        (PlanOrganismoSectorial, 'id_media'),
+        (Reporte, 'id_plan_organismo_sectorial__id_media'),
+    ],
+    PlanOrganismoSectorial: [
+        (Reporte, 'id_plan_organismo_sectorial'),
+    ],
+}
+
+MODELOS_CATALOGO = (TipoMedida, Medida, OrganismoSectorial)
+
+
+def desactivar_en_bloque(model, ids, cascada=False):
+    """
+    Borrado lógico de ``ids`` (y, con ``cascada``, de sus dependientes según
+    ``CASCADAS``) con un ``UPDATE`` por nivel dentro de una transacción.
+
+    Como ``update()`` no pasa por ``save()`` ni emite señales, aquí se
+    recalcula el resumen mensual de las relaciones afectadas y se invalida
+    la caché del catálogo. Devuelve ``{modelo: filas desactivadas}``.
+    """
+    niveles = [(model, 'pk')]
+    if cascada:
+        niveles += CASCADAS.get(model, [])
+
+    ahora = timezone.now()
+    desactivados = {}
+    with transaction.atomic():
+        for modelo, ruta in niveles:
+            queryset = modelo.objects.filter(**{f'{ruta}__in': ids})
+            relaciones = None
+            if modelo is Reporte:
+                relaciones = list(
+                    queryset.order_by().values_list('id_plan_organismo_sectorial', flat=True).distinct()
+                )
+            desactivados[modelo._meta.object_name] = queryset.update(is_active=False, updated_at=ahora)
+            if relaciones:
+                ReporteResumenMensual.recalcular(relaciones)
+
+    modelos = [modelo for modelo, _ in niveles if modelo in MODELOS_CATALOGO]
+    if modelos:
+        invalidar_catalogo(*modelos)
+    return desactivados
+
+
+class BulkDestroySerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=5000
+    )
+    cascade = serializers.BooleanField(
+        default=False,
+        help_text="Desactiva también los registros dependientes (plan → relaciones → reportes, medida → relaciones → reportes)."
+    )
+
+
+class BulkDestroyResponseSerializer(serializers.Serializer):
+    mensaje = serializers.CharField()
+    desactivados = serializers.DictField(child=serializers.IntegerField())
+
+
+class BulkDestroyMixin:
+    """
+    Agrega ``POST <recurso>/bulk-delete/`` para el borrado lógico de varios
+    registros (y opcionalmente sus dependientes) en un número fijo de
+    consultas, sin importar cuántas filas se afecten.
+    """
+    @extend_schema(
+        description=(
+            "Elimina (borrado lógico) varios registros por ID. Con `cascade` se desactivan "
+            "también sus relaciones plan-organismo y reportes."
+        ),
+        request=BulkDestroySerializer,
+        responses={
+            200: BulkDestroyResponseSerializer,
+            400: OpenApiResponse(description="Error de validación"),
+            403: OpenApiResponse(description="No autorizado para eliminar."),
+            404: OpenApiResponse(description="Algún ID no existe.")
+        }
+    )
+    @action(detail=False, methods=['post'], url_path='bulk-delete')
+    def bulk_destroy(self, request, *args, **kwargs):
+        serializer = BulkDestroySerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response({"detail": serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        ids = set(serializer.validated_data['ids'])
+        model = self.get_queryset().model
+        existentes = set(self.get_queryset().filter(pk__in=ids).values_list('pk', flat=True))
+        faltantes = sorted(ids - existentes)
+        if faltantes:
+            return Response(
+                {"detail": f"No se encontraron registros con los IDs: {', '.join(map(str, faltantes))}."},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        desactivados = desactivar_en_bloque(model, ids, cascada=serializer.validated_data['cascade'])
+        return Response({
+            "mensaje": "Los registros fueron eliminados correctamente.",
+            "desactivados": desactivados
+        }, status=status.HTTP_200_OK)
@@ -0,0 +1,76 @@
+"""
+Funciones de ``manage.py seed_synthetic`` que se ejecutan en los procesos
+hijos. Los procesos se crean con ``spawn`` (no heredan conexiones abiertas) e
+importan este módulo antes de ``django.setup()``, por lo que los modelos se
+importan dentro de cada función.
+"""
+import random
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+# Reportes por tarea enviada a los procesos (unidad de avance).
+REPORTES_POR_TAREA = 200000
+RELACIONES_POR_TAREA = 500
+
+# Estado de cada proceso, fijado por configurar_proceso.
+_relaciones = None
+_pesos = None
+
+
+def iniciar_proceso(relaciones, pesos):
+    import django
+    django.setup()
+    configurar_proceso(relaciones, pesos)
+
+
+def configurar_proceso(relaciones, pesos):
+    global _relaciones, _pesos
+    _relaciones = relaciones
+    _pesos = pesos
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            # Los escritores de SQLite se turnan; se espera en vez de fallar con "database is locked".
+            cursor.execute('PRAGMA busy_timeout = 60000')
+        elif connection.vendor == 'postgresql':
+            # Datos descartables: no se espera el fsync del WAL en cada commit.
+            cursor.execute('SET synchronous_commit TO off')
+
+
+def insertar_reportes(tarea):
+    """
+    Inserta ``cantidad`` reportes en lotes de ``lote`` filas, cada lote en su
+    propia transacción y ordenado por (relación, fecha) para que las
+    inserciones en los índices sean casi secuenciales.
+    """
+    from .models import Reporte
+
+    semilla, cantidad, desde, dias, sesgo, inactivos, lote = tarea
+    rnd = random.Random(semilla)
+    creado = timezone.now()
+    insertados = 0
+    while insertados < cantidad:
+        n = min(lote, cantidad - insertados)
+        relaciones = rnd.choices(_relaciones, cum_weights=_pesos, k=n)
+        filas = sorted(
+            # Con sesgo > 1 las fechas se concentran hacia el final del rango.
+            (relacion, desde + timedelta(days=int(dias * (1 - rnd.random() ** sesgo))))
+            for relacion in relaciones
+        )
+        with transaction.atomic():
+            Reporte.objects.bulk_create([
+                Reporte(id_plan_organismo_sectorial_id=relacion, fecha_reporte=fecha,
+                        valor_reportado=round(rnd.uniform(0, 100), 2), evidencia='sintético',
+                        is_active=rnd.random() >= inactivos, created_at=creado)
+                for relacion, fecha in filas
+            ], batch_size=lote)
+        insertados += n
+    return cantidad
+
+
+def recalcular_resumen(ids):
+    from .models import ReporteResumenMensual
+
+    ReporteResumenMensual.recalcular(ids)
+    return len(ids)
@@ -1,12 +1,63 @@
-from django.test import TestCase
-from .models import TipoMedida, Plan, OrganismoSectorial, Medida, PlanOrganismoSectorial, Reporte
-from rest_framework.test import APIClient
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import zipfile
+import uuid
+from datetime import date, datetime, timezone as dt_timezone
+from decimal import Decimal
+from io import BytesIO, StringIO
+from unittest import mock, skipUnless
+from zoneinfo import ZoneInfo
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.http import http_date
+from .models import TipoMedida, Plan, OrganismoSectorial, Medida, PlanOrganismoSectorial, Reporte, ReporteResumenMensual
+from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
+from rest_framework.request import Request
+from rest_framework.exceptions import ErrorDetail, ParseError
+from rest_framework.renderers import JSONRenderer
+from .pagination import KeysetPagination
+from .backends.postgresql_pool.pool import ConnectionPool, PoolTimeout
+from .metrics import _Registro, registro
+from .views import ReporteViewSet
+from .fast_list import FastListMixin
+from .serializers import ReporteSerializer
+from .renderers import ORJSONParser, ORJSONRenderer, msgpack
+from .roles import get_user_roles
+from .authentication import StatelessJWTAuthentication, estado_usuarios
+from rest_framework_simplejwt.tokens import AccessToken
 from django.contrib.auth.models import User, Group, Permission
 from django.contrib.contenttypes.models import ContentType
 
 username = 'usertest'
 password = '123456'
 
+def _cache_compartida(test):
+    """
+    Usa una caché de archivos (compartida entre procesos, como en producción
+    con varios workers) durante la prueba.
+    """
+    directorio = tempfile.TemporaryDirectory()
+    test.addCleanup(directorio.cleanup)
+    ajuste = override_settings(CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': directorio.name,
+    }})
+    ajuste.enable()
+    test.addCleanup(ajuste.disable)
+
 class TipoMedidaModelTest(TestCase):
     def test_str_representation(self):
         """
@@ -131,12 +182,12 @@ class MedidaApiTest(TestCase):
         Prueba la creación de un Medida a través del endpoint de Medida.
         """
         # Crear datos relacionados mínimos necesarios
-        TipoMedida.objects.create(nombre="Medida Test", descripcion="Desc test")        
+        tipo = TipoMedida.objects.create(nombre="Medida Test", descripcion="Desc test")
         self.client.force_authenticate(user=self.admin_user)
         data = {
             "indicador": "Prueba",
             "forma_calculo": "Prueba",
-            "id_tipo_medida": "1",
+            "id_tipo_medida": str(tipo.id),
             "frecuencia_reporte": "Anual",
             "medios_verificacion": "Prueba",
             "nombre_corto": "Prueba",
@@ -145,6 +196,33 @@ class MedidaApiTest(TestCase):
         response = self.client.post('/api/medida/', data)
         self.assertEqual(response.status_code, 201)
 
+    def test_api_fields_y_omit(self):
+        """
+        Prueba que ?fields= y ?omit= recortan la respuesta y el SELECT.
+        """
+        tipo = TipoMedida.objects.create(nombre="Medida Test", descripcion="Desc test")
+        Medida.objects.create(
+            id_tipo_medida=tipo,
+            nombre_corto="Med Test",
+            indicador="Ind 1",
+            forma_calculo="Suma",
+            frecuencia_reporte="Mensual"
+        )
+        self.client.force_authenticate(user=self.admin_user)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/medida/', {'fields': 'id,nombre_corto'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.data['results'][0]), ['id', 'nombre_corto'])
+        select = [q['sql'] for q in ctx if 'FROM "api_medida"' in q['sql']][0]
+        self.assertNotIn('indicador', select)
+
+        response = self.client.get('/api/medida/', {'omit': 'indicador,forma_calculo'})
+        self.assertNotIn('indicador', response.data['results'][0])
+        self.assertIn('nombre_corto', response.data['results'][0])
+
+        response = self.client.get('/api/medida/', {'fields': 'id,no_existe'})
+        self.assertEqual(response.status_code, 400)
+
 class OrganismoSectorialApiTest(TestCase):
 
     def setUp(self):
@@ -323,7 +401,7 @@ class PlanOrganismoSectorialApiTest(TestCase):
         
         # Crear datos relacionados mínimos necesarios
         tipo = TipoMedida.objects.create(nombre="Medida Test", descripcion="Desc test")
-        Medida.objects.create(
+        medida = Medida.objects.create(
             id_tipo_medida=tipo,
             nombre_corto="Med Test",
             indicador="Ind 1",
@@ -332,8 +410,8 @@ class PlanOrganismoSectorialApiTest(TestCase):
             medios_verificacion="Doc",
             tipo_regulatoria="Norma"
         )
-        OrganismoSectorial.objects.create(nombre="Org Test", tipo="Público", contacto="org@test.cl")
-        Plan.objects.create(
+        org = OrganismoSectorial.objects.create(nombre="Org Test", tipo="Público", contacto="org@test.cl")
+        plan = Plan.objects.create(
             nombre="Plan Test",
             descripcion="Test",
             fecha_inicio="2024-01-01",
@@ -344,13 +422,56 @@ class PlanOrganismoSectorialApiTest(TestCase):
         
         self.client.force_authenticate(user=self.admin_user)
         data = {
-            "id_plan": 1,
-            "id_organismo_sectorial": 1,
-            "id_media": [1]
+            "id_plan": plan.id,
+            "id_organismo_sectorial": org.id,
+            "id_media": [medida.id]
         }
         response = self.client.post('/api/plan-organismo-sectorial/', data)
         self.assertEqual(response.status_code, 201)
 
+    def test_api_post_consultas_constantes(self):
+        """
+        Prueba que asociar muchas medidas no aumenta el número de consultas.
+        """
+        tipo = TipoMedida.objects.create(nombre="Medida Test", descripcion="Desc test")
+        medidas = Medida.objects.bulk_create([
+            Medida(
+                id_tipo_medida=tipo,
+                nombre_corto=f"Med {i}",
+                indicador="Ind",
+                forma_calculo="Suma",
+                frecuencia_reporte="Mensual"
+            )
+            for i in range(111)
+        ])
+        org = OrganismoSectorial.objects.create(nombre="Org Test", tipo="Público", contacto="org@test.cl")
+        self.client.force_authenticate(user=self.admin_user)
+
+        # Los roles quedan en caché tras la primera solicitud.
+        self.client.get('/api/plan-organismo-sectorial/')
+        consultas = {}
+        for cantidad, inicio in ((1, 0), (10, 1), (100, 11)):
+            plan = Plan.objects.create(
+                nombre=f"Plan {cantidad}",
+                descripcion="Test",
+                fecha_inicio="2024-01-01",
+                fecha_termino="2024-12-31",
+                responsable="Tester"
+            )
+            data = {
+                "id_plan": plan.id,
+                "id_organismo_sectorial": org.id,
+                "id_media": [m.id for m in medidas[inicio:inicio + cantidad]]
+            }
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.post('/api/plan-organismo-sectorial/', data, format='json')
+            self.assertEqual(response.status_code, 201)
+            self.assertEqual(response.data['cantidad'], cantidad)
+            self.assertEqual(len(response.data['datos']), cantidad)
+            consultas[cantidad] = len(ctx)
+
+        self.assertEqual(consultas[1], consultas[100], consultas)
+
 class ReporteApiTest(TestCase):
 
     def setUp(self):
@@ -423,3 +544,1669 @@ class ReporteApiTest(TestCase):
         }
         response = self.client.post('/api/reporte/', data)
         self.assertEqual(response.status_code, 201)
+
+    def _crear_reportes(self, cantidad):
+        return [
+            Reporte.objects.create(
+                id_plan_organismo_sectorial=self.relacion,
+                valor_reportado=i,
+                evidencia="url de evidencia",
+                fecha_reporte="2024-04-15"
+            )
+            for i in range(cantidad)
+        ]
+
+    def test_api_export_csv(self):
+        """
+        Prueba la exportación de reportes en formato CSV por streaming.
+        """
+        self._crear_reportes(3)
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get('/api/reporte/export/', {'format': 'csv'})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        lineas = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lineas[0].split(',')[:3], ['id', 'valor_reportado', 'evidencia'])
+        self.assertEqual(len(lineas), 4)
+        self.assertIn('2.00', lineas[3])
+
+    def test_api_export_ndjson_por_lotes(self):
+        """
+        Prueba la exportación NDJSON avanzando por lotes cuando no hay cursores del servidor.
+        """
+        reportes = self._crear_reportes(5)
+        self.client.force_authenticate(user=self.user)
+        with mock.patch.dict(connection.settings_dict, {'DISABLE_SERVER_SIDE_CURSORS': True}), \
+                mock.patch.object(ReporteViewSet, 'export_chunk_size', 2):
+            response = self.client.get('/api/reporte/export/', HTTP_ACCEPT='application/x-ndjson')
+            filas = [json.loads(l) for l in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson; charset=utf-8')
+        self.assertEqual([f['id'] for f in filas], [r.id for r in reportes])
+        self.assertEqual(filas[0]['id_plan_organismo_sectorial'], self.relacion.id)
+        self.assertEqual(filas[0]['fecha_reporte'], '2024-04-15')
+
+    def test_api_export_sin_autenticacion(self):
+        """
+        Prueba que la exportación exige autenticación.
+        """
+        response = self.client.get('/api/reporte/export/')
+        self.assertEqual(response.status_code, 401)
+
+    def _payload_bulk(self, cantidad, **extra):
+        return [
+            {
+                "id_plan_organismo_sectorial": self.relacion.id,
+                "valor_reportado": "10.50",
+                "evidencia": "url de evidencia",
+                "fecha_reporte": "2024-04-15",
+                **extra
+            }
+            for _ in range(cantidad)
+        ]
+
+    def test_api_bulk_create(self):
+        """
+        Prueba la creación de reportes por lote con un número de consultas constante.
+        """
+        self.client.force_authenticate(user=self.user)
+        # Los roles quedan en caché tras la primera solicitud.
+        self.client.get('/api/reporte/')
+        with CaptureQueriesContext(connection) as pocas:
+            response = self.client.post('/api/reporte/bulk/', self._payload_bulk(2), format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['cantidad'], 2)
+
+        with CaptureQueriesContext(connection) as muchas:
+            response = self.client.post('/api/reporte/bulk/', self._payload_bulk(100), format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(muchas), len(pocas))
+        self.assertEqual(Reporte.objects.count(), 102)
+
+    def test_api_bulk_create_errores_por_fila(self):
+        """
+        Prueba que un lote con filas inválidas no guarda nada y devuelve los errores por fila.
+        """
+        self.client.force_authenticate(user=self.user)
+        data = self._payload_bulk(3)
+        data[1]["fecha_reporte"] = "2999-01-01"
+        data[2]["id_plan_organismo_sectorial"] = 999
+        response = self.client.post('/api/reporte/bulk/', data, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([e['fila'] for e in response.data['detail']], [1, 2])
+        self.assertIn('fecha_reporte', response.data['detail'][0]['errores'])
+        self.assertIn('id_plan_organismo_sectorial', response.data['detail'][1]['errores'])
+        self.assertEqual(Reporte.objects.count(), 0)
+
+    def test_api_expand_anidado(self):
+        """
+        Prueba que ?expand= anida las relaciones sin consultas adicionales por fila.
+        """
+        self.client.force_authenticate(user=self.user)
+        self._crear_reportes(2)
+        expand = {'expand': 'id_plan_organismo_sectorial.id_plan,id_plan_organismo_sectorial.id_media.id_tipo_medida'}
+        self.client.get('/api/reporte/', expand)
+        with CaptureQueriesContext(connection) as pocas:
+            response = self.client.get('/api/reporte/', expand)
+        self._crear_reportes(10)
+        with CaptureQueriesContext(connection) as muchas:
+            self.client.get('/api/reporte/', expand)
+        self.assertEqual(len(pocas), len(muchas))
+
+        relacion = response.data['results'][0]['id_plan_organismo_sectorial']
+        self.assertEqual(relacion['id'], self.relacion.id)
+        self.assertEqual(relacion['id_plan']['nombre'], "Plan Test")
+        self.assertEqual(relacion['id_media']['id_tipo_medida']['nombre'], "Medida Test")
+        self.assertEqual(relacion['id_organismo_sectorial'], self.org.id)
+
+    def test_api_expand_invalido(self):
+        """
+        Prueba que una ruta de expansión desconocida responde 400.
+        """
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get('/api/reporte/', {'expand': 'id_plan_organismo_sectorial.evidencia'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('expand', response.data['detail'])
+
+    def test_api_resumen(self):
+        """
+        Prueba el resumen agregado de reportes por plan y mes.
+        """
+        for valor, fecha in ((10, "2024-01-05"), (20, "2024-01-20"), (5, "2024-02-01")):
+            Reporte.objects.create(
+                id_plan_organismo_sectorial=self.relacion,
+                valor_reportado=valor,
+                evidencia="url",
+                fecha_reporte=fecha
+            )
+        Reporte.objects.create(
+            id_plan_organismo_sectorial=self.relacion, valor_reportado=99,
+            evidencia="url", fecha_reporte="2024-01-10", is_active=False
+        )
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get('/api/reporte/resumen/', {'group_by': 'plan', 'period': 'month'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 2)
+        enero = response.data[0]
+        self.assertEqual(enero['grupo'], self.plan.id)
+        self.assertEqual(enero['nombre'], "Plan Test")
+        self.assertEqual(enero['periodo'], "2024-01-01")
+        self.assertEqual(enero['cantidad'], 2)
+        self.assertEqual(enero['suma'], "30.00")
+        self.assertEqual(enero['promedio'], "15.00")
+        self.assertEqual((enero['minimo'], enero['maximo']), ("10.00", "20.00"))
+
+        response = self.client.get('/api/reporte/resumen/', {'group_by': 'tipo_medida', 'period': 'year'})
+        self.assertEqual(response.data[0]['cantidad'], 3)
+        self.assertEqual(response.data[0]['promedio'], "11.67")
+        self.assertEqual(self.client.get('/api/reporte/resumen/', {'period': 'siglo'}).status_code, 400)
+
+    def test_api_resumen_promedio_no_entero(self):
+        """
+        Prueba que el promedio por mes y año (desde el resumen mensual) no se
+        trunca y coincide con el de día y semana.
+        """
+        for valor in (10, 15):
+            Reporte.objects.create(id_plan_organismo_sectorial=self.relacion, valor_reportado=valor,
+                                   evidencia="url", fecha_reporte="2024-01-08")
+        self.client.force_authenticate(user=self.user)
+        for periodo in ('day', 'week', 'month', 'year'):
+            with self.subTest(periodo=periodo):
+                response = self.client.get('/api/reporte/resumen/', {'group_by': 'plan', 'period': periodo})
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.data[0]['promedio'], "12.50")
+
+class FiltrosListadoApiTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username=username, password=password)
+        grupo, _ = Group.objects.get_or_create(name='OrganismoSectorial')
+        self.user.groups.add(grupo)
+        self.client.force_authenticate(user=self.user)
+
+        tipos = [TipoMedida.objects.create(nombre=f"Tipo {i}", descripcion="-") for i in range(2)]
+        self.medidas = [
+            Medida.objects.create(id_tipo_medida=tipos[i], nombre_corto=f"Med {i}", indicador="-",
+                                  forma_calculo="-", frecuencia_reporte="Mensual")
+            for i in range(2)
+        ]
+        self.tipos = tipos
+        org = OrganismoSectorial.objects.create(nombre="Org", tipo="-", contacto="-")
+        self.planes = [
+            Plan.objects.create(nombre=f"Plan F{i}", descripcion="-", fecha_inicio="2024-01-01",
+                                fecha_termino="2024-12-31", responsable="-", estado=estado)
+            for i, estado in enumerate(['en_progreso', 'finalizado'])
+        ]
+        self.relaciones = [
+            PlanOrganismoSectorial.objects.create(id_plan=plan, id_organismo_sectorial=org, id_media=medida)
+            for plan, medida in zip(self.planes, self.medidas)
+        ]
+        for relacion in self.relaciones:
+            for fecha, valor in [("2024-01-10", 10), ("2024-02-20", 50), ("2024-04-05", 90)]:
+                Reporte.objects.create(id_plan_organismo_sectorial=relacion, valor_reportado=valor,
+                                       evidencia="-", fecha_reporte=fecha)
+
+    def ids(self, url, params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return sorted(fila['id'] for fila in response.data['results'])
+
+    def test_filtros_reporte(self):
+        """
+        Prueba los filtros del listado de reportes y que se combinan entre sí.
+        """
+        primera = Reporte.objects.filter(id_plan_organismo_sectorial=self.relaciones[0])
+        self.assertEqual(self.ids('/api/reporte/', {'plan': self.planes[0].id}),
+                         sorted(primera.values_list('id', flat=True)))
+        self.assertEqual(self.ids('/api/reporte/', {'tipo_medida': self.tipos[0].id}),
+                         sorted(primera.values_list('id', flat=True)))
+        self.assertEqual(self.ids('/api/reporte/', {'estado_plan': 'finalizado'}),
+                         sorted(Reporte.objects.filter(id_plan_organismo_sectorial=self.relaciones[1])
+                                .values_list('id', flat=True)))
+        esperados = primera.filter(fecha_reporte__range=("2024-01-01", "2024-03-31"), valor_reportado__gte=20)
+        self.assertEqual(
+            self.ids('/api/reporte/', {'medida': self.medidas[0].id, 'fecha_desde': '2024-01-01',
+                                       'fecha_hasta': '2024-03-31', 'valor_min': '20'}),
+            list(esperados.values_list('id', flat=True))
+        )
+
+    def test_filtros_invalidos(self):
+        """
+        Prueba que los parámetros inválidos responden 400 con el detalle por campo.
+        """
+        response = self.client.get('/api/reporte/', {'plan': 'x', 'fecha_desde': '2024-05-01',
+                                                     'fecha_hasta': '2024-01-01'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('plan', response.data['detail'])
+        response = self.client.get('/api/reporte/', {'fecha_desde': '2024-05-01', 'fecha_hasta': '2024-01-01'})
+        self.assertIn('fecha_hasta', response.data['detail'])
+        response = self.client.get('/api/plan-organismo-sectorial/', {'estado_plan': 'otro'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_filtros_relacion(self):
+        """
+        Prueba los filtros del listado de relaciones plan-organismo.
+        """
+        self.assertEqual(self.ids('/api/plan-organismo-sectorial/', {'medida': self.medidas[1].id}),
+                         [self.relaciones[1].id])
+        self.assertEqual(self.ids('/api/plan-organismo-sectorial/', {'estado_plan': 'en_progreso'}),
+                         [self.relaciones[0].id])
+
+    def test_resumen_filtrado(self):
+        """
+        Prueba que el resumen aplica los filtros: con meses completos desde el
+        resumen mensual y, si no, recorriendo Reporte.
+        """
+        url = '/api/reporte/resumen/'
+        base = {'group_by': 'plan', 'period': 'month', 'plan': self.planes[0].id}
+        response = self.client.get(url, {**base, 'fecha_desde': '2024-02-01', 'fecha_hasta': '2024-04-30'})
+        self.assertEqual([fila['cantidad'] for fila in response.data], [1, 1])
+
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get(url, {**base, 'valor_max': '60'})
+        self.assertEqual([(fila['periodo'], fila['cantidad']) for fila in response.data],
+                         [('2024-01-01', 1), ('2024-02-01', 1)])
+        self.assertFalse(any('resumenmensual' in consulta['sql'] for consulta in consultas.captured_queries))
+
+@skipUnless(connection.vendor in ('sqlite', 'postgresql'), "Búsqueda indexada solo en SQLite y PostgreSQL")
+class BusquedaApiTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username=username, password=password)
+        grupo, _ = Group.objects.get_or_create(name='Administrador')
+        self.user.groups.add(grupo)
+        self.client.force_authenticate(user=self.user)
+
+        tipo = TipoMedida.objects.create(nombre="Tipo búsqueda", descripcion="-")
+        datos = [
+            ("Emisiones de vehículos", "Toneladas de emisiones evitadas", "Emisiones base menos emisiones"),
+            ("Reforestación", "Hectáreas reforestadas", "Suma de hectáreas"),
+            ("Transporte", "Buses eléctricos", "Conteo de emisiones por bus"),
+        ]
+        self.medidas = [
+            Medida.objects.create(id_tipo_medida=tipo, nombre_corto=nombre, indicador=indicador,
+                                  forma_calculo=calculo, frecuencia_reporte="Anual")
+            for nombre, indicador, calculo in datos
+        ]
+        self.plan = Plan.objects.create(nombre="Plan de acción climática", descripcion="Mitigación urbana",
+                                        fecha_inicio="2024-01-01", fecha_termino="2024-12-31", responsable="-")
+        Plan.objects.create(nombre="Plan hídrico", descripcion="Gestión de cuencas",
+                            fecha_inicio="2024-01-01", fecha_termino="2024-12-31", responsable="-")
+
+    def buscar(self, url, texto, **params):
+        response = self.client.get(url, {'q': texto, **params})
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def ids(self, url, texto):
+        return [fila['id'] for fila in self.buscar(url, texto).data['results']]
+
+    def test_busqueda_ordenada_por_relevancia(self):
+        """
+        Prueba que ``q`` filtra y que la coincidencia en ``nombre_corto``
+        queda antes que la coincidencia en campos menos relevantes.
+        """
+        self.assertEqual(self.ids('/api/medida/', 'emisiones'), [self.medidas[0].id, self.medidas[2].id])
+        self.assertEqual(self.ids('/api/plan/', 'mitigacion'), [self.plan.id])
+        self.assertEqual(len(self.ids('/api/medida/', '')), 3)
+
+    def test_busqueda_sin_acentos(self):
+        """
+        Prueba que la búsqueda no distingue acentos en ninguna dirección.
+        """
+        self.assertEqual(self.ids('/api/medida/', 'REFORESTACION hectareas'), [self.medidas[1].id])
+        self.assertEqual(self.ids('/api/medida/', 'eléctricos'), [self.medidas[2].id])
+        self.assertEqual(self.ids('/api/plan/', 'hídrico'), self.ids('/api/plan/', 'hidrico'))
+
+    def test_busqueda_sigue_ediciones_y_borrado_logico(self):
+        """
+        Prueba que el índice se actualiza al editar, al eliminar con
+        borrado lógico y con ``queryset.update()``.
+        """
+        medida = self.medidas[1]
+        medida.indicador = "Humedales recuperados"
+        medida.save()
+        self.assertEqual(self.ids('/api/medida/', 'humedales'), [medida.id])
+        self.assertEqual(self.ids('/api/medida/', 'reforestadas'), [])
+
+        medida.delete()
+        self.assertEqual(self.ids('/api/medida/', 'humedales'), [])
+        response = self.client.delete(f'/api/plan/{self.plan.id}/')
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.ids('/api/plan/', 'climatica'), [])
+
+        # update() no emite señales: se descarta la caché del catálogo a mano.
+        Medida.all_objects.filter(pk=medida.pk).update(is_active=True)
+        cache.clear()
+        self.assertEqual(self.ids('/api/medida/', 'humedales'), [medida.id])
+        Medida.objects.filter(pk=medida.pk).update(is_active=False)
+        cache.clear()
+        self.assertEqual(self.ids('/api/medida/', 'humedales'), [])
+
+    def test_busqueda_paginada(self):
+        """
+        Prueba que el cursor recorre los resultados en orden de relevancia
+        sin repetir ni omitir filas.
+        """
+        esperados = self.ids('/api/medida/', 'emisiones')
+        response = self.buscar('/api/medida/', 'emisiones', page_size=1)
+        vistos = [fila['id'] for fila in response.data['results']]
+        siguiente = self.client.get(response.data['next'])
+        vistos += [fila['id'] for fila in siguiente.data['results']]
+        self.assertEqual(vistos, esperados)
+        self.assertIsNone(siguiente.data['next'])
+        anterior = self.client.get(siguiente.data['previous'])
+        self.assertEqual([fila['id'] for fila in anterior.data['results']], esperados[:1])
+
+
+class PaginacionReporteApiTest(TestCase):
+
+    def setUp(self):
+        """
+        Configura reportes suficientes para recorrer varias páginas.
+        """
+        self.client = APIClient()
+        self.user = User.objects.create_user(username=username, password=password)
+        grupo, _ = Group.objects.get_or_create(name='OrganismoSectorial')
+        self.user.groups.add(grupo)
+
+        tipo = TipoMedida.objects.create(nombre="Medida Test", descripcion="Desc test")
+        medida = Medida.objects.create(
+            id_tipo_medida=tipo,
+            nombre_corto="Med Test",
+            indicador="Ind 1",
+            forma_calculo="Suma",
+            frecuencia_reporte="Mensual",
+            medios_verificacion="Doc",
+            tipo_regulatoria="Norma"
+        )
+        org = OrganismoSectorial.objects.create(nombre="Org Test", tipo="Público", contacto="org@test.cl")
+        plan = Plan.objects.create(
+            nombre="Plan Test",
+            descripcion="Test",
+            fecha_inicio="2024-01-01",
+            fecha_termino="2024-12-31",
+            responsable="Tester",
+            estado="sin_iniciar"
+        )
+        relacion = PlanOrganismoSectorial.objects.create(
+            id_plan=plan,
+            id_organismo_sectorial=org,
+            id_media=medida
+        )
+        self.reportes = [
+            Reporte.objects.create(
+                id_plan_organismo_sectorial=relacion,
+                valor_reportado=i,
+                evidencia="url",
+                fecha_reporte="2024-04-15"
+            )
+            for i in range(5)
+        ]
+        self.client.force_authenticate(user=self.user)
+
+    def test_recorre_paginas_con_cursor(self):
+        """
+        Prueba que los cursores next y previous recorren todos los reportes sin repetir.
+        """
+        response = self.client.get('/api/reporte/', {'page_size': 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.data['previous'])
+
+        ids = []
+        paginas = []
+        while True:
+            ids.extend(r['id'] for r in response.data['results'])
+            paginas.append([r['id'] for r in response.data['results']])
+            if not response.data['next']:
+                break
+            response = self.client.get(response.data['next'])
+        self.assertEqual(ids, [r.id for r in self.reportes])
+
+        response = self.client.get(response.data['previous'])
+        self.assertEqual([r['id'] for r in response.data['results']], paginas[-2])
+
+    def test_page_size_maximo(self):
+        """
+        Prueba que page_size no supera el máximo permitido.
+        """
+        request = Request(APIRequestFactory().get('/api/reporte/', {'page_size': 100000}))
+        self.assertEqual(KeysetPagination().get_page_size(request), KeysetPagination.max_page_size)
+
+    def test_cursor_invalido(self):
+        """
+        Prueba que un cursor mal formado responde 404.
+        """
+        response = self.client.get('/api/reporte/', {'cursor': 'no-es-un-cursor'})
+        self.assertEqual(response.status_code, 404)
+
+class RolesCacheTest(TestCase):
+
+    def setUp(self):
+        """
+        Configura un usuario con rol OrganismoSectorial.
+        """
+        self.client = APIClient()
+        self.user = User.objects.create_user(username=username, password=password)
+        self.sectorial, _ = Group.objects.get_or_create(name='OrganismoSectorial')
+        self.admin, _ = Group.objects.get_or_create(name='Administrador')
+        self.user.groups.add(self.sectorial)
+        self.client.force_authenticate(user=self.user)
+
+    def test_roles_sin_consultas_entre_solicitudes(self):
+        """
+        Prueba que tras la primera solicitud los permisos no consultan los grupos.
+        """
+        _cache_compartida(self)
+        self.client.get('/api/reporte/')
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/reporte/')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(any('auth_group' in q['sql'] for q in ctx))
+
+    def test_roles_se_invalidan_al_cambiar_grupos(self):
+        """
+        Prueba que agregar o quitar grupos invalida la caché de roles.
+        """
+        _cache_compartida(self)
+        self.assertEqual(self.client.post('/api/tipo-medida/', {"nombre": "A", "descripcion": "B"}).status_code, 403)
+        self.user.groups.add(self.admin)
+        self.assertEqual(self.client.post('/api/tipo-medida/', {"nombre": "A", "descripcion": "B"}).status_code, 201)
+
+        self.admin.user_set.remove(self.user)
+        request = Request(APIRequestFactory().get('/'))
+        request.user = self.user
+        self.assertEqual(get_user_roles(request), frozenset({'OrganismoSectorial'}))
+
+    def test_locmem_sin_cache_entre_solicitudes(self):
+        """
+        Prueba que con LocMemCache (una copia por proceso) los roles solo se
+        guardan en el request: un cambio de grupos hecho en otro worker, sin
+        señal en este proceso, se ve en la siguiente solicitud.
+        """
+        self.client.get('/api/reporte/')
+        self.assertIsNone(cache.get(f'api:roles:{self.user.pk}', version=1))
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get('/api/reporte/')
+        self.assertEqual(sum('auth_group' in q['sql'] for q in ctx), 1)
+
+        self.user.groups.through.objects.filter(user=self.user).delete()
+        self.assertEqual(self.client.get('/api/reporte/').status_code, 403)
+
+class StatelessJWTTest(TestCase):
+
+    def setUp(self):
+        """
+        Configura un usuario OrganismoSectorial y obtiene su token.
+        """
+        self.client = APIClient()
+        self.user = User.objects.create_user(username=username, password=password)
+        grupo, _ = Group.objects.get_or_create(name='OrganismoSectorial')
+        self.user.groups.add(grupo)
+        estado_usuarios.clear()
+
+        response = self.client.post('/api/token/', {'username': username, 'password': password})
+        self.assertEqual(response.status_code, 200)
+        self.access = response.data['access']
+
+    def test_token_incluye_roles(self):
+        """
+        Prueba que el token emitido incluye los roles del usuario.
+        """
+        self.assertEqual(AccessToken(self.access)['roles'], ['OrganismoSectorial'])
+
+    def test_autenticacion_sin_consultar_usuario(self):
+        """
+        Prueba que la autenticación sin estado no consulta auth_user ni auth_group.
+        """
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.access}')
+        with mock.patch.object(ReporteViewSet, 'authentication_classes', [StatelessJWTAuthentication]):
+            self.client.get('/api/reporte/')
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get('/api/reporte/')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(any('auth_' in q['sql'] for q in ctx))
+
+    def test_usuario_inactivo_rechazado(self):
+        """
+        Prueba que un usuario desactivado es rechazado.
+        """
+        self.user.is_active = False
+        self.user.save()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.access}')
+        with mock.patch.object(ReporteViewSet, 'authentication_classes', [StatelessJWTAuthentication]):
+            response = self.client.get('/api/reporte/')
+        self.assertEqual(response.status_code, 401)
+
+    def test_token_sin_roles_consulta_grupos(self):
+        """
+        Prueba que un token sin el claim ``roles`` obtiene los grupos reales
+        del usuario y no deja un conjunto vacío en la caché compartida.
+        """
+        cache.clear()
+        token = AccessToken.for_user(self.user)
+        self.assertNotIn('roles', token)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        with mock.patch.object(ReporteViewSet, 'authentication_classes', [StatelessJWTAuthentication]):
+            self.assertEqual(self.client.get('/api/reporte/').status_code, 200)
+
+        request = Request(APIRequestFactory().get('/'))
+        request.user = self.user
+        self.assertEqual(get_user_roles(request), frozenset(['OrganismoSectorial']))
+
+class ExplainIndicesCommandTest(TestCase):
+
+    def test_explain_usa_indices_parciales(self):
+        """
+        Prueba que los accesos filtrados por is_active usan los índices parciales.
+        """
+        salida = StringIO()
+        call_command('explain_indices', reportes=500, stdout=salida)
+        texto = salida.getvalue()
+        if connection.vendor == 'sqlite':
+            self.assertIn('reporte_fecha_activo_idx', texto)
+            self.assertIn('planorgsect_activo_idx', texto)
+        self.assertEqual(Reporte.objects.count(), 0)
+
+class BenchApiCommandTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.directorio = tempfile.TemporaryDirectory()
+        self.baseline = os.path.join(self.directorio.name, 'baseline.json')
+
+    def tearDown(self):
+        self.directorio.cleanup()
+
+    def bench(self, **opciones):
+        salida = StringIO()
+        call_command(
+            'bench_api', planes=2, organismos=2, medidas=3, relaciones=4, reportes=20, iteraciones=3,
+            calentamiento=1, baseline=self.baseline, stdout=salida, **opciones
+        )
+        return salida.getvalue()
+
+    def editar_baseline(self, **campos):
+        with open(self.baseline, encoding='utf-8') as archivo:
+            baseline = json.load(archivo)
+        baseline['escenarios']['GET reporte-list'].update(campos)
+        with open(self.baseline, 'w', encoding='utf-8') as archivo:
+            json.dump(baseline, archivo)
+
+    def test_guarda_baseline_de_todas_las_rutas(self):
+        """
+        Prueba que se mide cada ruta del router sin errores y que los datos se revierten.
+        """
+        self.bench(guardar_baseline=True)
+        with open(self.baseline, encoding='utf-8') as archivo:
+            baseline = json.load(archivo)
+        escenarios = baseline['escenarios']
+        self.assertGreater(baseline['calibracion_ms'], 0)
+        for nombre in ('GET reporte-list', 'DELETE plan-detail', 'POST reporte-bulk-create',
+                       'POST tipomedida-bulk-destroy', 'GET reporte-resumen', 'GET metrics'):
+            self.assertIn(nombre, escenarios)
+        self.assertTrue(all(resultado['errores'] == 0 for resultado in escenarios.values()))
+        self.assertEqual(Plan.all_objects.count(), 0)
+        self.assertFalse(User.objects.filter(username='bench-api').exists())
+
+    def test_falla_si_supera_el_baseline(self):
+        """
+        Prueba que el comando falla cuando una ruta hace más consultas que en el baseline.
+        """
+        self.bench(solo='reporte-list', guardar_baseline=True)
+        self.editar_baseline(queries=0)
+        # Tolerancia amplia: solo cuenta la cantidad de consultas.
+        with self.assertRaisesRegex(CommandError, r'GET reporte-list: \d+ consultas > 0'):
+            self.bench(solo='reporte-list', tolerancia=100)
+
+    def test_latencia_solo_informativa(self):
+        """
+        Prueba que la latencia sobre el baseline se informa sin fallar, salvo con --estricto.
+        """
+        self.bench(solo='reporte-list', guardar_baseline=True)
+        self.editar_baseline(p95_ms=0, p95_rel=0)
+        salida = self.bench(solo='reporte-list', tolerancia=0, margen_ms=0)
+        self.assertIn('GET reporte-list: p95', salida)
+        self.assertIn('Resultados dentro de los umbrales del baseline.', salida)
+        with self.assertRaisesMessage(CommandError, 'GET reporte-list: p95'):
+            self.bench(solo='reporte-list', tolerancia=0, margen_ms=0, estricto=True)
+
+class BenchFastListCommandTest(TestCase):
+    def test_compara_caminos(self):
+        """
+        Prueba que el comando mide cada viewset por ambos caminos y revierte los datos.
+        """
+        salida = StringIO()
+        call_command('bench_fast_list', '--filas', '20', '--repeticiones', '1', stdout=salida)
+        for basename in ('tipomedida', 'medida', 'plan', 'organismosectorial', 'planorganismosectorial', 'reporte'):
+            self.assertRegex(salida.getvalue(), rf'\n{basename} +20 ')
+        self.assertFalse(TipoMedida.all_objects.filter(nombre__startswith='bench-fast').exists())
+
+class SeedSyntheticCommandTest(TestCase):
+    def seed(self, **opciones):
+        call_command(
+            'seed_synthetic', **{
+                'tipos': 2, 'medidas': 5, 'organismos': 3, 'planes': 4, 'relaciones_por_plan': 3, 'reportes': 300,
+                'lote': 70, 'desde': date(2023, 1, 1), 'hasta': date(2023, 12, 31), 'stdout': StringIO(), **opciones
+            }
+        )
+
+    def test_genera_datos_y_resumen(self):
+        """
+        Prueba que se generan las cardinalidades pedidas, sin relaciones
+        duplicadas y con el resumen mensual reconstruido.
+        """
+        self.seed()
+        self.assertEqual(Plan.all_objects.filter(nombre__startswith='sintetico-').count(), 4)
+        self.assertEqual(Reporte.all_objects.count(), 300)
+        self.assertFalse(Reporte.all_objects.exclude(fecha_reporte__year=2023).exists())
+        triples = list(PlanOrganismoSectorial.all_objects.values_list('id_plan', 'id_organismo_sectorial', 'id_media'))
+        self.assertEqual(len(triples), len(set(triples)))
+        self.assertEqual(
+            sum(ReporteResumenMensual.objects.values_list('cantidad', flat=True)),
+            Reporte.objects.count()
+        )
+
+    def test_prefijo_existente(self):
+        """
+        Prueba que no se vuelve a generar sobre datos con el mismo prefijo.
+        """
+        self.seed(reportes=0)
+        with self.assertRaisesMessage(CommandError, "prefijo 'sintetico'"):
+            self.seed(reportes=0)
+
+class ListadoHtmlTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.planes = [
+            Plan.objects.create(
+                nombre=f"Plan {i:02d}", descripcion="desc", fecha_inicio="2024-01-01", fecha_termino="2024-12-31",
+                responsable="Ana" if i % 2 else "Luis", estado='en_progreso' if i % 3 else 'finalizado'
+            )
+            for i in range(30)
+        ]
+
+    def test_paginacion_orden_y_filtros(self):
+        """
+        Prueba que la lista de planes se pagina, ordena, filtra y excluye los inactivos.
+        """
+        self.planes[29].delete()
+        response = self.client.get('/plan/', {'sort': '-nombre', 'per_page': 10})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Plan 28')
+        self.assertNotContains(response, 'Plan 29')
+        self.assertNotContains(response, 'Plan 18')
+        self.assertContains(response, 'Página 1 de 3')
+
+        response = self.client.get('/plan/', {'q': 'Luis', 'estado': 'finalizado'})
+        # Pares y múltiplos de 3: 0, 6, 12, 18, 24.
+        self.assertContains(response, 'Mostrando 1-5 de 5')
+
+    def test_tabla_cacheada_hasta_que_cambian_los_datos(self):
+        """
+        Prueba que una visita repetida solo consulta el último updated_at y que
+        un cambio en los datos invalida la tabla.
+        """
+        self.client.get('/tipo-medida/', {'page': 1})
+        with CaptureQueriesContext(connection) as consultas:
+            self.client.get('/tipo-medida/', {'page': 1})
+        self.assertEqual(len(consultas), 1)
+
+        TipoMedida.objects.create(nombre="Nuevo tipo", descripcion="x")
+        response = self.client.get('/tipo-medida/', {'page': 1})
+        self.assertContains(response, 'Nuevo tipo')
+
+class ConditionalGetTest(TestCase):
+
+    def setUp(self):
+        """
+        Configura un administrador y dos tipos de medida.
+        """
+        self.client = APIClient()
+        self.admin_user = User.objects.create_user(username=username, password=password)
+        grupo, _ = Group.objects.get_or_create(name='Administrador')
+        self.admin_user.groups.add(grupo)
+        self.client.force_authenticate(user=self.admin_user)
+        self.tipos = [
+            TipoMedida.objects.create(nombre=f"Tipo {i}", descripcion="Desc") for i in range(2)
+        ]
+
+    def test_listado_304_y_borrado_cambia_etag(self):
+        """
+        Prueba que el listado responde 304 con el mismo ETag y que un borrado lógico lo invalida.
+        """
+        response = self.client.get('/api/tipo-medida/')
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        self.assertFalse(response.has_header('Last-Modified'))
+
+        response = self.client.get('/api/tipo-medida/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+        self.client.delete(f'/api/tipo-medida/{self.tipos[0].id}/')
+        response = self.client.get('/api/tipo-medida/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_detalle_304(self):
+        """
+        Prueba el GET condicional sobre un objeto y que una modificación lo invalida.
+        """
+        url = f'/api/tipo-medida/{self.tipos[1].id}/'
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.tipos[1].descripcion = "Otra descripción"
+        self.tipos[1].save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+        self.assertEqual(self.client.get('/api/tipo-medida/999/').status_code, 404)
+
+    def test_if_modified_since_tras_borrado_logico(self):
+        """
+        Prueba que el listado ignora ``If-Modified-Since`` (un borrado lógico
+        no avanza ``max(updated_at)``) y que el detalle lo atiende.
+        """
+        cache.clear()
+        futuro = http_date(time.time() + 3600)
+        self.assertEqual(self.client.get('/api/tipo-medida/').status_code, 200)
+        self.client.delete(f'/api/tipo-medida/{self.tipos[0].id}/')
+        response = self.client.get('/api/tipo-medida/', HTTP_IF_MODIFIED_SINCE=futuro)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([tipo['id'] for tipo in response.data['results']], [self.tipos[1].id])
+
+        url = f'/api/tipo-medida/{self.tipos[1].id}/'
+        last_modified = self.client.get(url)['Last-Modified']
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 304)
+
+    def test_expand_cambia_etag_al_modificar_relacion(self):
+        """
+        Prueba que con ``?expand=`` modificar el objeto anidado invalida el
+        ETag del listado y del detalle.
+        """
+        cache.clear()
+        medida = Medida.objects.create(id_tipo_medida=self.tipos[0], nombre_corto="Med", indicador="Ind",
+                                       forma_calculo="Suma", frecuencia_reporte="Mensual")
+        org = OrganismoSectorial.objects.create(nombre="Org", tipo="Público", contacto="org@test.cl")
+        plan = Plan.objects.create(nombre="Plan", descripcion="-", fecha_inicio="2024-01-01",
+                                   fecha_termino="2024-12-31", responsable="-", estado='en_progreso')
+        relacion = PlanOrganismoSectorial.objects.create(id_plan=plan, id_organismo_sectorial=org, id_media=medida)
+        urls = [
+            ('/api/plan-organismo-sectorial/', {'expand': 'id_media.id_tipo_medida'}),
+            (f'/api/plan-organismo-sectorial/{relacion.id}/', {'expand': 'id_media.id_tipo_medida'}),
+            ('/api/medida/', {'expand': 'id_tipo_medida'}),
+        ]
+        etags = [self.client.get(url, params)['ETag'] for url, params in urls]
+        for (url, params), etag in zip(urls, etags):
+            self.assertEqual(self.client.get(url, params, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.client.patch(f'/api/tipo-medida/{self.tipos[0].id}/', {'descripcion': 'Cambiada'}, format='json')
+        for (url, params), etag in zip(urls, etags):
+            with self.subTest(url=url):
+                response = self.client.get(url, params, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200)
+                self.assertIn('Cambiada', response.content.decode())
+        sin_expand = self.client.get('/api/plan-organismo-sectorial/')['ETag']
+        self.assertEqual(self.client.get('/api/plan-organismo-sectorial/', HTTP_IF_NONE_MATCH=sin_expand).status_code,
+                         304)
+
+class CatalogCacheTest(TestCase):
+
+    def setUp(self):
+        """
+        Configura un usuario OrganismoSectorial y un organismo sectorial.
+        """
+        # Caché compartida: con locmem los roles (parte de la clave) se
+        # consultan en cada solicitud.
+        _cache_compartida(self)
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username=username, password=password)
+        grupo, _ = Group.objects.get_or_create(name='OrganismoSectorial')
+        self.user.groups.add(grupo)
+        self.client.force_authenticate(user=self.user)
+        self.org = OrganismoSectorial.objects.create(nombre="Org Test", tipo="Público", contacto="org@test.cl")
+
+    def test_lectura_desde_cache_sin_consultas(self):
+        """
+        Prueba que la segunda lectura del catálogo no consulta la base.
+        """
+        primera = self.client.get('/api/organismo-sectorial/')
+        with CaptureQueriesContext(connection) as ctx:
+            segunda = self.client.get('/api/organismo-sectorial/')
+        self.assertEqual(len(ctx), 0)
+        self.assertEqual(segunda['X-Cache'], 'HIT')
+        self.assertEqual(segunda.content, primera.content)
+        self.assertEqual(self.client.get('/api/organismo-sectorial/', HTTP_IF_NONE_MATCH=primera['ETag']).status_code, 304)
+
+    def test_invalidacion_al_guardar_y_borrar(self):
+        """
+        Prueba que guardar o borrar lógicamente un registro invalida la caché.
+        """
+        url = f'/api/organismo-sectorial/{self.org.id}/'
+        self.client.get(url)
+        self.org.contacto = "nuevo@test.cl"
+        self.org.save()
+        response = self.client.get(url)
+        self.assertFalse(response.has_header('X-Cache'))
+        self.assertEqual(response.data['contacto'], "nuevo@test.cl")
+
+        self.client.get('/api/organismo-sectorial/')
+        self.org.delete()
+        response = self.client.get('/api/organismo-sectorial/')
+        self.assertEqual(response.data['results'], [])
+
+    def test_cache_por_rol(self):
+        """
+        Prueba que la respuesta cacheada no se comparte entre roles distintos.
+        """
+        self.client.get('/api/organismo-sectorial/')
+        admin = User.objects.create_user(username='admintest', password=password)
+        grupo, _ = Group.objects.get_or_create(name='Administrador')
+        admin.groups.add(grupo)
+        self.client.force_authenticate(user=admin)
+        self.assertFalse(self.client.get('/api/organismo-sectorial/').has_header('X-Cache'))
+
+class ReporteResumenMensualTest(TestCase):
+
+    def setUp(self):
+        """
+        Configura una relación plan-organismo-medida para reportar.
+        """
+        tipo = TipoMedida.objects.create(nombre="Medida Test", descripcion="Desc test")
+        medida = Medida.objects.create(
+            id_tipo_medida=tipo,
+            nombre_corto="Med Test",
+            indicador="Ind 1",
+            forma_calculo="Suma",
+            frecuencia_reporte="Mensual"
+        )
+        org = OrganismoSectorial.objects.create(nombre="Org Test", tipo="Público", contacto="org@test.cl")
+        plan = Plan.objects.create(
+            nombre="Plan Test",
+            descripcion="Test",
+            fecha_inicio="2024-01-01",
+            fecha_termino="2024-12-31",
+            responsable="Tester"
+        )
+        self.relacion = PlanOrganismoSectorial.objects.create(
+            id_plan=plan, id_organismo_sectorial=org, id_media=medida
+        )
+
+    def _reporte(self, valor, fecha):
+        return Reporte.objects.create(
+            id_plan_organismo_sectorial=self.relacion, valor_reportado=valor, evidencia="url", fecha_reporte=fecha
+        )
+
+    def _resumen(self, mes):
+        return ReporteResumenMensual.objects.get(id_plan_organismo_sectorial=self.relacion, mes=mes)
+
+    def test_se_mantiene_al_crear_editar_y_borrar(self):
+        """
+        Prueba que el resumen mensual sigue los cambios de los reportes.
+        """
+        self._reporte(10, "2024-03-20")
+        ultimo = self._reporte(30, "2024-03-25")
+        otro = self._reporte(20, "2024-03-01")
+        resumen = self._resumen("2024-03-01")
+        self.assertEqual(
+            (resumen.cantidad, resumen.suma, resumen.minimo, resumen.maximo, resumen.ultimo_valor),
+            (3, 60, 10, 30, 30)
+        )
+
+        otro.fecha_reporte = "2024-04-02"
+        otro.save()
+        self.assertEqual(self._resumen("2024-03-01").cantidad, 2)
+        self.assertEqual(self._resumen("2024-04-01").cantidad, 1)
+
+        ultimo.delete()
+        resumen = self._resumen("2024-03-01")
+        self.assertEqual((resumen.cantidad, resumen.maximo, resumen.ultimo_valor), (1, 10, 10))
+
+        otro.delete()
+        self.assertFalse(ReporteResumenMensual.objects.filter(mes="2024-04-01").exists())
+
+    def test_rebuild_reporte_rollups(self):
+        """
+        Prueba que el comando reconstruye el resumen desde cero.
+        """
+        for valor, fecha in ((5, "2024-01-10"), (7, "2024-02-10"), (9, "2024-02-11")):
+            self._reporte(valor, fecha)
+        esperado = list(ReporteResumenMensual.objects.order_by('mes').values_list('mes', 'cantidad', 'suma', 'ultimo_valor'))
+        ReporteResumenMensual.objects.all().delete()
+        call_command('rebuild_reporte_rollups', lote=1, stdout=StringIO())
+        self.assertEqual(
+            list(ReporteResumenMensual.objects.order_by('mes').values_list('mes', 'cantidad', 'suma', 'ultimo_valor')),
+            esperado
+        )
+
+class BulkDestroyApiTest(TestCase):
+
+    def setUp(self):
+        """
+        Configura un administrador y planes con relaciones y reportes.
+        """
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username=username, password=password)
+        grupo, _ = Group.objects.get_or_create(name='Administrador')
+        self.user.groups.add(grupo)
+        self.client.force_authenticate(user=self.user)
+
+        tipo = TipoMedida.objects.create(nombre="Medida Test", descripcion="Desc test")
+        self.medida = Medida.objects.create(
+            id_tipo_medida=tipo,
+            nombre_corto="Med Test",
+            indicador="Ind 1",
+            forma_calculo="Suma",
+            frecuencia_reporte="Mensual"
+        )
+        self.org = OrganismoSectorial.objects.create(nombre="Org Test", tipo="Público", contacto="org@test.cl")
+
+    def _plan(self, relaciones, reportes):
+        plan = Plan.objects.create(
+            nombre=f"Plan Test {Plan.all_objects.count()}",
+            descripcion="Test",
+            fecha_inicio="2024-01-01",
+            fecha_termino="2024-12-31",
+            responsable="Tester"
+        )
+        for _ in range(relaciones):
+            relacion = PlanOrganismoSectorial.objects.create(
+                id_plan=plan, id_organismo_sectorial=self.org, id_media=self.medida
+            )
+            Reporte.objects.bulk_create([
+                Reporte(id_plan_organismo_sectorial=relacion, valor_reportado=1, evidencia="url", fecha_reporte="2024-05-15")
+                for _ in range(reportes)
+            ])
+            ReporteResumenMensual.recalcular([relacion.pk])
+        return plan
+
+    def test_cascada_desde_plan_consultas_constantes(self):
+        """
+        Prueba que la cascada Plan → relaciones → reportes usa las mismas
+        consultas sin importar cuántas filas afecta.
+        """
+        chico, grande = self._plan(1, 1), self._plan(5, 20)
+        self.client.get('/api/plan/')
+
+        with CaptureQueriesContext(connection) as pocas:
+            response = self.client.post('/api/plan/bulk-delete/', {"ids": [chico.pk], "cascade": True}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+        with CaptureQueriesContext(connection) as muchas:
+            response = self.client.post('/api/plan/bulk-delete/', {"ids": [grande.pk], "cascade": True}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.data['desactivados'],
+            {"Plan": 1, "PlanOrganismoSectorial": 5, "Reporte": 100}
+        )
+        self.assertEqual(len(muchas), len(pocas))
+        self.assertFalse(Reporte.objects.exists())
+        self.assertFalse(ReporteResumenMensual.objects.exists())
+
+    def test_sin_cascada_y_ids_inexistentes(self):
+        """
+        Prueba que sin ``cascade`` solo se desactivan los IDs pedidos y que un
+        ID inexistente no desactiva nada.
+        """
+        plan = self._plan(1, 2)
+        response = self.client.post('/api/plan/bulk-delete/', {"ids": [plan.pk, 999999]}, format='json')
+        self.assertEqual(response.status_code, 404)
+        self.assertTrue(Plan.objects.filter(pk=plan.pk).exists())
+
+        response = self.client.post('/api/plan/bulk-delete/', {"ids": [plan.pk]}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Plan.objects.filter(pk=plan.pk).exists())
+        self.assertEqual(Reporte.objects.count(), 2)
+
+    def test_cascada_desde_medida_invalida_catalogo(self):
+        """
+        Prueba la cascada desde Medida y que el listado cacheado se actualiza.
+        """
+        self._plan(2, 3)
+        self.assertEqual(len(self.client.get('/api/medida/').data['results']), 1)
+
+        response = self.client.post('/api/medida/bulk-delete/', {"ids": [self.medida.pk], "cascade": True}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['desactivados']['Reporte'], 6)
+        self.assertEqual(PlanOrganismoSectorial.objects.count(), 0)
+        self.assertEqual(len(self.client.get('/api/medida/').data['results']), 0)
+
+    def test_requiere_administrador(self):
+        """
+        Prueba que un usuario sin rol de Administrador no puede borrar por lote.
+        """
+        plan = self._plan(1, 1)
+        self.client.force_authenticate(user=User.objects.create_user(username='sinrol', password=password))
+        response = self.client.post('/api/plan/bulk-delete/', {"ids": [plan.pk]}, format='json')
+        self.assertEqual(response.status_code, 403)
+
+def _xlsx(filas):
+    """
+    XLSX mínimo: la primera columna con textos compartidos y el resto en línea.
+    """
+    ns = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+    compartidos = []
+    filas_xml = []
+    for numero, fila in enumerate(filas, start=1):
+        celdas = []
+        for indice, valor in enumerate(fila):
+            ref = f'{chr(ord("A") + indice)}{numero}'
+            if indice == 0:
+                compartidos.append(valor)
+                celdas.append(f'<c r="{ref}" t="s"><v>{len(compartidos) - 1}</v></c>')
+            else:
+                celdas.append(f'<c r="{ref}" t="inlineStr"><is><t>{valor}</t></is></c>')
+        filas_xml.append(f'<row r="{numero}">{"".join(celdas)}</row>')
+    contenido = BytesIO()
+    with zipfile.ZipFile(contenido, 'w') as libro:
+        libro.writestr('xl/workbook.xml', (
+            f'<workbook xmlns="{ns}" xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+            '<sheets><sheet name="Hoja1" sheetId="1" r:id="rId1"/></sheets></workbook>'
+        ))
+        libro.writestr('xl/_rels/workbook.xml.rels', (
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" Target="worksheets/sheet1.xml"/></Relationships>'
+        ))
+        libro.writestr('xl/sharedStrings.xml', f'<sst xmlns="{ns}">' + ''.join(
+            f'<si><t>{texto}</t></si>' for texto in compartidos) + '</sst>')
+        libro.writestr('xl/worksheets/sheet1.xml',
+                       f'<worksheet xmlns="{ns}"><sheetData>{"".join(filas_xml)}</sheetData></worksheet>')
+    return contenido.getvalue()
+
+class ImportCatalogoApiTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username=username, password=password)
+        grupo, _ = Group.objects.get_or_create(name='Administrador')
+        self.user.groups.add(grupo)
+        self.client.force_authenticate(user=self.user)
+        self.tipo = TipoMedida.objects.create(nombre="Ambiental", descripcion="Antes")
+
+    def importar(self, url, contenido, nombre='catalogo.csv'):
+        if isinstance(contenido, str):
+            contenido = contenido.encode('utf-8')
+        return self.client.post(url, {'archivo': SimpleUploadedFile(nombre, contenido)}, format='multipart')
+
+    def test_upsert_por_nombre(self):
+        """
+        Prueba que las filas con un nombre existente (aunque esté inactivo)
+        se actualizan, las demás se crean, y que las consultas no crecen con
+        la cantidad de filas.
+        """
+        self.tipo.delete()
+        filas = '\n'.join(f'Tipo {i},Desc {i}' for i in range(50))
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.importar('/api/tipo-medida/import/', f'﻿nombre,descripcion\nAmbiental,Después\n{filas}\n')
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data['filas'], 51)
+        self.assertLess(len(consultas), 10)
+        self.tipo.refresh_from_db()
+        self.assertEqual((self.tipo.descripcion, self.tipo.is_active), ("Después", True))
+        self.assertEqual(TipoMedida.objects.count(), 51)
+
+        response = self.importar('/api/organismo-sectorial/import/', _xlsx([
+            ['nombre', 'tipo', 'contacto'], ['Org XLSX', 'Público', 'org@x.cl'],
+        ]), nombre='organismos.xlsx')
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertTrue(OrganismoSectorial.objects.filter(nombre='Org XLSX', contacto='org@x.cl').exists())
+
+    def test_medida_por_id_y_tipo_por_nombre(self):
+        """
+        Prueba que las medidas resuelven el tipo por nombre, se actualizan por
+        ``id`` y se crean sin él.
+        """
+        medida = Medida.objects.create(id_tipo_medida=self.tipo, nombre_corto="Vieja", indicador="-",
+                                       forma_calculo="-", frecuencia_reporte="Anual")
+        contenido = (
+            'id,id_tipo_medida,nombre_corto,indicador,forma_calculo,frecuencia_reporte\n'
+            f'{medida.id},Ambiental,Nueva,Ind,Suma,Mensual\n'
+            ',Ambiental,Otra,Ind 2,Conteo,Anual\n'
+        )
+        response = self.importar('/api/medida/import/', contenido)
+        self.assertEqual(response.status_code, 200, response.data)
+        medida.refresh_from_db()
+        self.assertEqual((medida.nombre_corto, medida.frecuencia_reporte), ("Nueva", "Mensual"))
+        self.assertEqual(Medida.objects.get(nombre_corto="Otra").id_tipo_medida, self.tipo)
+
+    def test_errores_por_fila(self):
+        """
+        Prueba que se informan los errores de cada fila (con su número en el
+        archivo) y que no se guarda ninguna.
+        """
+        contenido = (
+            'id,id_tipo_medida,nombre_corto,indicador,forma_calculo,frecuencia_reporte\n'
+            ',Ambiental,Válida,Ind,Suma,Mensual\n'
+            ',Inexistente,Sin tipo,Ind,Suma,Mensual\n'
+            ',Ambiental,Sin indicador,,Suma,Mensual\n'
+            '999,Ambiental,Sin registro,Ind,Suma,Mensual\n'
+        )
+        response = self.importar('/api/medida/import/', contenido)
+        self.assertEqual(response.status_code, 400)
+        errores = {error['fila']: error['errores'] for error in response.data['detail']}
+        self.assertEqual(sorted(errores), [3, 4, 5])
+        self.assertIn('id_tipo_medida', errores[3])
+        self.assertIn('indicador', errores[4])
+        self.assertIn('id', errores[5])
+        self.assertFalse(Medida.all_objects.exists())
+
+        response = self.importar('/api/tipo-medida/import/', 'nombre,descripcion\nA,1\nA,2\n')
+        self.assertEqual(response.data['detail'], [{'fila': 3, 'errores': {'nombre': ['Repetido: ya aparece en la fila 2.']}}])
+        response = self.importar('/api/tipo-medida/import/', 'nombre,color\nA,1\n')
+        self.assertIn('color', response.data['detail'])
+        response = self.importar('/api/tipo-medida/import/', 'nombre\nA\n', nombre='tipos.txt')
+        self.assertEqual(response.status_code, 400)
+
+    def test_requiere_administrador(self):
+        """
+        Prueba que un usuario sin rol de Administrador no puede importar.
+        """
+        self.client.force_authenticate(user=User.objects.create_user(username='sinrol', password=password))
+        response = self.importar('/api/tipo-medida/import/', 'nombre,descripcion\nA,1\n')
+        self.assertEqual(response.status_code, 403)
+
+    def test_comando(self):
+        """
+        Prueba el comando ``import_catalogo`` con un archivo válido y uno con errores.
+        """
+        with tempfile.TemporaryDirectory() as directorio:
+            ruta = os.path.join(directorio, 'organismos.csv')
+            with open(ruta, 'w', encoding='utf-8') as archivo:
+                archivo.write('nombre,tipo,contacto\nOrg 1,Público,a@b.cl\nOrg 2,Privado,c@d.cl\n')
+            salida = StringIO()
+            call_command('import_catalogo', 'organismo-sectorial', ruta, '--lote', '1', stdout=salida)
+            self.assertIn('2 filas importadas', salida.getvalue())
+            self.assertEqual(OrganismoSectorial.objects.count(), 2)
+
+            with open(ruta, 'w', encoding='utf-8') as archivo:
+                archivo.write('nombre,tipo\nOrg 3,Público\n')
+            with self.assertRaisesMessage(CommandError, '1 filas con errores'):
+                call_command('import_catalogo', 'organismo-sectorial', ruta, stdout=StringIO(), stderr=StringIO())
+        self.assertFalse(OrganismoSectorial.objects.filter(nombre='Org 3').exists())
+
+class FastListApiTest(TestCase):
+    URLS = ['/api/tipo-medida/', '/api/medida/', '/api/plan/', '/api/organismo-sectorial/',
+            '/api/plan-organismo-sectorial/', '/api/reporte/']
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username=username, password=password)
+        grupo, _ = Group.objects.get_or_create(name='Administrador')
+        self.user.groups.add(grupo)
+        self.client.force_authenticate(user=self.user)
+
+        tipo = TipoMedida.objects.create(nombre="Rápida", descripcion="Descripción con acentos ñ")
+        medidas = [
+            Medida.objects.create(id_tipo_medida=tipo, nombre_corto=f"Emisiones {i}", indicador="Ind",
+                                  forma_calculo="Suma", frecuencia_reporte="Mensual")
+            for i in range(2)
+        ]
+        org = OrganismoSectorial.objects.create(nombre="Org rápida", tipo="Público", contacto="org@test.cl")
+        plan = Plan.objects.create(nombre="Plan rápido", descripcion="-", fecha_inicio="2024-01-01",
+                                   fecha_termino="2024-12-31", responsable="-", estado='en_progreso')
+        relaciones = [
+            PlanOrganismoSectorial.objects.create(id_plan=plan, id_organismo_sectorial=org, id_media=medida)
+            for medida in medidas
+        ]
+        for i, valor in enumerate(["10.5", "0.10", "1234", "99999999.99"]):
+            Reporte.objects.create(id_plan_organismo_sectorial=relaciones[i % 2], valor_reportado=valor,
+                                   evidencia="-", fecha_reporte=date(2024, i + 1, 9))
+
+    def comparar(self, url, params=None):
+        """
+        Compara byte a byte la respuesta de la lectura rápida con la del serializer.
+        """
+        cache.clear()
+        rapida = self.client.get(url, params)
+        cache.clear()
+        with mock.patch.object(FastListMixin, 'fast_list', False):
+            normal = self.client.get(url, params)
+        self.assertEqual(rapida.status_code, 200)
+        self.assertEqual(rapida.content, normal.content)
+        return json.loads(rapida.content)
+
+    def test_misma_respuesta_que_el_serializer(self):
+        """
+        Prueba que los seis listados producen el mismo JSON (claves, orden,
+        decimales y fechas) por ambos caminos, también con ``fields``,
+        filtros, búsqueda y cursores.
+        """
+        for url in self.URLS:
+            with self.subTest(url=url):
+                self.comparar(url)
+                self.comparar(url, {'omit': 'created_at'})
+        datos = self.comparar('/api/reporte/', {'fields': 'id,valor_reportado,fecha_reporte', 'page_size': 3})
+        self.assertEqual(datos['results'][0]['valor_reportado'], '10.50')
+        self.comparar(datos['next'])
+        self.comparar('/api/reporte/', {'valor_min': '1', 'fecha_desde': '2024-02-01'})
+        self.comparar('/api/medida/', {'q': 'emisiones', 'page_size': 1})
+        self.comparar('/api/reporte/', {'expand': 'id_plan_organismo_sectorial'})
+        with timezone.override(ZoneInfo('America/Santiago')):
+            self.assertTrue(self.comparar('/api/plan/')['results'][0]['created_at'].endswith(('-03:00', '-04:00')))
+
+    def test_no_usa_el_serializer(self):
+        """
+        Prueba que el listado no serializa fila por fila, salvo con ``expand``.
+        """
+        with mock.patch.object(ReporteSerializer, 'to_representation', side_effect=AssertionError):
+            self.assertEqual(self.client.get('/api/reporte/').status_code, 200)
+            with self.assertRaises(AssertionError):
+                self.client.get('/api/reporte/', {'expand': 'id_plan_organismo_sectorial'})
+
+class RenderersApiTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username=username, password=password)
+        grupo, _ = Group.objects.get_or_create(name='Administrador')
+        self.user.groups.add(grupo)
+        self.client.force_authenticate(user=self.user)
+
+        tipo = TipoMedida.objects.create(nombre="Tipo rápido", descripcion="Descripción\u2028ñ")
+        medida = Medida.objects.create(id_tipo_medida=tipo, nombre_corto="Med", indicador="Ind",
+                                       forma_calculo="Suma", frecuencia_reporte="Mensual")
+        org = OrganismoSectorial.objects.create(nombre="Org", tipo="Público", contacto="org@test.cl")
+        plan = Plan.objects.create(nombre="Plan", descripcion="-", fecha_inicio="2024-01-01",
+                                   fecha_termino="2024-12-31", responsable="-", estado='en_progreso')
+        self.relacion = PlanOrganismoSectorial.objects.create(id_plan=plan, id_organismo_sectorial=org,
+                                                              id_media=medida)
+        for valor in ["10.5", "0.10", "99999999.99"]:
+            Reporte.objects.create(id_plan_organismo_sectorial=self.relacion, valor_reportado=valor,
+                                   evidencia="-", fecha_reporte="2024-04-15")
+
+    def test_json_igual_que_drf(self):
+        """
+        Prueba que ORJSONRenderer produce los mismos bytes que JSONRenderer,
+        también con valores que no son JSON nativo.
+        """
+        datos = {
+            'decimal': Decimal('10.50'), 'fecha': date(2024, 4, 15),
+            'fecha_hora': datetime(2024, 4, 15, 10, 30, 1, 123456, tzinfo=dt_timezone.utc),
+            'uuid': uuid.UUID(int=1), 'error': ErrorDetail('inválido'), 'texto': 'ñ\u2028\u2029',
+            'lista': [1, 2.5, None, True], 1: 'clave entera', 'grande': 2 ** 70,
+        }
+        self.assertEqual(ORJSONRenderer().render(datos), JSONRenderer().render(datos))
+        self.assertEqual(ORJSONRenderer().render(None), b'')
+        for url in ['/api/reporte/', '/api/tipo-medida/', '/api/reporte/999999/']:
+            with self.subTest(url=url):
+                cache.clear()
+                rapida = self.client.get(url)
+                cache.clear()
+                with mock.patch('api.renderers.orjson', None):
+                    normal = self.client.get(url)
+                self.assertEqual(rapida.content, normal.content)
+        valores = {fila['valor_reportado'] for fila in json.loads(self.client.get('/api/reporte/').content)['results']}
+        self.assertEqual(valores, {'10.50', '0.10', '99999999.99'})
+
+    def test_json_con_sangria(self):
+        """
+        Prueba que ``Accept: application/json; indent=2`` sigue indentando.
+        """
+        response = self.client.get('/api/reporte/', HTTP_ACCEPT='application/json; indent=2')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content.startswith(b'{\n  "'))
+
+    def test_parser_json(self):
+        """
+        Prueba que ORJSONParser acepta lo mismo que JSONParser y responde
+        los mismos errores.
+        """
+        parser = ORJSONParser()
+        self.assertEqual(parser.parse(BytesIO('{"a": [1, 2.5, "ñ"], "b": 1267650600228229401496703205376}'.encode())),
+                         {'a': [1, 2.5, 'ñ'], 'b': 2 ** 100})
+        for cuerpo in [b'{"a": NaN}', b'{"a": ', '{"a": "ñ"}'.encode('latin-1')]:
+            with self.subTest(cuerpo=cuerpo):
+                with self.assertRaises(ParseError):
+                    parser.parse(BytesIO(cuerpo))
+        response = self.client.post('/api/reporte/', {
+            "id_plan_organismo_sectorial": self.relacion.id, "valor_reportado": "85.5",
+            "evidencia": "-", "fecha_reporte": "2024-04-15"
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['valor_reportado'], '85.50')
+        response = self.client.post('/api/reporte/', b'{"evidencia": ', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertTrue(response.data['detail'].startswith('JSON parse error'))
+
+    def test_msgpack(self):
+        """
+        Prueba que application/msgpack entrega los mismos valores que el JSON
+        (decimales y fechas como texto) y acepta cuerpos MessagePack.
+        """
+        cache.clear()
+        response = self.client.get('/api/reporte/', HTTP_ACCEPT='application/msgpack')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/msgpack')
+        cache.clear()
+        esperado = json.loads(self.client.get('/api/reporte/', HTTP_ACCEPT='application/json').content)
+        self.assertEqual(msgpack.unpackb(response.content), esperado)
+
+        cuerpo = msgpack.packb({
+            "id_plan_organismo_sectorial": self.relacion.id, "valor_reportado": "85.5",
+            "evidencia": "-", "fecha_reporte": "2024-04-15"
+        })
+        response = self.client.post('/api/reporte/', cuerpo, content_type='application/msgpack',
+                                    HTTP_ACCEPT='application/msgpack')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(msgpack.unpackb(response.content)['valor_reportado'], '85.50')
+        response = self.client.post('/api/reporte/', b'\xc1', content_type='application/msgpack')
+        self.assertEqual(response.status_code, 400)
+        self.assertTrue(response.data['detail'].startswith('MessagePack parse error'))
+        response = self.client.get('/api/reporte/999999/', HTTP_ACCEPT='application/msgpack')
+        self.assertEqual(response.status_code, 404)
+        self.assertIn('detail', msgpack.unpackb(response.content))
+
+class AsyncReadApiTest(TestCase):
+
+    def setUp(self):
+        """
+        Configura un usuario OrganismoSectorial con token y reportes.
+        """
+        cache.clear()
+        self.user = User.objects.create_user(username=username, password=password)
+        grupo, _ = Group.objects.get_or_create(name='OrganismoSectorial')
+        self.user.groups.add(grupo)
+        self.token = str(AccessToken.for_user(self.user))
+
+        tipo = TipoMedida.objects.create(nombre="Medida Test", descripcion="Desc test")
+        medida = Medida.objects.create(
+            id_tipo_medida=tipo,
+            nombre_corto="Med Test",
+            indicador="Ind 1",
+            forma_calculo="Suma",
+            frecuencia_reporte="Mensual"
+        )
+        org = OrganismoSectorial.objects.create(nombre="Org Test", tipo="Público", contacto="org@test.cl")
+        plan = Plan.objects.create(
+            nombre="Plan Test",
+            descripcion="Test",
+            fecha_inicio="2024-01-01",
+            fecha_termino="2024-12-31",
+            responsable="Tester"
+        )
+        relacion = PlanOrganismoSectorial.objects.create(id_plan=plan, id_organismo_sectorial=org, id_media=medida)
+        self.reportes = [
+            Reporte.objects.create(
+                id_plan_organismo_sectorial=relacion, valor_reportado=valor, evidencia="url", fecha_reporte="2024-05-15"
+            )
+            for valor in (10, 20, 30)
+        ]
+
+    def _sincrona(self, actions, path, **kwargs):
+        with override_settings(API_ASYNC_VIEWS=False):
+            vista = ReporteViewSet.as_view(actions)
+        request = APIRequestFactory().get(path)
+        force_authenticate(request, user=self.user)
+        response = vista(request, **kwargs)
+        response.render()
+        return response
+
+    async def test_list_y_retrieve_asincronos_igual_que_sincronos(self):
+        """
+        Prueba que las vistas asíncronas devuelven lo mismo que las síncronas.
+        """
+        headers = {'Authorization': f'Bearer {self.token}'}
+        ruta = '/api/reporte/?expand=id_plan_organismo_sectorial.id_plan&omit=evidencia&page_size=2'
+        response = await self.async_client.get(ruta, headers=headers)
+        self.assertEqual(response.status_code, 200)
+        sincrona = await sync_to_async(self._sincrona)({'get': 'list'}, ruta)
+        self.assertEqual(response.json(), json.loads(sincrona.content))
+        self.assertEqual(response['ETag'], sincrona['ETag'])
+
+        ruta = f'/api/reporte/{self.reportes[0].pk}/'
+        response = await self.async_client.get(ruta, headers=headers)
+        sincrona = await sync_to_async(self._sincrona)({'get': 'retrieve'}, ruta, pk=self.reportes[0].pk)
+        self.assertEqual(response.json(), json.loads(sincrona.content))
+
+        response = await self.async_client.get(ruta, headers={**headers, 'If-None-Match': response['ETag']})
+        self.assertEqual(response.status_code, 304)
+
+    async def test_errores_asincronos(self):
+        """
+        Prueba autenticación, permisos y 404 en las vistas asíncronas.
+        """
+        response = await self.async_client.get('/api/reporte/')
+        self.assertEqual(response.status_code, 401)
+
+        response = await self.async_client.get('/api/reporte/999999/', headers={'Authorization': f'Bearer {self.token}'})
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json(), {"detail": "No se encontró un registro con ese ID."})
+
+        sin_rol = await User.objects.acreate(username='sinrol')
+        token = str(AccessToken.for_user(sin_rol))
+        response = await self.async_client.get('/api/reporte/', headers={'Authorization': f'Bearer {token}'})
+        self.assertEqual(response.status_code, 403)
+
+class ConnectionPoolTest(SimpleTestCase):
+    # Las pruebas con Postgres abren conexiones propias a la base de pruebas.
+    databases = {DEFAULT_DB_ALIAS}
+
+    def _pool(self, **kwargs):
+        return ConnectionPool(**kwargs), lambda: sqlite3.connect(':memory:', check_same_thread=False)
+
+    def test_reutiliza_y_recicla(self):
+        """
+        Prueba que las conexiones devueltas se reutilizan y que se reciclan
+        al superar ``max_age``.
+        """
+        pool, conectar = self._pool(max_size=2)
+        primera = pool.getconn(conectar)
+        pool.putconn(primera)
+        self.assertIs(pool.getconn(conectar), primera)
+        pool.putconn(primera)
+
+        pool.max_age = 0
+        pool.putconn(pool.getconn(conectar))
+        stats = pool.stats()
+        self.assertEqual(
+            (stats['checkouts'], stats['connections_opened'], stats['connections_closed'], stats['size']),
+            (3, 2, 2, 0)
+        )
+
+    def test_descarta_conexiones_rotas(self):
+        """
+        Prueba que una conexión que no pasa el ``SELECT 1`` se reemplaza.
+        """
+        pool, conectar = self._pool(check_after=0)
+        rota = pool.getconn(conectar)
+        pool.putconn(rota)
+        rota.close()
+        nueva = pool.getconn(conectar)
+        self.assertIsNot(nueva, rota)
+        self.assertEqual(pool.stats()['health_check_failures'], 1)
+
+    def test_espera_y_timeout(self):
+        """
+        Prueba que con el pool lleno se espera a que se libere una conexión y
+        que se falla tras ``timeout``.
+        """
+        pool, conectar = self._pool(max_size=1, timeout=0.05)
+        conexion = pool.getconn(conectar)
+        with self.assertRaises(PoolTimeout):
+            pool.getconn(conectar)
+
+        pool.timeout = 5
+        threading.Timer(0.05, pool.putconn, [conexion]).start()
+        self.assertIs(pool.getconn(conectar), conexion)
+        stats = pool.stats()
+        self.assertEqual((stats['timeouts'], stats['waits'], stats['in_use']), (1, 1, 1))
+        self.assertGreater(stats['wait_seconds_max'], 0)
+
+    @skipUnless(connection.vendor == 'postgresql' and 'pool' in connection.settings_dict['OPTIONS'],
+                 "Requiere Postgres con api.backends.postgresql_pool.")
+    def test_backend_postgres(self):
+        """
+        Prueba que el backend devuelve la conexión al pool al cerrarla.
+        """
+        conexion = connections.create_connection(DEFAULT_DB_ALIAS)
+        conexion.ensure_connection()
+        raw = conexion.connection
+        conexion.close()
+        conexion.ensure_connection()
+        self.assertIs(conexion.connection, raw)
+        conexion.close()
+
+    def _pool_postgres(self, **opciones):
+        params = connections.create_connection(DEFAULT_DB_ALIAS).get_connection_params()
+        pool = ConnectionPool(**opciones)
+        self.addCleanup(pool.close)
+
+        def conectar():
+            import psycopg2
+            return psycopg2.connect(**params)
+        return pool, conectar
+
+    def _pid(self, conn):
+        with conn.cursor() as cursor:
+            cursor.execute('SELECT pg_backend_pid()')
+            return cursor.fetchone()[0]
+
+    @skipUnless(connection.vendor == 'postgresql', "Requiere Postgres.")
+    def test_postgres_devuelve_conexion_limpia(self):
+        """
+        Prueba que una conexión devuelta a mitad de una transacción vuelve al
+        pool sin la transacción abierta.
+        """
+        pool, conectar = self._pool_postgres(max_size=1)
+        conn = pool.getconn(conectar)
+        with conn.cursor() as cursor:
+            cursor.execute('CREATE TEMP TABLE pool_prueba (id int)')
+        pool.putconn(conn)
+        conn = pool.getconn(conectar)
+        self.assertEqual(conn.info.transaction_status, 0)  # TRANSACTION_STATUS_IDLE
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT to_regclass('pg_temp.pool_prueba')")
+            self.assertIsNone(cursor.fetchone()[0])
+        pool.putconn(conn)
+
+    @skipUnless(connection.vendor == 'postgresql', "Requiere Postgres.")
+    def test_postgres_verificacion_descarta_conexion_terminada(self):
+        """
+        Prueba que una conexión cerrada por el servidor mientras estaba ociosa
+        se detecta con ``SELECT 1`` y se reemplaza.
+        """
+        pool, conectar = self._pool_postgres(max_size=2, check_after=0)
+        conn = pool.getconn(conectar)
+        pid = self._pid(conn)
+        conn.rollback()
+        pool.putconn(conn)
+
+        otra = conectar()
+        try:
+            with otra.cursor() as cursor:
+                cursor.execute('SELECT pg_terminate_backend(%s)', [pid])
+            otra.commit()
+        finally:
+            otra.close()
+        time.sleep(0.1)
+
+        conn = pool.getconn(conectar)
+        self.assertNotEqual(self._pid(conn), pid)
+        pool.putconn(conn)
+        stats = pool.stats()
+        self.assertEqual(stats['health_check_failures'], 1)
+        self.assertEqual((stats['connections_opened'], stats['connections_closed']), (2, 1))
+
+    @skipUnless(connection.vendor == 'postgresql', "Requiere Postgres.")
+    def test_postgres_timeout(self):
+        """
+        Prueba que con el pool lleno ``getconn`` espera ``timeout`` y falla, y
+        que la conexión liberada se vuelve a entregar.
+        """
+        pool, conectar = self._pool_postgres(max_size=1, timeout=0.2)
+        conn = pool.getconn(conectar)
+        with self.assertRaises(PoolTimeout):
+            pool.getconn(conectar)
+        pool.putconn(conn)
+        self.assertIs(pool.getconn(conectar), conn)
+        pool.putconn(conn)
+        self.assertEqual(pool.stats()['timeouts'], 1)
+
+class MetricsApiTest(TestCase):
+
+    def setUp(self):
+        """
+        Configura un administrador y limpia los contadores del proceso.
+        """
+        cache.clear()
+        registro.reset()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username=username, password=password)
+        grupo, _ = Group.objects.get_or_create(name='Administrador')
+        self.user.groups.add(grupo)
+        self.client.force_authenticate(user=self.user)
+        TipoMedida.objects.create(nombre="Medida Test", descripcion="Desc test")
+
+    def _linea(self, texto, prefijo):
+        return next(linea for linea in texto.splitlines() if linea.startswith(prefijo))
+
+    def test_metricas_por_vista_y_accion(self):
+        """
+        Prueba que se registran latencia, consultas y tamaño por vista y acción.
+        """
+        self.client.get('/api/tipo-medida/')
+        self.client.post('/api/tipo-medida/', {"nombre": "Otra", "descripcion": "Desc"}, format='json')
+
+        response = self.client.get('/api/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        texto = response.content.decode()
+        etiquetas = 'view="tipomedida-list",action="list",method="GET",status="200"'
+        self.assertTrue(self._linea(texto, f'api_request_duration_seconds_count{{{etiquetas}}}').endswith(' 1'))
+        self.assertTrue(self._linea(texto, f'api_request_duration_seconds_bucket{{{etiquetas},le="+Inf"}}').endswith(' 1'))
+        self.assertGreater(int(self._linea(texto, f'api_db_queries_total{{{etiquetas}}}').split()[-1]), 0)
+        self.assertGreater(int(self._linea(texto, f'api_response_size_bytes_sum{{{etiquetas}}}').split()[-1]), 0)
+        self.assertIn('view="tipomedida-list",action="create",method="POST",status="201"', texto)
+
+    def test_solo_administrador(self):
+        """
+        Prueba que el endpoint de métricas requiere rol de Administrador.
+        """
+        self.client.force_authenticate(user=User.objects.create_user(username='sinrol', password=password))
+        self.assertEqual(self.client.get('/api/metrics').status_code, 403)
+
+    def test_modo_multiproceso_suma_workers(self):
+        """
+        Prueba que en modo multiproceso se suman los contadores de otros workers.
+        """
+        self.client.get('/api/tipo-medida/')
+        with tempfile.TemporaryDirectory() as directorio, override_settings(API_METRICS_MULTIPROC_DIR=directorio):
+            otro = _Registro()
+            otro.registrar(('tipomedida-list', 'list', 'GET', '200'), 0.01, 2, 0.001, 100)
+            with open(os.path.join(directorio, 'api-metrics-999999.json'), 'w') as archivo:
+                json.dump(otro.snapshot(), archivo)
+            texto = self.client.get('/api/metrics').content.decode()
+        etiquetas = 'view="tipomedida-list",action="list",method="GET",status="200"'
+        self.assertTrue(self._linea(texto, f'api_request_duration_seconds_count{{{etiquetas}}}').endswith(' 2'))
+
+    def test_modo_multiproceso_omite_pool_de_workers_terminados(self):
+        """
+        Prueba que las métricas del pool de un worker que ya terminó no se
+        exponen, y las de uno vivo sí.
+        """
+        stats = {'size': 3, 'idle': 1, 'in_use': 2, 'utilization': 0.4, 'checkouts': 10, 'waits': 0,
+                 'wait_seconds_total': 0.0, 'wait_seconds_max': 0.0, 'timeouts': 0, 'health_check_failures': 0}
+        terminado = subprocess.Popen([sys.executable, '-c', ''])
+        terminado.wait()
+        with tempfile.TemporaryDirectory() as directorio, override_settings(API_METRICS_MULTIPROC_DIR=directorio):
+            for pid in (terminado.pid, os.getppid()):
+                with open(os.path.join(directorio, f'api-metrics-{pid}.json'), 'w') as archivo:
+                    json.dump({'series': [], 'pools': [[{'alias': 'default', 'database': 'api'}, stats]]}, archivo)
+            texto = self.client.get('/api/metrics').content.decode()
+        self.assertIn(f'api_db_pool_in_use{{alias="default",database="api",pid="{os.getppid()}"}} 2', texto)
+        self.assertNotIn(f'pid="{terminado.pid}"', texto)
+
+    async def test_consultas_en_vistas_asincronas(self):
+        """
+        Prueba que se cuentan las consultas que el ORM asíncrono ejecuta en
+        otro hilo.
+        """
+        token = str(AccessToken.for_user(self.user))
+        response = await self.async_client.get('/api/tipo-medida/', headers={'Authorization': f'Bearer {token}'})
+        self.assertEqual(response.status_code, 200)
+        series = dict((tuple(etiquetas), serie) for etiquetas, serie in registro.snapshot()['series'])
+        self.assertGreater(series[('tipomedida-list', 'list', 'GET', '200')]['queries'], 0)
@@ -6,7 +6,8 @@ from .views import (
     PlanViewSet,
     OrganismoSectorialViewSet,
     PlanOrganismoSectorialViewSet,
-    ReporteViewSet
+    ReporteViewSet,
+    MetricsView
 )
 
 router = DefaultRouter()
@@ -18,6 +19,7 @@ router.register(r"plan-organismo-sectorial", PlanOrganismoSectorialViewSet)
 router.register(r"reporte", ReporteViewSet)
 
 urlpatterns = [
+    path("metrics", MetricsView.as_view(), name="metrics"),
     path("", include(router.urls))
 ]
 
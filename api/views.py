@@ -1,15 +1,33 @@
 from rest_framework.viewsets import ModelViewSet
+from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated, BasePermission
 from rest_framework.response import Response
 from rest_framework import serializers
 from rest_framework import status
+from rest_framework.decorators import action
 from rest_framework.exceptions import NotFound
 from django.http import Http404
+from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema_view, extend_schema, OpenApiExample, OpenApiResponse
 from django.db import transaction, IntegrityError
+from django.db.models import Avg, Count, F, Max, Min, Sum
+from django.db.models.functions import Trunc
 
 from .models import TipoMedida
 from .serializers import *
+from .exports import ExportMixin
+from .imports import ImportMixin
+from .expansion import ExpandMixin, EXPAND_PARAMETER
+from .fieldsets import SparseFieldsMixin, FIELDS_PARAMETERS
+from .conditional import ConditionalGetMixin
+from .catalog_cache import CatalogCacheMixin
+from .soft_delete import BulkDestroyMixin
+from .async_views import AsyncReadMixin
+from .fast_list import FastListMixin
+from .filters import ParamsFilterBackend
+from .search import BusquedaFilterBackend
+from .metrics import PrometheusRenderer, exponer
+from .roles import ADMINISTRADOR, ORGANISMO_SECTORIAL, ahas_role, has_role
 
 # Serializer para mensajes de error
 class ErrorSerializer(serializers.Serializer):
@@ -21,14 +39,20 @@ class IsAdministrador(BasePermission):
     Permite acceso solo a usuarios con rol de Administrador.
     """
     def has_permission(self, request, view):
-        return request.user.is_authenticated and request.user.groups.filter(name='Administrador').exists()
+        return request.user.is_authenticated and has_role(request, ADMINISTRADOR)
+
+    async def ahas_permission(self, request, view):
+        return request.user.is_authenticated and await ahas_role(request, ADMINISTRADOR)
 
 class IsOrganismoSectorial(BasePermission):
     """
     Permite acceso solo a usuarios con rol de OrganismoSectorial.
     """
     def has_permission(self, request, view):
-        return request.user.is_authenticated and request.user.groups.filter(name='OrganismoSectorial').exists()
+        return request.user.is_authenticated and has_role(request, ORGANISMO_SECTORIAL)
+
+    async def ahas_permission(self, request, view):
+        return request.user.is_authenticated and await ahas_role(request, ORGANISMO_SECTORIAL)
 
 class IsAuthenticatedAndAdminOrSectorial(BasePermission):
     """
@@ -37,16 +61,20 @@ class IsAuthenticatedAndAdminOrSectorial(BasePermission):
     def has_permission(self, request, view):
         if not IsAuthenticated().has_permission(request, view):
             return False
-        return (
-            IsAdministrador().has_permission(request, view) or
-            IsOrganismoSectorial().has_permission(request, view)
-        )
+        return has_role(request, ADMINISTRADOR, ORGANISMO_SECTORIAL)
+
+    async def ahas_permission(self, request, view):
+        if not IsAuthenticated().has_permission(request, view):
+            return False
+        return await ahas_role(request, ADMINISTRADOR, ORGANISMO_SECTORIAL)
 
 @extend_schema_view(
     list=extend_schema(
         description="Devuelve la lista de tipos de medida existentes.",
+        parameters=FIELDS_PARAMETERS,
         responses={200: TipoMedidaSerializer(many=True)}
     ),
+    retrieve=extend_schema(parameters=FIELDS_PARAMETERS),
     create=extend_schema(
         description="Crea un nuevo tipo de medida.",
         request=TipoMedidaSerializer,
@@ -73,12 +101,13 @@ class IsAuthenticatedAndAdminOrSectorial(BasePermission):
         }
     )
 )
-class TipoMedidaViewSet(ModelViewSet):
+class TipoMedidaViewSet(CatalogCacheMixin, ConditionalGetMixin, SparseFieldsMixin, ImportMixin, BulkDestroyMixin, FastListMixin, AsyncReadMixin, ModelViewSet):
     queryset = TipoMedida.objects.filter(is_active=True)
     serializer_class = TipoMedidaSerializer
+    import_serializer_class = TipoMedidaImportSerializer
 
     def get_permissions(self):
-        if self.action in ['create', 'destroy']:
+        if self.action in ['create', 'destroy', 'bulk_destroy', 'importar']:
             return [IsAuthenticated(), IsAdministrador()]
         return [IsAuthenticated()]
     
@@ -98,21 +127,32 @@ class TipoMedidaViewSet(ModelViewSet):
     def destroy(self, request, *args, **kwargs):
         instance = self.get_object()
         instance.is_active = False
-        instance.save()
+        instance.save(update_fields=['is_active', 'updated_at'])
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 @extend_schema_view(
     list=extend_schema(
-        description="Devuelve la lista de medidas existentes.",
+        description=(
+            "Devuelve la lista de medidas existentes. Con `q` busca en `nombre_corto`, `indicador`, "
+            "`forma_calculo` y `medios_verificacion` y ordena por relevancia."
+        ),
+        parameters=[EXPAND_PARAMETER, *FIELDS_PARAMETERS],
         responses={200: MedidaSerializer(many=True)}
-    )
+    ),
+    retrieve=extend_schema(parameters=[EXPAND_PARAMETER, *FIELDS_PARAMETERS])
 )
-class MedidaViewSet(ModelViewSet):
+class MedidaViewSet(CatalogCacheMixin, ConditionalGetMixin, SparseFieldsMixin, ExpandMixin, ImportMixin, BulkDestroyMixin, FastListMixin, AsyncReadMixin, ModelViewSet):
     queryset = Medida.objects.filter(is_active=True)
     serializer_class = MedidaSerializer
+    filter_backends = [BusquedaFilterBackend]
+    import_serializer_class = MedidaImportSerializer
+    # nombre_corto no es único: el upsert es por id
+    import_key = 'id'
+    # ?expand=id_tipo_medida incluye datos de TipoMedida
+    cache_dependencies = (Medida, TipoMedida)
 
     def get_permissions(self):
-        if self.action in ['create', 'destroy']:
+        if self.action in ['create', 'destroy', 'bulk_destroy', 'importar']:
             return [IsAuthenticated(), IsAdministrador()]
         elif self.action in ['list']:
             return [IsAuthenticatedAndAdminOrSectorial()]
@@ -170,21 +210,27 @@ class MedidaViewSet(ModelViewSet):
     def destroy(self, request, *args, **kwargs):
         instance = self.get_object()
         instance.is_active = False
-        instance.save()
+        instance.save(update_fields=['is_active', 'updated_at'])
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 @extend_schema_view(
     list=extend_schema(
-        description="Devuelve la lista de planes existentes.",
+        description=(
+            "Devuelve la lista de planes existentes. Con `q` busca en `nombre` y `descripcion` y "
+            "ordena por relevancia."
+        ),
+        parameters=FIELDS_PARAMETERS,
         responses={200: PlanSerializer(many=True)}
-    )
+    ),
+    retrieve=extend_schema(parameters=FIELDS_PARAMETERS)
 )
-class PlanViewSet(ModelViewSet):
+class PlanViewSet(ConditionalGetMixin, SparseFieldsMixin, BulkDestroyMixin, FastListMixin, AsyncReadMixin, ModelViewSet):
     queryset = Plan.objects.filter(is_active=True)
     serializer_class = PlanSerializer
+    filter_backends = [BusquedaFilterBackend]
 
     def get_permissions(self):
-        if self.action in ['create', 'destroy']:
+        if self.action in ['create', 'destroy', 'bulk_destroy']:
             return [IsAuthenticated(), IsAdministrador()]
         elif self.action == 'list':
             return [IsAuthenticatedAndAdminOrSectorial()]
@@ -242,21 +288,24 @@ class PlanViewSet(ModelViewSet):
     def destroy(self, request, *args, **kwargs):
         instance = self.get_object()
         instance.is_active = False
-        instance.save()
+        instance.save(update_fields=['is_active', 'updated_at'])
         return Response(status=status.HTTP_204_NO_CONTENT)
     
 @extend_schema_view(
     list=extend_schema(
         description="Devuelve la lista de organismos sectoriales existentes.",
+        parameters=FIELDS_PARAMETERS,
         responses={200: OrganismoSectorialSerializer(many=True)}
-    )
+    ),
+    retrieve=extend_schema(parameters=FIELDS_PARAMETERS)
 )
-class OrganismoSectorialViewSet(ModelViewSet):
+class OrganismoSectorialViewSet(CatalogCacheMixin, ConditionalGetMixin, SparseFieldsMixin, ImportMixin, BulkDestroyMixin, FastListMixin, AsyncReadMixin, ModelViewSet):
     queryset = OrganismoSectorial.objects.filter(is_active=True)
     serializer_class = OrganismoSectorialSerializer
+    import_serializer_class = OrganismoSectorialImportSerializer
 
     def get_permissions(self):
-        if self.action in ['create', 'destroy']:
+        if self.action in ['create', 'destroy', 'bulk_destroy', 'importar']:
             return [IsAuthenticated(), IsAdministrador()]
         elif self.action == 'list':
             return [IsAuthenticatedAndAdminOrSectorial()]
@@ -310,23 +359,28 @@ class OrganismoSectorialViewSet(ModelViewSet):
     def destroy(self, request, *args, **kwargs):
         instance = self.get_object()
         instance.is_active = False
-        instance.save()
+        instance.save(update_fields=['is_active', 'updated_at'])
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 @extend_schema_view(
     list=extend_schema(
         description="Devuelve la lista de relaciones entre planes, organismos sectoriales y medidas.",
+        parameters=[PlanOrganismoSectorialFiltrosSerializer, EXPAND_PARAMETER, *FIELDS_PARAMETERS],
         responses={200: PlanOrganismoSectorialSerializer(many=True)}
-    )
+    ),
+    retrieve=extend_schema(parameters=[EXPAND_PARAMETER, *FIELDS_PARAMETERS]),
+    export=extend_schema(parameters=[PlanOrganismoSectorialFiltrosSerializer])
 )
-class PlanOrganismoSectorialViewSet(ModelViewSet):
+class PlanOrganismoSectorialViewSet(ConditionalGetMixin, SparseFieldsMixin, ExpandMixin, ExportMixin, BulkDestroyMixin, FastListMixin, AsyncReadMixin, ModelViewSet):
     queryset = PlanOrganismoSectorial.objects.filter(is_active=True)
     serializer_class = PlanOrganismoSectorialSerializer
+    filter_backends = [ParamsFilterBackend]
+    filter_params_serializer = PlanOrganismoSectorialFiltrosSerializer
 
     def get_permissions(self):
-        if self.action in ['create', 'destroy']:
+        if self.action in ['create', 'destroy', 'bulk_destroy']:
             return [IsAuthenticated(), IsAdministrador()]
-        elif self.action == 'list':
+        elif self.action in ['list', 'export']:
             return [IsAuthenticatedAndAdminOrSectorial()]
         return [IsAuthenticated()]
     
@@ -381,18 +435,28 @@ class PlanOrganismoSectorialViewSet(ModelViewSet):
             print(data.get("id_media"))
             return Response({"detail": errores}, status=status.HTTP_400_BAD_REQUEST)
 
+        serializer = PlanOrganismoSectorialLoteSerializer(data={
+            "id_plan": id_plan,
+            "id_organismo_sectorial": id_organismo,
+            "id_media": id_medidas,
+        })
+        if not serializer.is_valid():
+            return Response({"detail": serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        plan = serializer.validated_data["id_plan"]
+        organismo = serializer.validated_data["id_organismo_sectorial"]
+        medidas = serializer.validated_data["id_media"]
+
         # Validación de duplicados
-        if len(id_medidas) != len(set(id_medidas)):
+        if len(medidas) != len({medida.pk for medida in medidas}):
             return Response({"detail": "Existen medidas duplicadas."}, status=status.HTTP_400_BAD_REQUEST)
 
         try:
             with transaction.atomic():
-                instancias_creadas = []
-
                 relaciones_existentes = PlanOrganismoSectorial.objects.filter(
-                    id_plan_id=id_plan,
-                    id_organismo_sectorial_id=id_organismo,
-                    id_media_id__in=id_medidas
+                    id_plan=plan,
+                    id_organismo_sectorial=organismo,
+                    id_media__in=medidas
                 ).values_list('id_media_id', flat=True)
                 medidas_duplicadas = set(relaciones_existentes)
 
@@ -401,23 +465,15 @@ class PlanOrganismoSectorialViewSet(ModelViewSet):
                         "detail": f"Las siguientes medidas ya están asociadas: {sorted(medidas_duplicadas)}"
                     }, status=status.HTTP_400_BAD_REQUEST)
 
-                campos_base = {
-                    "id_plan": id_plan,
-                    "id_organismo_sectorial": id_organismo,
-                }
-                for id_medida in id_medidas:
-                    serializer = PlanOrganismoSectorialSerializer(data={
-                        **campos_base,
-                        "id_media": id_medida
-                    })
-                    serializer.is_valid(raise_exception=True)
-                    serializer.save()
-                    instancias_creadas.append(serializer.data)
+                instancias_creadas = PlanOrganismoSectorial.objects.bulk_create([
+                    PlanOrganismoSectorial(id_plan=plan, id_organismo_sectorial=organismo, id_media=medida)
+                    for medida in medidas
+                ])
 
             return Response({
                 "mensaje": "Las medidas fueron asociadas correctamente.",
                 "cantidad": len(instancias_creadas),
-                "datos": instancias_creadas
+                "datos": PlanOrganismoSectorialSerializer(instancias_creadas, many=True).data
             }, status=status.HTTP_201_CREATED)
 
         except serializers.ValidationError as e:
@@ -444,23 +500,29 @@ class PlanOrganismoSectorialViewSet(ModelViewSet):
     def destroy(self, request, *args, **kwargs):
         instance = self.get_object()
         instance.is_active = False
-        instance.save()
+        instance.save(update_fields=['is_active', 'updated_at'])
         return Response(status=status.HTTP_204_NO_CONTENT)
     
 @extend_schema_view(
     list=extend_schema(
         description="Devuelve la lista de reportes existentes.",
+        parameters=[ReporteFiltrosSerializer, EXPAND_PARAMETER, *FIELDS_PARAMETERS],
         responses={200: ReporteSerializer(many=True)}
-    )
+    ),
+    retrieve=extend_schema(parameters=[EXPAND_PARAMETER, *FIELDS_PARAMETERS]),
+    export=extend_schema(parameters=[ReporteFiltrosSerializer])
 )
-class ReporteViewSet(ModelViewSet):
+class ReporteViewSet(ConditionalGetMixin, SparseFieldsMixin, ExpandMixin, ExportMixin, BulkDestroyMixin, FastListMixin, AsyncReadMixin, ModelViewSet):
     queryset = Reporte.objects.filter(is_active=True)
     serializer_class = ReporteSerializer
+    filter_backends = [ParamsFilterBackend]
+    filter_params_serializer = ReporteFiltrosSerializer
+    bulk_max_length = 5000
 
     def get_permissions(self):
-        if self.action in ['destroy']:
+        if self.action in ['destroy', 'bulk_destroy']:
             return [IsAuthenticated(), IsAdministrador()]
-        elif self.action in ['create', 'list']:
+        elif self.action in ['create', 'bulk_create', 'list', 'export', 'resumen']:
             return [IsAuthenticatedAndAdminOrSectorial()]
         return [IsAuthenticated()]
     
@@ -502,6 +564,131 @@ class ReporteViewSet(ModelViewSet):
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response({"detail": serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
     
+    @extend_schema(
+        description=(
+            "Crea un lote de reportes en una sola solicitud. Se validan todas las filas "
+            "y, si alguna tiene errores, no se guarda ninguna y se devuelven los errores por fila."
+        ),
+        request=ReporteSerializer(many=True),
+        responses={
+            201: OpenApiResponse(description="Reportes creados."),
+            400: OpenApiResponse(
+                response=ErrorSerializer,
+                description="Errores de validación por fila"
+            )
+        },
+        examples=[
+            OpenApiExample(
+                "Ejemplo de solicitud",
+                summary="Ejemplo de JSON para crear varios reportes",
+                value=[
+                    {
+                        "id_plan_organismo_sectorial": 1,
+                        "valor_reportado": 95.50,
+                        "evidencia": "url de evidencia",
+                        "fecha_reporte": "2024-05-15"
+                    },
+                    {
+                        "id_plan_organismo_sectorial": 2,
+                        "valor_reportado": 40,
+                        "evidencia": "url de evidencia",
+                        "fecha_reporte": "2024-05-15"
+                    }
+                ],
+                request_only=True
+            )
+        ]
+    )
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk_create(self, request, *args, **kwargs):
+        if not isinstance(request.data, list):
+            return Response(
+                {"detail": "Se esperaba una lista de reportes."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        serializer = ReporteBulkSerializer(
+            data=request.data, many=True, max_length=self.bulk_max_length, allow_empty=False
+        )
+        if not serializer.is_valid():
+            errores = serializer.errors
+            if isinstance(errores, dict):
+                return Response({"detail": errores}, status=status.HTTP_400_BAD_REQUEST)
+            return Response({
+                "detail": [
+                    {"fila": indice, "errores": error}
+                    for indice, error in enumerate(errores) if error
+                ]
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        with transaction.atomic():
+            reportes = serializer.save()
+
+        return Response({
+            "mensaje": "Los reportes fueron creados correctamente.",
+            "cantidad": len(reportes),
+            "ids": [reporte.id for reporte in reportes]
+        }, status=status.HTTP_201_CREATED)
+
+    @extend_schema(
+        description=(
+            "Resumen de `valor_reportado` (cantidad, suma, promedio, mínimo y máximo) agrupado "
+            "por plan, organismo sectorial, medida o tipo de medida y por período de `fecha_reporte`. "
+            "Se calcula en la base de datos. Admite los mismos filtros que el listado."
+        ),
+        parameters=[ReporteResumenParamsSerializer, ReporteFiltrosSerializer],
+        responses={
+            200: ReporteResumenSerializer(many=True),
+            400: OpenApiResponse(response=ErrorSerializer, description="Parámetros inválidos")
+        }
+    )
+    @action(detail=False, methods=['get'], pagination_class=None)
+    def resumen(self, request, *args, **kwargs):
+        params = ReporteResumenParamsSerializer(data=request.query_params)
+        if not params.is_valid():
+            return Response({"detail": params.errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        grupo, nombre = ReporteResumenParamsSerializer.AGRUPACIONES[params.validated_data['group_by']]
+        periodo = params.validated_data['period']
+        condiciones = None
+        if periodo in ('month', 'year'):
+            condiciones = ParamsFilterBackend().get_filtros(request, self).condiciones_resumen()
+        if condiciones is not None:
+            # Meses y años se obtienen del resumen mensual, sin recorrer Reporte
+            # (salvo filtros por valor o por fechas que cortan un mes).
+            filas = list(
+                ReporteResumenMensual.objects
+                .filter(**condiciones)
+                .annotate(periodo=Trunc('mes', periodo))
+                .values('periodo', grupo=F(grupo), nombre=F(nombre))
+                .annotate(
+                    n_reportes=Sum('cantidad'),
+                    suma_valor=Sum('suma'),
+                    min_valor=Min('minimo'),
+                    max_valor=Max('maximo'),
+                )
+                .order_by('grupo', 'periodo')
+            )
+            for fila in filas:
+                # En Python: en SQLite Sum('suma') / Sum('cantidad') es una
+                # división entera.
+                fila['promedio'] = fila['suma_valor'] / fila['n_reportes'] if fila['n_reportes'] else None
+        else:
+            filas = (
+                self.filter_queryset(self.get_queryset())
+                .annotate(periodo=Trunc('fecha_reporte', periodo))
+                .values('periodo', grupo=F(grupo), nombre=F(nombre))
+                .annotate(
+                    n_reportes=Count('id'),
+                    suma_valor=Sum('valor_reportado'),
+                    promedio=Avg('valor_reportado'),
+                    min_valor=Min('valor_reportado'),
+                    max_valor=Max('valor_reportado'),
+                )
+                .order_by('grupo', 'periodo')
+            )
+        return Response(ReporteResumenSerializer(filas, many=True).data)
+
     @extend_schema(
         description="Elimina un reporte por su ID.",
         responses={
@@ -513,5 +700,23 @@ class ReporteViewSet(ModelViewSet):
     def destroy(self, request, *args, **kwargs):
         instance = self.get_object()
         instance.is_active = False
-        instance.save()
+        instance.save(update_fields=['is_active', 'updated_at'])
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class MetricsView(APIView):
+    """
+    Métricas de la API en formato de texto de Prometheus (ver ``api/metrics.py``).
+    """
+    permission_classes = [IsAuthenticated, IsAdministrador]
+    renderer_classes = [PrometheusRenderer]
+
+    @extend_schema(
+        description="Métricas de latencia, consultas SQL y tamaño de respuesta por vista, en formato Prometheus.",
+        responses={
+            200: OpenApiResponse(response=OpenApiTypes.STR, description="Texto en formato Prometheus"),
+            403: OpenApiResponse(description="Solo para Administrador.")
+        }
+    )
+    def get(self, request, *args, **kwargs):
+        return Response(exponer(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -1,9 +1,19 @@
+import hashlib
+from functools import reduce
+from operator import or_
+from urllib.parse import urlencode
+
 from rest_framework.authentication import SessionAuthentication, BasicAuthentication
 from rest_framework.permissions import IsAuthenticated
 
 from rest_framework.decorators import authentication_classes, permission_classes
 from rest_framework import serializers
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db.models import Max, Q
 from django.shortcuts import render
+from django.template.loader import render_to_string
 
 from .models import *
 from .serializers import *
@@ -12,6 +22,82 @@ from .serializers import *
 class ErrorSerializer(serializers.Serializer):
     detail = serializers.CharField()
 
+POR_PAGINA = 25
+MAX_POR_PAGINA = 100
+
+
+def _fragmento_timeout():
+    return getattr(settings, 'HTML_FRAGMENT_CACHE_TIMEOUT', 600)
+
+
+def _entero(valor, defecto, minimo, maximo):
+    try:
+        return min(max(int(valor), minimo), maximo)
+    except (TypeError, ValueError):
+        return defecto
+
+
+def _listado(request, model, plantilla_tabla, ordenes, busqueda, filtros=None):
+    """
+    Tabla paginada, ordenable y filtrable de los registros activos de ``model``.
+
+    Parámetros GET: ``page``, ``per_page``, ``sort`` (uno de ``ordenes``,
+    con ``-`` para descendente), ``q`` (``icontains`` sobre ``busqueda``) y
+    los de ``filtros`` (``{parámetro: opciones válidas}``, igualdad exacta).
+
+    El HTML de la tabla se cachea con una clave formada por los parámetros y
+    el mayor ``updated_at`` del modelo (incluidos los inactivos, para que un
+    borrado lógico también la cambie): una visita repetida solo hace esa
+    consulta y no renderiza la tabla.
+    """
+    filtros = filtros or {}
+    sort = request.GET.get('sort', '')
+    if sort.lstrip('-') not in ordenes:
+        sort = 'id'
+    params = {
+        'q': request.GET.get('q', '').strip(),
+        **{
+            campo: request.GET.get(campo, '') if request.GET.get(campo, '') in opciones else ''
+            for campo, opciones in filtros.items()
+        },
+        'sort': sort,
+        'per_page': _entero(request.GET.get('per_page'), POR_PAGINA, 1, MAX_POR_PAGINA),
+        'page': _entero(request.GET.get('page'), 1, 1, 10 ** 9),
+    }
+
+    def query(**cambios):
+        valores = {**params, **cambios}
+        return urlencode({campo: valor for campo, valor in valores.items() if valor not in ('', None)})
+
+    ultima = model.all_objects.aggregate(ultima=Max('updated_at'))['ultima']
+    digest = hashlib.md5(f'{query()}|{ultima}'.encode('utf-8'), usedforsecurity=False).hexdigest()
+    clave = f'html:{model._meta.label_lower}:{digest}'
+    tabla = cache.get(clave)
+    if tabla is None:
+        queryset = model.objects.all()
+        if params['q']:
+            queryset = queryset.filter(reduce(or_, (Q(**{f'{campo}__icontains': params['q']}) for campo in busqueda)))
+        for campo in filtros:
+            if params[campo]:
+                queryset = queryset.filter(**{campo: params[campo]})
+        # Desempate por id para que las páginas sean estables.
+        queryset = queryset.order_by(sort, '-id' if sort.startswith('-') else 'id')
+        pagina = Paginator(queryset, params['per_page']).get_page(params['page'])
+        columnas = {
+            campo: {
+                'query': query(sort=f'-{campo}' if sort == campo else campo, page=''),
+                'orden': 'asc' if sort == campo else 'desc' if sort == f'-{campo}' else '',
+            }
+            for campo in ordenes
+        }
+        paginas = {
+            'anterior': query(page=pagina.previous_page_number()) if pagina.has_previous() else '',
+            'siguiente': query(page=pagina.next_page_number()) if pagina.has_next() else '',
+        }
+        tabla = render_to_string(plantilla_tabla, {'pagina': pagina, 'columnas': columnas, 'paginas': paginas})
+        cache.set(clave, tabla, _fragmento_timeout())
+    return {'tabla': tabla, 'params': params}
+
 def home(request):
     return render(request, 'home.html')
 
@@ -19,15 +105,24 @@ def home(request):
 @authentication_classes([SessionAuthentication, BasicAuthentication])
 @permission_classes([IsAuthenticated])
 def tipo_medida(request):
-    data = TipoMedida.objects.all()
-    return render(request, 'tipo_medida.html', {'tipos_medida': data})
+    contexto = _listado(
+        request, TipoMedida, 'tipo_medida_tabla.html',
+        ordenes=['id', 'nombre'], busqueda=['nombre', 'descripcion']
+    )
+    return render(request, 'tipo_medida.html', contexto)
 
 ##### Tabla PLAN #######
 @authentication_classes([SessionAuthentication, BasicAuthentication])
 @permission_classes([IsAuthenticated])
 def plan(request):
-    planes = Plan.objects.all()
-    return render(request, 'planes.html', {'planes': planes})
+    contexto = _listado(
+        request, Plan, 'planes_tabla.html',
+        ordenes=['id', 'nombre', 'fecha_inicio', 'fecha_termino', 'responsable', 'estado'],
+        busqueda=['nombre', 'descripcion', 'responsable'],
+        filtros={'estado': [estado for estado, _ in Plan.ESTADO_CHOICES]}
+    )
+    contexto['estados'] = Plan.ESTADO_CHOICES
+    return render(request, 'planes.html', contexto)
 
 @authentication_classes([SessionAuthentication, BasicAuthentication])
 @permission_classes([IsAuthenticated])
@@ -38,5 +133,8 @@ def crear_plan_view(request):
 @authentication_classes([SessionAuthentication, BasicAuthentication])
 @permission_classes([IsAuthenticated])
 def organismo_sectorial(request):
-    os = OrganismoSectorial.objects.all()
-    return render(request, 'organismo_sectorial.html', {'organismos': os})
+    contexto = _listado(
+        request, OrganismoSectorial, 'organismo_sectorial_tabla.html',
+        ordenes=['id', 'nombre', 'tipo'], busqueda=['nombre', 'tipo', 'contacto']
+    )
+    return render(request, 'organismo_sectorial.html', contexto)
@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
 import os
+from importlib.util import find_spec
 from pathlib import Path
 
 from dotenv import load_dotenv
@@ -53,6 +54,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # primero, para medir la solicitud completa (ver api/metrics.py)
+    'api.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -89,7 +92,13 @@ WSGI_APPLICATION = 'django_proyecto.wsgi.application'
 if not DEBUG:
     DATABASES = {
         "default": {
-            "ENGINE": "django.db.backends.postgresql",
+            # Pool de conexiones por proceso (api/backends/postgresql_pool) con
+            # DB_POOL=True; por defecto el backend estándar (una conexión por
+            # solicitud) hasta validar el pool contra PostgreSQL.
+            "ENGINE": (
+                "api.backends.postgresql_pool" if os.getenv("DB_POOL", "False") == "True"
+                else "django.db.backends.postgresql"
+            ),
             "NAME": os.environ.get("PGDATABASE"),
             "USER": os.environ.get("PGUSER"),
             "PASSWORD": os.environ.get("PGPASSWORD"),
@@ -98,9 +107,23 @@ if not DEBUG:
             "OPTIONS": {
                 "sslmode": "require",
             },
-            "DISABLE_SERVER_SIDE_CURSORS": True,
+            # Los cursores del lado del servidor requieren una conexión directa
+            # (no un pooler en modo transacción); ver api/exports.py.
+            "DISABLE_SERVER_SIDE_CURSORS": os.getenv("DISABLE_SERVER_SIDE_CURSORS", "True") == "True",
         }
     }
+    if DATABASES["default"]["ENGINE"] == "api.backends.postgresql_pool":
+        DATABASES["default"]["OPTIONS"]["pool"] = {
+            "min_size": int(os.getenv("DB_POOL_MIN_SIZE", 1)),
+            "max_size": int(os.getenv("DB_POOL_MAX_SIZE", 10)),
+            # segundos antes de reciclar una conexión / de cerrar una ociosa
+            "max_age": int(os.getenv("DB_POOL_MAX_AGE", 1800)),
+            "max_idle": int(os.getenv("DB_POOL_MAX_IDLE", 600)),
+            # espera máxima por una conexión libre
+            "timeout": float(os.getenv("DB_POOL_TIMEOUT", 10)),
+            # ociosa más de estos segundos => SELECT 1 antes de entregarla
+            "check_after": int(os.getenv("DB_POOL_CHECK_AFTER", 30)),
+        }
 else:
     DATABASES = {
     'default': {
@@ -110,6 +133,38 @@ else:
 }
 
 
+# Cache
+# Local-memory por defecto (una copia por proceso). Con varios workers de
+# gunicorn conviene "file" o "db" para que la invalidación sea compartida;
+# "db" requiere `python manage.py createcachetable`. API_CACHE_LOCATION vacío
+# (como en .env.example) usa la ubicación por defecto de cada backend.
+
+API_CACHE_BACKEND = os.getenv("API_CACHE_BACKEND", "locmem")
+_API_CACHE_BACKENDS = {
+    "locmem": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "api",
+    },
+    "file": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.getenv("API_CACHE_LOCATION") or str(BASE_DIR / ".cache"),
+    },
+    "db": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": os.getenv("API_CACHE_LOCATION") or "api_cache",
+    },
+}
+CACHES = {
+    "default": _API_CACHE_BACKENDS[API_CACHE_BACKEND],
+}
+
+# Segundos que se guardan las respuestas de tipo-medida, medida y organismo-sectorial.
+API_CATALOG_CACHE_TIMEOUT = 600
+
+# Segundos que se guarda el HTML de las tablas de las vistas de views_html
+# (la clave cambia sola cuando cambian los datos).
+HTML_FRAGMENT_CACHE_TIMEOUT = 600
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -172,15 +227,45 @@ REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
     ],
+    # paginación por cursor (created_at, id) para todos los listados
+    "DEFAULT_PAGINATION_CLASS": "api.pagination.KeysetPagination",
+    "PAGE_SIZE": 50,
+    # JSON con orjson (mismos bytes que JSONRenderer; sin orjson usa json) y
+    # application/msgpack si está instalado msgpack (api/renderers.py)
+    "DEFAULT_RENDERER_CLASSES": [
+        "api.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "api.renderers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
 }
+if find_spec("msgpack"):
+    REST_FRAMEWORK["DEFAULT_RENDERER_CLASSES"].insert(1, "api.renderers.MessagePackRenderer")
+    REST_FRAMEWORK["DEFAULT_PARSER_CLASSES"].insert(1, "api.renderers.MessagePackParser")
 
 from datetime import timedelta
 
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=30),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
+    # agrega los roles del usuario a los claims del token
+    "TOKEN_OBTAIN_SERIALIZER": "api.authentication.RolesTokenObtainPairSerializer",
 }
 
+# Autenticación JWT sin consultar auth_user en cada solicitud (opcional).
+# Un usuario desactivado se rechaza a más tardar tras API_JWT_USER_ACTIVE_TTL segundos.
+if os.getenv("JWT_STATELESS", "False") == "True":
+    REST_FRAMEWORK["DEFAULT_AUTHENTICATION_CLASSES"][0] = "api.authentication.StatelessJWTAuthentication"
+API_JWT_USER_ACTIVE_TTL = 60
+
+# Segundos que los roles (grupos) de un usuario quedan en caché; se invalidan
+# al cambiar User.groups (api/signals.py). Con "locmem" no se guardan entre
+# solicitudes (la invalidación no llegaría a los demás workers).
+API_ROLES_CACHE_TIMEOUT = 300
+
 
 # Configura correctamente los archivos estáticos
 STATIC_URL = "/static/"
@@ -189,9 +274,20 @@ STATIC_ROOT = os.path.join(BASE_DIR, "staticfiles")
 # Si estás en producción (Render), añade esto
 if not DEBUG:
     # WhiteNoise para servir archivos estáticos en producción
-    MIDDLEWARE.insert(1, "whitenoise.middleware.WhiteNoiseMiddleware")
+    MIDDLEWARE.insert(
+        MIDDLEWARE.index("django.middleware.security.SecurityMiddleware") + 1,
+        "whitenoise.middleware.WhiteNoiseMiddleware"
+    )
     STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 
+# list/retrieve de la API como vistas asíncronas nativas (api/async_views.py).
+# Activar solo al servir con ASGI (uvicorn); bajo WSGI (gunicorn) no conviene.
+API_ASYNC_VIEWS = os.getenv("API_ASYNC_VIEWS", "False") == "True"
+
+# Con varios workers (gunicorn) cada proceso vuelca sus métricas a este
+# directorio y /api/metrics las suma; vaciarlo al iniciar el servidor.
+API_METRICS_MULTIPROC_DIR = os.getenv("API_METRICS_MULTIPROC_DIR", "")
+
 ## Para iniciar el servidor con SSL
 ##uvicorn django_proyecto.asgi:application --ssl-keyfile=key.pem --ssl-certfile=cert.pem --host localhost --port 8000 --loop asyncio
 
@@ -10,6 +10,8 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
+from importlib.util import find_spec
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -44,6 +46,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # primero, para medir la solicitud completa (ver api/metrics.py)
+    'api.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -84,6 +88,30 @@ DATABASES = {
     }
 }
 
+# Para probar contra un Postgres local con el pool de conexiones:
+# DEV_PGDATABASE=curso python manage.py test --settings=django_proyecto.settings_dev
+if os.getenv("DEV_PGDATABASE"):
+    DATABASES = {
+        'default': {
+            'ENGINE': 'api.backends.postgresql_pool',
+            'NAME': os.getenv("DEV_PGDATABASE"),
+            'USER': os.getenv("PGUSER", ""),
+            'PASSWORD': os.getenv("PGPASSWORD", ""),
+            'HOST': os.getenv("PGHOST", "localhost"),
+            'PORT': os.getenv("PGPORT", 5432),
+            'OPTIONS': {
+                'pool': {'min_size': 1, 'max_size': 5},
+            },
+        }
+    }
+
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "api",
+    }
+}
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -147,14 +175,37 @@ REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
     ],
+    # paginación por cursor (created_at, id) para todos los listados
+    "DEFAULT_PAGINATION_CLASS": "api.pagination.KeysetPagination",
+    "PAGE_SIZE": 50,
+    # JSON con orjson (mismos bytes que JSONRenderer; sin orjson usa json) y
+    # application/msgpack si está instalado msgpack (api/renderers.py)
+    "DEFAULT_RENDERER_CLASSES": [
+        "api.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "api.renderers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
 }
+if find_spec("msgpack"):
+    REST_FRAMEWORK["DEFAULT_RENDERER_CLASSES"].insert(1, "api.renderers.MessagePackRenderer")
+    REST_FRAMEWORK["DEFAULT_PARSER_CLASSES"].insert(1, "api.renderers.MessagePackParser")
 
 from datetime import timedelta
 
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=30),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
+    # agrega los roles del usuario a los claims del token
+    "TOKEN_OBTAIN_SERIALIZER": "api.authentication.RolesTokenObtainPairSerializer",
 }
 
+# list/retrieve de la API como vistas asíncronas nativas (api/async_views.py);
+# en desarrollo se sirve con uvicorn.
+API_ASYNC_VIEWS = True
+
 ## Para iniciar el servidor con SSL
 ##uvicorn django_proyecto.asgi:application --ssl-keyfile=key.pem --ssl-certfile=cert.pem --host localhost --port 8000 --loop asyncio